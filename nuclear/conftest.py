@@ -9,6 +9,8 @@ packagename.test
 
 import os
 
+import pandas as pd
+import pytest
 from astropy.version import version as astropy_version
 
 # For Astropy 3.0 and later, we can use the standalone pytest plugin
@@ -45,6 +47,30 @@ def pytest_configure(config):
         packagename = os.path.basename(os.path.dirname(__file__))
         TESTED_VERSIONS[packagename] = __version__
 
+@pytest.fixture
+def decay_radiation_db(tmp_path, monkeypatch):
+    """
+    Temporary decay radiation database with a few lines of Co56 and Ni56
+    """
+    from nuclear import nuclear_data
+    from nuclear.io.nndc import base
+
+    db_fname = tmp_path / "decay_radiation.h5"
+    monkeypatch.setattr(base, "_get_nuclear_database_path", lambda: db_fname)
+    nuclear_data.clear_decay_radiation_cache()
+    decay_radiation = pd.DataFrame(
+        {"type": ["e+", "x_rays", "gamma_rays", "gamma_rays", "gamma_rays"],
+         "energy": [631.3, 6.4, 846.8, 1238.3, 158.4],
+         "intensity": [20.0, 25.0, 100.0, 66.0, 98.8],
+         "heading": ["Beta+"] + ["Gamma and X-ray radiation"] * 4},
+        index=pd.Index(["Co56"] * 4 + ["Ni56"], name="isotope"))
+    meta = pd.DataFrame({"key": ["authors"] * 2, "value": ["A", "B"]},
+                        index=pd.Index(["Co56", "Ni56"], name="isotope"))
+    base.commit_decay_radiation(decay_radiation, meta)
+    yield db_fname
+    nuclear_data.clear_decay_radiation_cache()
+
+
 # Uncomment the last two lines in this block to treat all DeprecationWarnings as
 # exceptions. For Astropy v2.0 or later, there are 2 additional keywords,
 # as follow (although default should work for most cases).
@@ -0,0 +1,655 @@
+"""
+Solvers for the linear decay equations dN/dt = A N of a closed decay network
+"""
+
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+from scipy import linalg
+from pyne import data
+from pyne import nucname
+
+from astropy import units as u
+
+u_to_g = u.u.to(u.g)
+
+
+class DecayNetwork(object):
+    """
+    Immutable, array-backed topology of a closed decay network. All arrays are
+    ordered by ascending nuclide id and are read-only.
+
+    Parameters
+    ----------
+
+    nuc_ids: ~np.ndarray
+        pyne nuclide ids
+
+    nuc_names: ~list
+        nuclide names
+
+    decay_constants: ~np.ndarray
+        decay constants in 1/s
+
+    atomic_masses: ~np.ndarray
+        atomic masses in g
+
+    parent_indices: ~np.ndarray
+        index of the parent nuclide for every decay edge
+
+    child_indices: ~np.ndarray
+        index of the child nuclide for every decay edge
+
+    branching_ratios: ~np.ndarray
+        branching ratio for every decay edge
+    """
+
+    __slots__ = ('nuc_ids', 'nuc_names', 'name_index', 'decay_constants',
+                 'atomic_masses', 'parent_indices', 'child_indices',
+                 'branching_ratios', '_decay_matrix')
+
+    @classmethod
+    def from_nuclides(cls, nuc_ids):
+        """
+        Collect the given nuclides and all of their decay descendants from pyne
+
+        Parameters
+        ----------
+
+        nuc_ids: ~list
+            pyne nuclide ids or names
+
+        Returns
+        -------
+            : ~DecayNetwork
+        """
+        nuc_ids = {nucname.id(nuc_id) for nuc_id in nuc_ids}
+        unvisited = list(nuc_ids)
+        children = {}
+        while unvisited:
+            nuc_id = unvisited.pop()
+            children[nuc_id] = sorted(data.decay_children(nuc_id))
+            for child_nuc_id in children[nuc_id]:
+                if child_nuc_id not in nuc_ids:
+                    nuc_ids.add(child_nuc_id)
+                    unvisited.append(child_nuc_id)
+
+        nuc_ids = sorted(nuc_ids)
+        nuc_index = {nuc_id: i for i, nuc_id in enumerate(nuc_ids)}
+        edges = [(nuc_index[nuc_id], nuc_index[child_nuc_id],
+                  data.branch_ratio(nuc_id, child_nuc_id))
+                 for nuc_id in nuc_ids for child_nuc_id in children[nuc_id]]
+        parent_indices, child_indices, branching_ratios = (
+            zip(*edges) if edges else ((), (), ()))
+
+        return cls(nuc_ids, [nucname.name(nuc_id) for nuc_id in nuc_ids],
+                   [data.decay_const(nuc_id) for nuc_id in nuc_ids],
+                   [data.atomic_mass(nuc_id) * u_to_g for nuc_id in nuc_ids],
+                   parent_indices, child_indices, branching_ratios)
+
+    def __init__(self, nuc_ids, nuc_names, decay_constants, atomic_masses,
+                 parent_indices, child_indices, branching_ratios):
+        set_ = super(DecayNetwork, self).__setattr__
+        set_('nuc_ids', _readonly_array(nuc_ids, np.int64))
+        set_('nuc_names', tuple(nuc_names))
+        set_('name_index', MappingProxyType(
+            {nuc_name: i for i, nuc_name in enumerate(self.nuc_names)}))
+        set_('decay_constants', _readonly_array(decay_constants))
+        set_('atomic_masses', _readonly_array(atomic_masses))
+        set_('parent_indices', _readonly_array(parent_indices, np.int64))
+        set_('child_indices', _readonly_array(child_indices, np.int64))
+        set_('branching_ratios', _readonly_array(branching_ratios))
+        set_('_decay_matrix', None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('DecayNetwork is immutable')
+
+    def __len__(self):
+        return len(self.nuc_ids)
+
+    def __eq__(self, other):
+        return (isinstance(other, DecayNetwork) and
+                np.array_equal(self.nuc_ids, other.nuc_ids))
+
+    def __hash__(self):
+        return hash(self.nuc_ids.tobytes())
+
+    def __repr__(self):
+        return 'DecayNetwork({0})'.format(', '.join(self.nuc_names))
+
+    @property
+    def decay_matrix(self):
+        """
+        Decay (Bateman) matrix A with dN/dt = A N
+        """
+        if self._decay_matrix is None:
+            decay_matrix = np.diag(-self.decay_constants)
+            np.add.at(decay_matrix,
+                      (self.child_indices, self.parent_indices),
+                      self.decay_constants[self.parent_indices] *
+                      self.branching_ratios)
+            decay_matrix.setflags(write=False)
+            super(DecayNetwork, self).__setattr__('_decay_matrix',
+                                                  decay_matrix)
+        return self._decay_matrix
+
+    def get_linear_chains(self):
+        """
+        Split the network into linear chains (every nuclide has at most one
+        parent and one child), e.g. Ni56 -> Co56 -> Fe56
+
+        Returns
+        -------
+            : ~list or None
+            index arrays ordered from the head of each chain to its end, or
+            None if the network is not made up of linear chains
+        """
+        n_parents = np.bincount(self.child_indices, minlength=len(self))
+        n_children = np.bincount(self.parent_indices, minlength=len(self))
+        if (n_parents > 1).any() or (n_children > 1).any():
+            return None
+
+        child_index = dict(zip(self.parent_indices.tolist(),
+                               self.child_indices.tolist()))
+        chains = []
+        for head in np.flatnonzero(n_parents == 0).tolist():
+            chain = [head]
+            while chain[-1] in child_index:
+                chain.append(child_index[chain[-1]])
+            chains.append(np.array(chain, dtype=np.int64))
+        return chains
+
+
+def _readonly_array(values, dtype=np.float64):
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+class MatrixDecaySolver(object):
+    """
+    Solve the decay equations by diagonalizing the decay matrix once, so that
+    N(t) = V exp(diag(lambda) t) V^-1 N0 can be evaluated for all epochs in a
+    single broadcast. If the eigenvectors are (nearly) degenerate the solver
+    falls back to a matrix exponential per epoch.
+
+    Parameters
+    ----------
+
+    decay_matrix: ~np.ndarray
+        see `DecayNetwork.decay_matrix`
+
+    max_condition: ~float
+        largest condition number of the eigenvector matrix that is still
+        trusted for the diagonalization [default=1e10]
+    """
+
+    @classmethod
+    def from_network(cls, network, **kwargs):
+        return cls(network.decay_matrix, **kwargs)
+
+    def __init__(self, decay_matrix, max_condition=1e10):
+        self.decay_matrix = np.asarray(decay_matrix, dtype=np.float64)
+        eigenvalues, eigenvectors = np.linalg.eig(self.decay_matrix)
+        # decay networks are acyclic so the spectrum is the (real) diagonal
+        self.eigenvalues = eigenvalues.real
+        self.eigenvectors = eigenvectors.real
+        self.diagonalizable = (np.linalg.cond(self.eigenvectors) <
+                               max_condition)
+        if self.diagonalizable:
+            self.inverse_eigenvectors = np.linalg.inv(self.eigenvectors)
+        else:
+            self.inverse_eigenvectors = None
+
+    def decay(self, initial_numbers, epochs):
+        """
+        Decay the initial numbers to the given epochs
+
+        Parameters
+        ----------
+
+        initial_numbers: ~np.ndarray
+            number of nuclei at t=0 (n_nuclides) or (n_samples x n_nuclides)
+
+        epochs: ~np.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : ~np.ndarray
+            number of nuclei (n_epochs x n_nuclides)
+            or (n_samples x n_epochs x n_nuclides)
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+        initial_numbers = np.asarray(initial_numbers, dtype=np.float64)
+        if initial_numbers.ndim > 1:
+            return np.einsum('tij,sj->sti', self.propagator(epochs),
+                             initial_numbers)
+        if self.diagonalizable:
+            coefficients = self.inverse_eigenvectors @ initial_numbers
+            return ((np.exp(np.outer(epochs, self.eigenvalues)) *
+                     coefficients) @ self.eigenvectors.T)
+        else:
+            return np.array([linalg.expm(self.decay_matrix * epoch) @
+                             initial_numbers for epoch in epochs])
+
+    def propagator(self, epochs):
+        """
+        Linear operator exp(A t) that maps initial to decayed numbers
+
+        Parameters
+        ----------
+
+        epochs: ~np.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : ~np.ndarray
+            propagator (n_epochs x n_nuclides x n_nuclides)
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+        if self.diagonalizable:
+            return ((self.eigenvectors[None, :, :] *
+                     np.exp(np.outer(epochs, self.eigenvalues))[:, None, :])
+                    @ self.inverse_eigenvectors)
+        else:
+            return np.array([linalg.expm(self.decay_matrix * epoch)
+                             for epoch in epochs])
+
+    def integrated_propagator(self, start, end):
+        """
+        Time-integrated propagator, i.e. the integral of exp(A t) from `start`
+        to `end`. Applied to the initial numbers it gives the time-integrated
+        number of nuclei, which times the decay constants is the number of
+        decays in the interval.
+
+        Parameters
+        ----------
+
+        start: ~np.ndarray
+            start of the intervals in s
+
+        end: ~np.ndarray
+            end of the intervals in s (broadcast against `start`)
+
+        Returns
+        -------
+            : ~np.ndarray
+            integrated propagator (n_intervals x n_nuclides x n_nuclides)
+            in s
+        """
+        start, end = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(start, dtype=np.float64)),
+            np.atleast_1d(np.asarray(end, dtype=np.float64)))
+        if self.diagonalizable:
+            duration = (end - start)[:, None]
+            # int_start^end exp(l t) dt = exp(l start) expm1(l duration) / l
+            with np.errstate(divide='ignore', invalid='ignore'):
+                integrals = np.where(
+                    self.eigenvalues == 0.0, duration,
+                    np.expm1(duration * self.eigenvalues) / self.eigenvalues)
+            integrals = integrals * np.exp(np.outer(start, self.eigenvalues))
+            return ((self.eigenvectors[None, :, :] * integrals[:, None, :])
+                    @ self.inverse_eigenvectors)
+        else:
+            return np.array([self._integrated_matrix_exponential(end_epoch) -
+                             self._integrated_matrix_exponential(start_epoch)
+                             for start_epoch, end_epoch in zip(start, end)])
+
+    def _integrated_matrix_exponential(self, epoch):
+        # the upper right block of exp([[A t, I t], [0, 0]]) is
+        # int_0^t exp(A s) ds
+        n_nuclides = len(self.decay_matrix)
+        augmented_matrix = np.zeros((2 * n_nuclides, 2 * n_nuclides))
+        augmented_matrix[:n_nuclides, :n_nuclides] = self.decay_matrix * epoch
+        augmented_matrix[:n_nuclides, n_nuclides:] = (np.eye(n_nuclides) *
+                                                      epoch)
+        return linalg.expm(augmented_matrix)[:n_nuclides, n_nuclides:]
+
+    def integrate(self, initial_numbers, start, end):
+        """
+        Time-integrated number of nuclei between `start` and `end`
+
+        Parameters
+        ----------
+
+        initial_numbers: ~np.ndarray
+            number of nuclei at t=0 (n_nuclides)
+
+        start: ~np.ndarray
+            start of the intervals in s
+
+        end: ~np.ndarray
+            end of the intervals in s
+
+        Returns
+        -------
+            : ~np.ndarray
+            integrated number of nuclei (n_intervals x n_nuclides) in s
+        """
+        return (self.integrated_propagator(start, end) @
+                np.asarray(initial_numbers, dtype=np.float64))
+
+
+class BatemanDecaySolver(object):
+    """
+    Solve the decay equations of a network made up of linear chains with the
+    closed-form Bateman equations
+
+        N_n(t) = sum_i N_i(0) prod_{j=i}^{n-1} (b_j lambda_j)
+                 sum_{k=i}^{n} exp(-lambda_k t) / prod_{l!=k} (lambda_l - lambda_k)
+
+    The coefficients are computed once per chain so that every epoch is a
+    single broadcast. Chains with near-equal decay constants make the
+    Bateman sum numerically unstable and fall back to a matrix exponential of
+    the chain's decay matrix.
+
+    Parameters
+    ----------
+
+    network: ~DecayNetwork
+
+    degenerate_rtol: ~float
+        relative difference of two decay constants in a chain below which the
+        chain is treated as degenerate [default=1e-6]
+    """
+
+    @classmethod
+    def from_network(cls, network, **kwargs):
+        return cls(network, **kwargs)
+
+    def __init__(self, network, degenerate_rtol=1e-6):
+        chains = network.get_linear_chains()
+        if chains is None:
+            raise ValueError(f'{network} contains branching decays and can '
+                             'not be solved with the Bateman solver - '
+                             'use the matrix solver')
+        self.n_nuclides = len(network)
+        self.decay_matrix = network.decay_matrix
+        self.chains = chains
+        self.chain_decay_constants = [network.decay_constants[chain]
+                                      for chain in chains]
+        self.chain_coefficients = []
+        for chain, decay_constants in zip(chains,
+                                          self.chain_decay_constants):
+            if self._is_degenerate(decay_constants, degenerate_rtol):
+                self.chain_coefficients.append(None)
+            else:
+                self.chain_coefficients.append(self._calculate_coefficients(
+                    decay_constants,
+                    self.decay_matrix[chain[1:], chain[:-1]]))
+
+    @staticmethod
+    def _is_degenerate(decay_constants, rtol):
+        differences = np.abs(decay_constants[:, None] -
+                             decay_constants[None, :])
+        scale = np.maximum(decay_constants[:, None], decay_constants[None, :])
+        np.fill_diagonal(differences, np.inf)
+        return (differences <= rtol * scale).any()
+
+    @staticmethod
+    def _calculate_coefficients(decay_constants, production_rates):
+        """
+        Coefficients c[n, i, k] with N_n(t) = sum_ik c[n, i, k] exp(-lambda_k t)
+        N_i(0)
+
+        Parameters
+        ----------
+
+        decay_constants: ~np.ndarray
+            decay constants along the chain
+
+        production_rates: ~np.ndarray
+            branching ratio x decay constant for every link of the chain
+        """
+        chain_length = len(decay_constants)
+        coefficients = np.zeros((chain_length, ) * 3)
+        for i in range(chain_length):
+            for n in range(i, chain_length):
+                production = np.prod(production_rates[i:n])
+                for k in range(i, n + 1):
+                    others = np.r_[decay_constants[i:k],
+                                   decay_constants[k + 1:n + 1]]
+                    coefficients[n, i, k] = production / np.prod(
+                        others - decay_constants[k])
+        return coefficients
+
+    def propagator(self, epochs):
+        """
+        Linear operator exp(A t) that maps initial to decayed numbers
+
+        Parameters
+        ----------
+
+        epochs: ~np.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : ~np.ndarray
+            propagator (n_epochs x n_nuclides x n_nuclides)
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+        propagator = np.zeros((len(epochs), self.n_nuclides,
+                               self.n_nuclides))
+        for chain, decay_constants, coefficients in zip(
+                self.chains, self.chain_decay_constants,
+                self.chain_coefficients):
+            if coefficients is None:
+                chain_decay_matrix = self.decay_matrix[np.ix_(chain, chain)]
+                chain_propagator = np.array([
+                    linalg.expm(chain_decay_matrix * epoch)
+                    for epoch in epochs])
+            else:
+                chain_propagator = np.einsum(
+                    'nik,tk->tni', coefficients,
+                    np.exp(-np.outer(epochs, decay_constants)))
+            propagator[:, chain[:, None], chain[None, :]] = chain_propagator
+        return propagator
+
+    def decay(self, initial_numbers, epochs):
+        """
+        Decay the initial numbers to the given epochs
+
+        Parameters
+        ----------
+
+        initial_numbers: ~np.ndarray
+            number of nuclei at t=0 (n_nuclides) or (n_samples x n_nuclides)
+
+        epochs: ~np.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : ~np.ndarray
+            number of nuclei (n_epochs x n_nuclides)
+            or (n_samples x n_epochs x n_nuclides)
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+        initial_numbers = np.asarray(initial_numbers, dtype=np.float64)
+        batch_initial_numbers = np.atleast_2d(initial_numbers)
+        decayed_numbers = np.zeros((len(batch_initial_numbers), len(epochs),
+                                    self.n_nuclides))
+        for chain, decay_constants, coefficients in zip(
+                self.chains, self.chain_decay_constants,
+                self.chain_coefficients):
+            chain_initial_numbers = batch_initial_numbers[:, chain]
+            if coefficients is None:
+                chain_decay_matrix = self.decay_matrix[np.ix_(chain, chain)]
+                chain_propagator = np.array([
+                    linalg.expm(chain_decay_matrix * epoch)
+                    for epoch in epochs])
+                decayed_numbers[:, :, chain] = np.einsum(
+                    'tij,sj->sti', chain_propagator, chain_initial_numbers)
+            else:
+                # contract the initial numbers first: (n_samples x n x k)
+                amplitudes = np.einsum('nik,si->snk', coefficients,
+                                       chain_initial_numbers)
+                decayed_numbers[:, :, chain] = np.einsum(
+                    'tk,snk->stn', np.exp(-np.outer(epochs, decay_constants)),
+                    amplitudes)
+        if initial_numbers.ndim == 1:
+            return decayed_numbers[0]
+        return decayed_numbers
+
+
+decay_solvers = {'matrix': MatrixDecaySolver,
+                 'bateman': BatemanDecaySolver}
+
+
+def compare_decay_solvers(network, initial_numbers, epochs,
+                          methods=('matrix', 'bateman'), reference='matrix',
+                          n_repeat=100):
+    """
+    Benchmark decay solvers against each other for speed and accuracy
+
+    Parameters
+    ----------
+
+    network: ~DecayNetwork
+
+    initial_numbers: ~np.ndarray
+        number of nuclei at t=0 (n_nuclides)
+
+    epochs: ~np.ndarray
+        epochs in s
+
+    methods: ~tuple
+        names of the solvers in `decay_solvers` to compare
+
+    reference: ~str
+        solver the accuracy is measured against [default='matrix']
+
+    n_repeat: ~int
+        number of timed decays per solver [default=100]
+
+    Returns
+    -------
+        : ~pd.DataFrame
+        setup time and time per decay in s and the largest deviation from
+        the reference relative to the largest number of nuclei
+    """
+    results = OrderedDict()
+    reference_numbers = decay_solvers[reference].from_network(network).decay(
+        initial_numbers, epochs)
+    scale = np.abs(reference_numbers).max()
+    for method in methods:
+        start = time.perf_counter()
+        solver = decay_solvers[method].from_network(network)
+        setup_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(n_repeat):
+            decayed_numbers = solver.decay(initial_numbers, epochs)
+        decay_time = (time.perf_counter() - start) / n_repeat
+        results[method] = (
+            setup_time, decay_time,
+            np.abs(decayed_numbers - reference_numbers).max() / scale)
+    return pd.DataFrame.from_dict(
+        results, orient='index',
+        columns=['setup_time', 'decay_time', 'max_relative_deviation'])
+
+
+class DecayPropagator(object):
+    """
+    Cache of decay propagators exp(A t) keyed by the content of the epoch
+    grid, so that repeated batch decays on a fixed grid reduce to a single
+    matrix product. A propagator takes n_epochs x n_nuclides^2 floats, so the
+    least recently used grids are evicted once the cached propagators exceed
+    `max_bytes`. Single compositions on grids whose propagator is larger than
+    `max_bytes` are decayed by the solver directly (n_epochs x n_nuclides).
+
+    Parameters
+    ----------
+
+    solver: ~MatrixDecaySolver or ~BatemanDecaySolver
+
+    max_bytes: ~int
+        maximum memory of the cached propagators; larger propagators are not
+        cached [default=128 MiB]
+    """
+
+    def __init__(self, solver, max_bytes=2 ** 27):
+        self.solver = solver
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    @staticmethod
+    def _get_key(epochs):
+        return epochs.shape, epochs.tobytes()
+
+    def __call__(self, epochs):
+        """
+        Get the (cached) propagator for the given epochs
+
+        Parameters
+        ----------
+
+        epochs: ~np.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : ~np.ndarray
+            read-only propagator (n_epochs x n_nuclides x n_nuclides)
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+        key = self._get_key(epochs)
+        try:
+            propagator = self._cache[key]
+        except KeyError:
+            propagator = self.solver.propagator(epochs)
+            propagator.setflags(write=False)
+            if propagator.nbytes <= self.max_bytes:
+                self._cache[key] = propagator
+                self.nbytes += propagator.nbytes
+                while self.nbytes > self.max_bytes:
+                    self.nbytes -= self._cache.popitem(last=False)[1].nbytes
+        else:
+            self._cache.move_to_end(key)
+        return propagator
+
+    def decay(self, initial_numbers, epochs):
+        """
+        Decay the initial numbers to the given epochs
+
+        Parameters
+        ----------
+
+        initial_numbers: ~np.ndarray
+            number of nuclei at t=0 (n_nuclides) or (n_samples x n_nuclides)
+
+        epochs: ~np.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : ~np.ndarray
+            number of nuclei (n_epochs x n_nuclides)
+            or (n_samples x n_epochs x n_nuclides)
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+        initial_numbers = np.asarray(initial_numbers, dtype=np.float64)
+        if initial_numbers.ndim == 1:
+            propagator_nbytes = (epochs.size * initial_numbers.size ** 2 *
+                                 epochs.itemsize)
+            if propagator_nbytes > self.max_bytes:
+                return self.solver.decay(initial_numbers, epochs)
+            return self(epochs) @ initial_numbers
+        propagator = self(epochs)
+        n_epochs, n_nuclides, _ = propagator.shape
+        return (initial_numbers @ propagator.reshape(
+            n_epochs * n_nuclides, n_nuclides).T).reshape(
+            len(initial_numbers), n_epochs, n_nuclides)
+
+    def clear(self):
+        self._cache.clear()
+        self.nbytes = 0
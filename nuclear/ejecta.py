@@ -9,10 +9,380 @@ import numpy as np
 
 from astropy import units as u
 
+from nuclear.decay import DecayNetwork, DecayPropagator, decay_solvers
+
 msun_to_cgs = u.Msun.to(u.g)
 u_to_g = u.u.to(u.g)
+day_to_s = u.day.to(u.s)
+
+
+def to_seconds(epochs):
+    """
+    Convert epochs to a plain array in seconds. Quantities are converted,
+    anything else is assumed to be in days (like in `Ejecta.decay`).
+
+    Parameters
+    ----------
+
+    epochs: numpy or quantity array
+
+    Returns
+    -------
+        : ~np.ndarray
+    """
+    if isinstance(epochs, u.Quantity):
+        return np.atleast_1d(epochs.to_value(u.s))
+    return np.atleast_1d(np.asarray(epochs, dtype=np.float64)) * day_to_s
+
+
+def to_day_intervals(start, end):
+    """
+    Broadcast interval bounds against each other and convert them to plain
+    arrays in days
+
+    Parameters
+    ----------
+
+    start: numpy or quantity array
+
+    end: numpy or quantity array
+
+    Returns
+    -------
+        : ~tuple of ~np.ndarray
+    """
+    return np.broadcast_arrays(
+        np.atleast_1d(u.Quantity(start, u.day).value),
+        np.atleast_1d(u.Quantity(end, u.day).value))
+
 
-class Ejecta(object):
+class BaseEjecta(object):
+    """
+    Decay functionality shared by the ejecta representations. Subclasses
+    provide `network`, `mass_g`, `to_material` and `_get_fractions`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def n_per_g(self):
+        return 1 / self.network.atomic_masses
+
+    @property
+    def mass(self):
+        return self.mass_g * u.g
+
+    def get_decay_constant(self):
+        network = self.network
+        return OrderedDict(zip(network.nuc_names, network.decay_constants))
+
+    def get_masses(self):
+        network = self.network
+        return dict(zip(network.nuc_names, network.atomic_masses))
+
+    def get_all_children(self):
+        return self.network.nuc_ids.tolist()
+
+    def get_all_children_nuc_name(self):
+        return list(self.network.nuc_names)
+
+    def _get_decay_cache(self):
+        network = self.network
+        if getattr(self, '_decay_cache_network', None) is not network:
+            self._decay_solvers = {}
+            self._decay_propagators = {}
+            self._decay_cache_network = network
+        return network
+
+    def get_decay_solver(self, method='matrix'):
+        """
+        Get the decay solver for the current decay network. The solver is only
+        rebuilt if the decay network changes.
+
+        Parameters
+        ----------
+
+        method: ~str
+            name of the solver in `nuclear.decay.decay_solvers`
+            [default='matrix']
+
+        Returns
+        -------
+            : ~nuclear.decay.MatrixDecaySolver or
+              ~nuclear.decay.BatemanDecaySolver
+        """
+        network = self._get_decay_cache()
+        if method not in self._decay_solvers:
+            try:
+                solver_class = decay_solvers[method]
+            except KeyError:
+                raise ValueError(f'Unknown decay method {method} (allowed: '
+                                 f'{", ".join(decay_solvers)}, pyne)')
+            self._decay_solvers[method] = solver_class.from_network(network)
+        return self._decay_solvers[method]
+
+    def get_decay_propagator(self, method='matrix'):
+        """
+        Get the propagator cache for the current decay network. Repeated
+        decays (e.g. `decay_raw`, `get_decayed_numbers_raw` or `decay_batch`)
+        on the same epoch grid reuse the cached decay operator.
+
+        Parameters
+        ----------
+
+        method: ~str
+            see `get_decay_solver`
+
+        Returns
+        -------
+            : ~nuclear.decay.DecayPropagator
+        """
+        self._get_decay_cache()
+        if method not in self._decay_propagators:
+            self._decay_propagators[method] = DecayPropagator(
+                self.get_decay_solver(method))
+        return self._decay_propagators[method]
+
+    def decay(self, epochs, method='matrix'):
+        """
+        Decay the ejecta material
+
+        Parameters
+        ----------
+
+        epochs: numpy or quantity array
+
+        method: ~str
+            'matrix' evaluates all epochs at once with the decay matrix,
+            'bateman' uses the closed-form Bateman equations (only for
+            networks of linear chains), 'pyne' decays the material with pyne
+            for every epoch [default='matrix']
+
+        Returns
+        -------
+            : ~pd.DataFrame
+            mass fractions relative to the initial ejecta mass
+
+        """
+        epochs = u.Quantity(epochs, u.day)
+        return pd.DataFrame(data=self.decay_raw(epochs.to_value(u.s), method),
+                            index=epochs.value,
+                            columns=self.network.nuc_names)
+
+    def decay_raw(self, epochs_s, method='matrix'):
+        """
+        Unitless fast path of `decay`
+
+        Parameters
+        ----------
+
+        epochs_s: ~np.ndarray
+            epochs in s
+
+        method: ~str
+            see `decay`
+
+        Returns
+        -------
+            : ~np.ndarray
+            mass fractions relative to the initial ejecta mass
+            (n_epochs x n_nuclides) ordered like `get_all_children_nuc_name`
+        """
+        epochs_s = np.atleast_1d(np.asarray(epochs_s, dtype=np.float64))
+        network = self.network
+        if method == 'pyne':
+            return self._decay_pyne(network, epochs_s)
+        decayed_numbers = self.get_decay_propagator(method).decay(
+            self._get_fractions(network) / network.atomic_masses, epochs_s)
+        return decayed_numbers * network.atomic_masses
+
+    def _decay_pyne(self, network, epochs_s):
+        isotope_children = network.nuc_ids.tolist()
+        decayed_fractions = np.empty((len(epochs_s), len(isotope_children)))
+        material = self.to_material()
+        for i, epoch in enumerate(epochs_s):
+            new_material = material.decay(epoch)
+            decayed_fractions[i] = [
+                0.0 if key not in new_material else new_material[key]
+                for key in isotope_children]
+        return decayed_fractions
+
+    def decay_batch(self, compositions, epochs, isotopes=None,
+                    method='matrix'):
+        """
+        Decay many compositions of this ejecta's decay network at once. As
+        decay is linear in the initial abundances this is a single matrix
+        product with the decay propagator.
+
+        Parameters
+        ----------
+
+        compositions: ~np.ndarray
+            initial mass fractions (or masses) with shape
+            (n_samples x n_isotopes); they are not renormalized
+
+        epochs: numpy or quantity array
+
+        isotopes: ~list
+            isotope names of the composition columns; by default all nuclides
+            of the decay network (see `get_all_children_nuc_name`)
+
+        method: ~str
+            see `get_decay_solver`
+
+        Returns
+        -------
+            : ~np.ndarray
+            decayed mass fractions (or masses) with shape
+            (n_samples x n_epochs x n_nuclides) ordered like
+            `get_all_children_nuc_name`
+        """
+        epochs = u.Quantity(epochs, u.day)
+        network = self.network
+        compositions = np.atleast_2d(np.asarray(compositions,
+                                                dtype=np.float64))
+        if isotopes is None:
+            isotope_indices = np.arange(len(network))
+        else:
+            isotope_indices = np.array([
+                network.name_index[nucname.name(isotope)]
+                for isotope in isotopes], dtype=np.int64)
+        if compositions.shape[1] != len(isotope_indices):
+            raise ValueError(f'compositions have {compositions.shape[1]} '
+                             f'columns but {len(isotope_indices)} isotopes '
+                             'are expected')
+
+        initial_numbers = np.zeros((len(compositions), len(network)))
+        initial_numbers[:, isotope_indices] = (
+            compositions / network.atomic_masses[isotope_indices])
+        decayed_numbers = self.get_decay_propagator(method).decay(
+            initial_numbers, epochs.to_value(u.s))
+        return decayed_numbers * network.atomic_masses
+
+    def get_decayed_numbers(self, epochs, method='matrix'):
+        """
+        Number of nuclei of every nuclide in the decay network at the given
+        epochs
+
+        Parameters
+        ----------
+
+        epochs: numpy or quantity array
+
+        method: ~str
+            see `get_decay_solver`
+
+        Returns
+        -------
+            : ~pd.DataFrame
+        """
+        epochs = u.Quantity(epochs, u.day)
+        return pd.DataFrame(
+            data=self.get_decayed_numbers_raw(epochs.to_value(u.s), method),
+            index=epochs.value, columns=self.network.nuc_names)
+
+    def get_decayed_numbers_raw(self, epochs_s, method='matrix'):
+        """
+        Unitless fast path of `get_decayed_numbers`
+
+        Parameters
+        ----------
+
+        epochs_s: ~np.ndarray
+            epochs in s
+
+        method: ~str
+            see `get_decay_solver`
+
+        Returns
+        -------
+            : ~np.ndarray
+            number of nuclei (n_epochs x n_nuclides) ordered like
+            `get_all_children_nuc_name`
+        """
+        network = self.network
+        initial_numbers = (self._get_fractions(network) * self.mass_g /
+                           network.atomic_masses)
+        return self.get_decay_propagator(method).decay(
+            initial_numbers, np.atleast_1d(epochs_s))
+
+    def get_integrated_numbers_raw(self, start_s, end_s):
+        """
+        Time-integrated number of nuclei between `start_s` and `end_s`,
+        computed analytically from the decay matrix
+
+        Parameters
+        ----------
+
+        start_s: ~np.ndarray
+            start of the intervals in s
+
+        end_s: ~np.ndarray
+            end of the intervals in s (broadcast against `start_s`)
+
+        Returns
+        -------
+            : ~np.ndarray
+            integrated number of nuclei in s (n_intervals x n_nuclides)
+            ordered like `get_all_children_nuc_name`
+        """
+        network = self.network
+        initial_numbers = (self._get_fractions(network) * self.mass_g /
+                           network.atomic_masses)
+        return self.get_decay_solver('matrix').integrate(initial_numbers,
+                                                         start_s, end_s)
+
+    def get_integrated_decays_raw(self, start_s, end_s):
+        """
+        Unitless fast path of `get_integrated_decays`
+
+        Parameters
+        ----------
+
+        start_s: ~np.ndarray
+            start of the intervals in s
+
+        end_s: ~np.ndarray
+            end of the intervals in s (broadcast against `start_s`)
+
+        Returns
+        -------
+            : ~np.ndarray
+            number of decays (n_intervals x n_nuclides)
+        """
+        return (self.get_integrated_numbers_raw(start_s, end_s) *
+                self.network.decay_constants)
+
+    def get_integrated_decays(self, start, end):
+        """
+        Number of decays of every nuclide in the decay network between two
+        epochs, computed in closed form instead of integrating
+        `get_decayed_numbers` numerically
+
+        Parameters
+        ----------
+
+        start: numpy or quantity array
+            start of the intervals
+
+        end: numpy or quantity array
+            end of the intervals (broadcast against `start`)
+
+        Returns
+        -------
+            : ~pd.DataFrame
+            number of decays indexed by (start, end) in days
+        """
+        start, end = to_day_intervals(start, end)
+        return pd.DataFrame(
+            data=self.get_integrated_decays_raw(start * day_to_s,
+                                                end * day_to_s),
+            index=pd.MultiIndex.from_arrays([start, end],
+                                            names=['start', 'end']),
+            columns=self.network.nuc_names)
+
+
+class Ejecta(BaseEjecta):
     """
     Radioactive Ejecta composition
 
@@ -48,27 +418,36 @@ class Ejecta(object):
         ----------
 
         **kwargs: key, value pairs
-            like Co56=1e33*u.g
+            like Co56=1e33*u.g; masses without a unit are rejected
 
         """
 
-        mass = sum(kwargs.values()).to(u.Msun)
-        composition = {key : float(value / mass) for key, value in kwargs.items()}
+        masses = u.Quantity(list(kwargs.values())).to_value(u.Msun)
+        mass = masses.sum()
+        composition = dict(zip(kwargs.keys(), (masses / mass).tolist()))
 
-        return cls(mass.value, composition)
+        return cls(mass, composition)
 
     def __init__(self, mass_msol, composition):
         self.mass_g = mass_msol * msun_to_cgs
         self.material = Material(self._normalize_composition(composition))
         self._pad_material()
-        atomic_masses = self.get_masses()
-        self.n_per_g = [1 / atomic_masses[item]
-                            for item in self.get_all_children_nuc_name()]
-
 
     @property
-    def mass(self):
-        return self.mass_g * u.g
+    def network(self):
+        """
+        Decay network of the ejecta material. It is only recomputed when the
+        set of nuclides in the material changes.
+
+        Returns
+        -------
+            : ~nuclear.decay.DecayNetwork
+        """
+        nuc_ids = frozenset(self.material)
+        if getattr(self, '_network_key', None) != nuc_ids:
+            self._network = DecayNetwork.from_nuclides(nuc_ids)
+            self._network_key = nuc_ids
+        return self._network
 
     def __getitem__(self, item):
         return self.material.__getitem__(item)
@@ -83,37 +462,9 @@ class Ejecta(object):
     def isotopes(self):
         return [nucname.name(id) for id in self.keys()]
 
-    def get_decay_constant(self):
-        return OrderedDict((nuc_name, data.decay_const(nuc_id))
-                for nuc_id, nuc_name in zip(self.get_all_children(),
-                                            self.get_all_children_nuc_name()))
-
     def get_half_life(self):
         return [data.half_life(nuc_id) for nuc_id in self.keys()]
 
-    def get_masses(self):
-        return {nuc_name:data.atomic_mass(nuc_id) * u_to_g
-                for nuc_id, nuc_name in zip(self.keys(), self.isotopes)}
-
-    def get_all_children(self):
-        children_set = set()
-        def get_child(nuc_id):
-            children = data.decay_children(nuc_id)
-            if len(children) != 0:
-                children_set.update(children)
-                for child_nuc_id in children:
-                    get_child(child_nuc_id)
-
-        for nuc_id in self.material:
-            children_set.add(nuc_id)
-            get_child(nuc_id)
-
-        return sorted(children_set)
-
-    def get_all_children_nuc_name(self):
-        return [nucname.name(nuc_id) for nuc_id in self.get_all_children()]
-
-
     @staticmethod
     def _normalize_composition(composition):
         composition_sum = np.sum(list(composition.values()))
@@ -127,42 +478,28 @@ class Ejecta(object):
                 self.material[isotope]
             except KeyError:
                 self.material[isotope] = 0.0
+        # padding with descendants does not change the decay network
+        self._network_key = frozenset(self.material)
 
-    def decay(self, epochs):
-        """
-        Decay the ejecta material
+    def _get_fractions(self, network):
+        return np.array([
+            self.material[nuc_id] if nuc_id in self.material else 0.0
+            for nuc_id in network.nuc_ids.tolist()])
 
-        Parameters
-        ----------
+    def to_material(self):
+        return self.material
 
-        epochs: numpy or quantity array
+    def to_array_ejecta(self):
+        """
+        Convert to the compact, array-backed representation
 
         Returns
         -------
-            : ~pd.DataFrame
-
+            : ~ArrayEjecta
         """
-        epochs = u.Quantity(epochs, u.day)
-        isotope_children = self.get_all_children()
-        columns = self.get_all_children_nuc_name()
-        decayed_fractions = pd.DataFrame(index=epochs.value, columns=columns,
-                                       dtype=np.float64)
-        day_to_s = 24 * 3600
-        for epoch, row in decayed_fractions.iterrows():
-            new_material = self.material.decay(epoch * day_to_s)
-            fractions = [0.0 if key not in new_material else new_material[key]
-                         for key in isotope_children]
-            row.values[:] = fractions
-        return decayed_fractions
-
-    def get_decayed_numbers(self, epochs):
-        epochs = u.Quantity(epochs, u.day)
-
-        fractions = self.decay(epochs)
-
-        return fractions * self.mass_g * self.n_per_g
-
-
+        network = self.network
+        return ArrayEjecta(self.mass_g / msun_to_cgs, network,
+                           self._get_fractions(network))
 
     def __repr__(self):
         return self.material.__str__()
@@ -180,3 +517,87 @@ class Ejecta(object):
         return self.get_number()
 
 
+class ArrayEjecta(BaseEjecta):
+    """
+    Compact radioactive ejecta composition: a contiguous float64 vector of
+    mass fractions aligned with the nuclides of a decay network. Parameter
+    updates are plain vector writes (e.g. ``ejecta.fractions[indices] = x``)
+    and the decay engine works on views of the vector. Use `to_material` to
+    get a pyne Material.
+
+    Parameters
+    ----------
+
+    mass_msol: ~float
+        mass in solar masses
+
+    network: ~nuclear.decay.DecayNetwork
+        decay network; the nuclides of the ejecta are fixed to this network
+
+    fractions: ~np.ndarray
+        mass fractions ordered like the network (not normalized)
+        [default=all zero]
+    """
+
+    __slots__ = ('network', 'mass_g', 'fractions', '_decay_cache_network',
+                 '_decay_solvers', '_decay_propagators')
+
+    def __init__(self, mass_msol, network, fractions=None):
+        self.network = network
+        self.mass_g = mass_msol * msun_to_cgs
+        if fractions is None:
+            self.fractions = np.zeros(len(network))
+        else:
+            self.fractions = np.array(fractions, dtype=np.float64)
+            if self.fractions.shape != (len(network), ):
+                raise ValueError(f'fractions need shape ({len(network)},) '
+                                 f'not {self.fractions.shape}')
+
+    def get_index(self, isotope):
+        """
+        Index of an isotope (name or pyne id) in the fraction vector
+
+        Parameters
+        ----------
+
+        isotope: ~str or ~int
+
+        Returns
+        -------
+            : ~int
+        """
+        try:
+            return self.network.name_index[nucname.name(isotope)]
+        except KeyError:
+            raise KeyError(f'{isotope} is not in the decay network')
+
+    def get_indices(self, isotopes):
+        return np.array([self.get_index(isotope) for isotope in isotopes],
+                        dtype=np.int64)
+
+    def __getitem__(self, item):
+        return self.fractions[self.get_index(item)]
+
+    def __setitem__(self, key, value):
+        self.fractions[self.get_index(key)] = value
+
+    def keys(self):
+        return self.network.nuc_ids.tolist()
+
+    @property
+    def isotopes(self):
+        return list(self.network.nuc_names)
+
+    def _get_fractions(self, network):
+        return self.fractions
+
+    def to_material(self):
+        return Material(dict(zip(self.network.nuc_ids.tolist(),
+                                 self.fractions.tolist())))
+
+    def __repr__(self):
+        return '\n'.join(
+            ['ArrayEjecta mass {0:g} g'.format(self.mass_g)] +
+            ['{0:<8}{1:g}'.format(nuc_name, fraction)
+             for nuc_name, fraction in zip(self.network.nuc_names,
+                                           self.fractions)])
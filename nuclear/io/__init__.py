@@ -1 +1 @@
-
+from nuclear.io.nndc import get_decay_radiation, get_decay_radiation_many
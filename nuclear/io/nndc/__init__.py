@@ -1,3 +1,7 @@
 from nuclear.io.nndc.base import (store_decay_radiation,
                                   download_decay_radiation,
-                                  get_decay_radiation_database)
\ No newline at end of file
+                                  get_decay_radiation_database,
+                                  get_available_isotopes,
+                                  get_decay_radiation,
+                                  get_decay_radiation_many,
+                                  reparse_decay_radiation_database)
@@ -1,12 +1,21 @@
 import urllib.request, urllib.error, urllib.parse
+import hashlib
+import json
 import os
 import re
+import shutil
+import tempfile
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 import logging
 from astropy import units as u
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
-import bs4
 import pandas as pd
 
 import pathlib
@@ -15,6 +24,7 @@ import pathlib
 
 from nuclear.config import get_data_dir
 from nuclear.io.nndc.parsers import decay_radiation_parsers, uncertainty_parser
+from nuclear.io.nndc.tokenizer import table_to_dataframe, tokenize_nndc_page
 
 TARDISNUCLEAR_DATA_DIR = pathlib.Path(get_data_dir())
 import datetime
@@ -25,9 +35,6 @@ NNDC_DECAY_RADIATION_BASE_URL = (
     "http://www.nndc.bnl.gov/nudat3/" "decaysearchdirect.jsp?nuc={nucname}&unc=nds"
 )
 
-NNDC_ARTIFICIAL_DATASET_TAG = "NNDC_DATASET_SPLITTER"
-
-
 def _get_nuclear_database_path():
     if not TARDISNUCLEAR_DATA_DIR.exists():
         os.mkdir(TARDISNUCLEAR_DATA_DIR)
@@ -54,7 +61,7 @@ def _sanitize_isotope_string(isotope_string):
         return sanitized_isotope_string
 
 
-def construct_decay_radiation_url(isotope_string):
+def construct_decay_radiation_url(isotope_string, base_url=NNDC_DECAY_RADIATION_BASE_URL):
     """
     Construct the URL for downloading the decay_radiation
     Returns
@@ -63,45 +70,247 @@ def construct_decay_radiation_url(isotope_string):
     """
     isotope_string = _sanitize_isotope_string(isotope_string)
 
-    return NNDC_DECAY_RADIATION_BASE_URL.format(nucname=isotope_string.upper())
+    return base_url.format(nucname=isotope_string.upper())
+
+
+def _get_raw_page_cache_dir():
+    return TARDISNUCLEAR_DATA_DIR / "nndc_raw_pages"
+
+
+def _get_raw_page_cache_entry_path(url):
+    url_hash = hashlib.sha256(url.encode()).hexdigest()
+    return _get_raw_page_cache_dir() / "index" / f"{url_hash}.json"
+
+
+def _get_raw_page_cache_object_path(page_hash):
+    return _get_raw_page_cache_dir() / "objects" / page_hash
+
+
+def _write_atomic(fname, content):
+    fname.parent.mkdir(parents=True, exist_ok=True)
+    # a unique file for every writer (the download threads share a pid)
+    tmp_fd, tmp_fname = tempfile.mkstemp(
+        prefix=f"{fname.name}.", suffix=".tmp", dir=fname.parent
+    )
+    try:
+        with os.fdopen(tmp_fd, "wb") as fh:
+            fh.write(content)
+        os.replace(tmp_fname, fname)
+    except BaseException:
+        if os.path.exists(tmp_fname):
+            os.unlink(tmp_fname)
+        raise
+
+
+def read_cached_raw_decay_radiation_page(url):
+    """
+    Read a raw NNDC page from the local page cache
+
+    Parameters
+    ----------
+    url: str
+
+    Returns
+    -------
+    page: bytes or None
+        None if the page is not cached (or the cached copy is corrupt)
+    entry: dict or None
+        url, sha256 of the page, download-timestamp and the etag and
+        last-modified headers of the response
+    """
+    entry_fname = _get_raw_page_cache_entry_path(url)
+    if not entry_fname.exists():
+        return None, None
+    with open(entry_fname) as fh:
+        entry = json.load(fh)
+    object_fname = _get_raw_page_cache_object_path(entry["sha256"])
+    if not object_fname.exists():
+        return None, None
+    page = object_fname.read_bytes()
+    if hashlib.sha256(page).hexdigest() != entry["sha256"]:
+        logger.warning(f"Cached page of {url} is corrupt - ignoring it")
+        return None, None
+    return page, entry
+
+
+def write_cached_raw_decay_radiation_page(
+    url, page, download_timestamp, etag=None, last_modified=None
+):
+    """
+    Add a raw NNDC page to the local page cache. Pages are stored once per
+    content hash and indexed by URL.
+
+    Parameters
+    ----------
+    url: str
+    page: bytes
+    download_timestamp: str
+    etag: str, optional
+    last_modified: str, optional
+
+    Returns
+    -------
+    entry: dict
+    """
+    page_hash = hashlib.sha256(page).hexdigest()
+    object_fname = _get_raw_page_cache_object_path(page_hash)
+    if not object_fname.exists():
+        _write_atomic(object_fname, page)
+    entry = {
+        "url": url,
+        "sha256": page_hash,
+        "download-timestamp": download_timestamp,
+        "etag": etag,
+        "last-modified": last_modified,
+    }
+    _write_atomic(
+        _get_raw_page_cache_entry_path(url), json.dumps(entry, indent=1).encode()
+    )
+    return entry
+
+
+def fetch_decay_radiation_page(
+    isotope_string,
+    base_url=NNDC_DECAY_RADIATION_BASE_URL,
+    use_cache=True,
+    offline=False,
+    refresh=False,
+):
+    """
+    Get the raw decay radiation page of an isotope, from the local page cache
+    if possible and from NNDC otherwise
+
+    Parameters
+    ----------
+    isotope_string: str
+    base_url: str
+        URL template with a `{nucname}` field [default: NNDC]
+    use_cache: bool
+        serve cached pages and cache downloaded pages [default: True]
+    offline: bool
+        only serve pages from the cache, never access the network
+        [default: False]
+    refresh: bool
+        revalidate cached pages with NNDC. The page is only downloaded again
+        if it changed according to its ETag/Last-Modified headers.
+        [default: False]
+
+    Returns
+    -------
+    page: bytes
+    download_timestamp: str
+    """
+    nndc_data_url = construct_decay_radiation_url(isotope_string, base_url)
+    page, entry = None, None
+    if use_cache or offline:
+        page, entry = read_cached_raw_decay_radiation_page(nndc_data_url)
+
+    if offline:
+        if page is None:
+            raise IOError(f"{nndc_data_url} is not in the page cache (offline)")
+        return page, entry["download-timestamp"]
+    if page is not None and not refresh:
+        logger.info(f"Using cached page of {nndc_data_url}")
+        return page, entry["download-timestamp"]
+
+    request = urllib.request.Request(nndc_data_url)
+    if page is not None:
+        if entry["etag"] is not None:
+            request.add_header("If-None-Match", entry["etag"])
+        if entry["last-modified"] is not None:
+            request.add_header("If-Modified-Since", entry["last-modified"])
+
+    logger.info(f"Downloading data from {nndc_data_url}")
+    try:
+        with urllib.request.urlopen(request) as response:
+            new_page = response.read()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and page is not None:
+            logger.info(f"Cached page of {nndc_data_url} is up to date")
+            return page, entry["download-timestamp"]
+        raise
+    download_timestamp = str(datetime.datetime.utcnow())
+    if use_cache:
+        write_cached_raw_decay_radiation_page(
+            nndc_data_url, new_page, download_timestamp, etag, last_modified
+        )
+    return new_page, download_timestamp
+
 
+def fetch_raw_decay_radiation_page(
+    isotope_string, base_url=NNDC_DECAY_RADIATION_BASE_URL, **kwargs
+):
+    """
+    Get the raw decay radiation page of an isotope
 
-def download_raw_decay_radiation(isotope_string):
+    Parameters
+    ----------
+    isotope_string: str
+    base_url: str
+        URL template with a `{nucname}` field [default: NNDC]
+    kwargs:
+        use_cache, offline and refresh (see `fetch_decay_radiation_page`)
+
+    Returns
+    -------
+    page: bytes
+    """
+    return fetch_decay_radiation_page(isotope_string, base_url, **kwargs)[0]
+
+
+def download_raw_decay_radiation(
+    isotope_string, base_url=NNDC_DECAY_RADIATION_BASE_URL, **kwargs
+):
     """
     Download the dataset from NNDC. Splitup the page into different dataset
     types. Return a list of dictionaries that contains a dataset for list entry
     Parameters
     ----------
     isotope_string: str
+    kwargs:
+        use_cache, offline and refresh (see `fetch_decay_radiation_page`)
 
     Returns
     -------
     datasets: dict
     """
-    nndc_data_url = construct_decay_radiation_url(isotope_string)
-    logger.info(f"Downloading data from {nndc_data_url}")
-    nuclear_bs = bs4.BeautifulSoup(
-        urllib.request.urlopen(nndc_data_url), features="lxml"
+    return split_raw_decay_radiation_page(
+        *fetch_decay_radiation_page(isotope_string, base_url, **kwargs)
     )
 
-    for utag in nuclear_bs.find_all("u"):
-        utag.insert_before(NNDC_ARTIFICIAL_DATASET_TAG)
 
-    split_raw_dataset = str(nuclear_bs).split(NNDC_ARTIFICIAL_DATASET_TAG)
+def split_raw_decay_radiation_page(page, download_timestamp=None):
+    """
+    Splitup a raw NNDC page into different dataset types. Return a list of
+    dictionaries that contains a dataset for list entry. The page is walked
+    only once; every dataset type maps to its tokenized section.
+
+    Parameters
+    ----------
+    page: bytes or str
+    download_timestamp: str
+        [default: now]
 
+    Returns
+    -------
+    datasets: list
+    """
     datasets = []
     cur_dataset = {}
-    for data_portion in split_raw_dataset[1:]:
-        data_portion = bs4.BeautifulSoup(data_portion, features="lxml")
-        data_type = data_portion.find("u").text
+    for section in tokenize_nndc_page(page)[1:]:
+        data_type = section.heading
         if data_type.startswith("Result"):
             continue
         if data_type.startswith("Dataset"):
             if len(cur_dataset) > 0:
                 datasets.append(cur_dataset)
             cur_dataset = {}
-        cur_dataset[data_type] = str(data_portion)
-    cur_dataset["download-timestamp"] = str(datetime.datetime.utcnow())
+        cur_dataset[data_type] = section
+    if download_timestamp is None:
+        download_timestamp = str(datetime.datetime.utcnow())
+    cur_dataset["download-timestamp"] = download_timestamp
     datasets.append(cur_dataset)
     return datasets
 
@@ -115,7 +324,8 @@ def parse_decay_radiation_dataset(decay_rad_dataset_dict):
 
     Parameters
     ----------
-    decay_rad_dataset_dict
+    decay_rad_dataset_dict: dict
+        dataset type: NNDCSection (see `split_raw_decay_radiation_page`)
 
     Returns
     -------
@@ -144,19 +354,12 @@ def parse_decay_radiation_dataset(decay_rad_dataset_dict):
             parser = decay_radiation_parsers[data_type]
             dataset.append(parser.parse(data_portion))
         elif data_type == "Authors":
-            author_bs = bs4.BeautifulSoup(data_portion, "lxml")
-            meta["authors"] = author_bs.find("body").text.split(":")[1].strip()
+            meta["authors"] = data_portion.text.split(":")[1].strip()
         elif data_type == "Citation":
-            citation_bs = bs4.BeautifulSoup(data_portion, "lxml")
-            citation_data = (
-                citation_bs.find("body").text.split(":")[1].split("Parent")[0]
-            )
+            citation_data = data_portion.text.split(":")[1].split("Parent")[0]
             meta["citation"] = citation_data[:-1]
-            decay_table = data_portion.split("</p>", 1)[1]
-            decay_table = decay_table.split("<p></p>")[0]
-            decay_table_df = pd.read_html(decay_table)[0]
-            decay_table_df.columns = decay_table_df.iloc[0]
-            decay_table_df = decay_table_df.drop(decay_table_df.index[0])
+            decay_table = data_portion.tables[0]
+            decay_table_df = table_to_dataframe(decay_table[1:], decay_table[0])
             for column in decay_table_df:
                 if column != "DecayScheme" and column != "ENSDFfile":
                     if column == "Parent T1/2" or column == "GS-GS Q-value (keV)":
@@ -180,21 +383,47 @@ def parse_decay_radiation_dataset(decay_rad_dataset_dict):
     return full_dataset, meta
 
 
-def download_decay_radiation(isotope_string):
+def download_decay_radiation(
+    isotope_string, base_url=NNDC_DECAY_RADIATION_BASE_URL, **kwargs
+):
     """
     Download and parse decay radiation from NNDC
 
     Parameters
     ----------
     isotope_string
+    kwargs:
+        use_cache, offline and refresh (see `fetch_decay_radiation_page`)
 
     Returns
     -------
 
     """
     isotope_string = _sanitize_isotope_string(isotope_string)
-    raw_datasets = download_raw_decay_radiation(isotope_string)
-    # print(raw_datasets)
+    return parse_decay_radiation_page(
+        isotope_string,
+        *fetch_decay_radiation_page(isotope_string, base_url, **kwargs)
+    )
+
+
+def parse_decay_radiation_page(isotope_string, page, download_timestamp=None):
+    """
+    Parse a raw NNDC decay radiation page
+
+    Parameters
+    ----------
+    isotope_string: str
+    page: bytes or str
+    download_timestamp: str
+        [default: now]
+
+    Returns
+    -------
+    decay_radiation: pandas.DataFrame
+    meta: pandas.DataFrame
+    """
+    isotope_string = _sanitize_isotope_string(isotope_string)
+    raw_datasets = split_raw_decay_radiation_page(page, download_timestamp)
     decay_radiation, meta = parse_decay_radiation_dataset(raw_datasets[-1])
     meta = pd.Series(meta).to_frame().reset_index()
     meta.columns = ["key", "value"]
@@ -204,32 +433,197 @@ def download_decay_radiation(isotope_string):
     return decay_radiation.set_index("isotope"), meta.set_index("isotope")
 
 
-def update_decay_radiation_from_ejecta(ejecta, force_update=False):
+def update_decay_radiation_from_ejecta(
+    ejecta, force_update=False, max_workers=8, offline=False
+):
     """
     Check if all isotopes of a given ejecta are in the database and
     download if necessary.
 
     :param ejecta:
     :param force_update:
-    :return:
+    :param max_workers: number of concurrent downloads
+    :param offline: only use pages from the local page cache
+    :return: dict of isotope: exception for the isotopes that were skipped
+    """
+
+    return store_decay_radiation_many(
+        ejecta.get_all_children_nuc_name(),
+        force_update=force_update,
+        max_workers=max_workers,
+        offline=offline,
+    )
+
+
+def reparse_decay_radiation_database(isotopes=None, parse_workers=None):
+    """
+    Parse the cached raw pages again and replace the isotopes in the database,
+    e.g. after a parser fix. This never accesses the network.
+
+    Parameters
+    ----------
+    isotopes: list, optional
+        [default: all isotopes in the database]
+    parse_workers: int
+        see `store_decay_radiation_many`
+
+    Returns
+    -------
+    errors: dict
+        isotope: exception for every isotope that could not be reparsed
+    """
+    if isotopes is None:
+        isotopes = sorted(get_available_isotopes())
+    return store_decay_radiation_many(
+        isotopes, force_update=True, parse_workers=parse_workers, offline=True
+    )
+
+
+def store_decay_radiation_many(
+    isotopes,
+    force_update=False,
+    max_workers=8,
+    parse_workers=None,
+    atomic=True,
+    base_url=NNDC_DECAY_RADIATION_BASE_URL,
+    use_cache=True,
+    offline=False,
+    refresh=False,
+):
     """
+    Download, parse and store the decay radiation of many isotopes. Pages are
+    fetched concurrently by a bounded thread pool (or served from the local
+    page cache), parsed in a process pool and all results are committed to
+    the database in a single write.
 
-    for isotope in ejecta.get_all_children_nuc_name():
-        print("Working on isotope", isotope)
+    Parameters
+    ----------
+    isotopes: list
+    force_update: bool
+        replace isotopes that are already in the database
+    max_workers: int
+        number of concurrent downloads [default: 8]
+    parse_workers: int
+        number of parsing processes; 0 parses in this process
+        [default: number of CPUs]
+    atomic: bool
+        see `store_decay_radiation` [default: True]
+    base_url: str
+        URL template with a `{nucname}` field [default: NNDC]
+    use_cache, offline, refresh: bool
+        see `fetch_decay_radiation_page`
+
+    Returns
+    -------
+    errors: dict
+        isotope: exception for every isotope that could not be stored
+    """
+    errors = {}
+    isotope_strings = []
+    for isotope in isotopes:
         try:
-            store_decay_radiation(isotope, force_update=force_update)
-        except IOError as e:
-            print(str(e))
-            print("skipping")
+            isotope_string = _sanitize_isotope_string(isotope)
+        except ValueError as e:
+            errors[isotope] = e
+            continue
+        if isotope_string not in isotope_strings:
+            isotope_strings.append(isotope_string)
+
+    if not force_update:
+        available_isotopes = get_available_isotopes()
+        for isotope_string in isotope_strings:
+            if isotope_string in available_isotopes:
+                logger.info(
+                    f"{isotope_string} is already in the database "
+                    "(force_update to overwrite)"
+                )
+        isotope_strings = [
+            isotope_string
+            for isotope_string in isotope_strings
+            if isotope_string not in available_isotopes
+        ]
 
+    pages = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as download_pool:
+        futures = {
+            download_pool.submit(
+                fetch_decay_radiation_page,
+                isotope_string,
+                base_url,
+                use_cache=use_cache,
+                offline=offline,
+                refresh=refresh,
+            ): isotope_string
+            for isotope_string in isotope_strings
+        }
+        for future in as_completed(futures):
+            isotope_string = futures[future]
+            try:
+                pages[isotope_string] = future.result()
+            except Exception as e:
+                logger.warning(f"Downloading {isotope_string} failed: {e}")
+                errors[isotope_string] = e
 
-def store_decay_radiation(isotope_string, force_update=False):
+    parse_results = {}
+    downloaded_isotopes = [
+        isotope_string for isotope_string in isotope_strings if isotope_string in pages
+    ]
+    if parse_workers == 0:
+        for isotope_string in downloaded_isotopes:
+            try:
+                parse_results[isotope_string] = parse_decay_radiation_page(
+                    isotope_string, *pages[isotope_string]
+                )
+            except Exception as e:
+                logger.warning(f"Parsing {isotope_string} failed: {e}")
+                errors[isotope_string] = e
+    else:
+        with ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+            futures = {
+                isotope_string: parse_pool.submit(
+                    parse_decay_radiation_page, isotope_string, *pages[isotope_string]
+                )
+                for isotope_string in downloaded_isotopes
+            }
+            for isotope_string, future in futures.items():
+                try:
+                    parse_results[isotope_string] = future.result()
+                except Exception as e:
+                    logger.warning(f"Parsing {isotope_string} failed: {e}")
+                    errors[isotope_string] = e
+
+    decay_radiation = [
+        isotope_decay_radiation for isotope_decay_radiation, _ in parse_results.values()
+    ]
+    meta = [isotope_meta for _, isotope_meta in parse_results.values()]
+    if len(decay_radiation) > 0:
+        commit_decay_radiation(
+            pd.concat(decay_radiation), pd.concat(meta), atomic=atomic
+        )
+    return errors
+
+
+def store_decay_radiation(isotope_string, force_update=False, atomic=True, **kwargs):
     """
+    Download the decay radiation of an isotope and add it to the database.
+    Only the rows of this isotope are appended (or replaced) - the rest of the
+    database is not rewritten.
 
     Parameters
     ----------
-    isotope_string
-    force_update
+    isotope_string: str
+    force_update: bool
+        replace the isotope if it is already in the database
+    atomic: bool
+        apply the update to a copy of the database that replaces the database
+        only once the update succeeded, so that an interrupted update never
+        corrupts it. Copying makes every update as expensive as the whole
+        database - store many isotopes with `store_decay_radiation_many`
+        (one copy per batch), or set False to append the rows in place at
+        the risk of losing the isotope if the update is interrupted.
+        [default: True]
+    kwargs:
+        use_cache, offline and refresh (see `fetch_decay_radiation_page`)
 
     Returns
     -------
@@ -237,56 +631,482 @@ def store_decay_radiation(isotope_string, force_update=False):
     """
 
     isotope_string = _sanitize_isotope_string(isotope_string)
-    db_fname = _get_nuclear_database_path()
-    if not db_fname.exists():
-        file_exists = False
-        data_exists = False
-    else:
-        file_exists = True
-        decay_radiation_db = pd.read_hdf(db_fname, "decay_radiation")
-        if isotope_string in decay_radiation_db.index:
-            data_exists = True
-        else:
-            data_exists = False
+    data_exists = isotope_string in get_available_isotopes()
 
     if data_exists and not force_update:
         logger.warning(
             f"{isotope_string} is already in the database "
             "(force_update to overwrite)"
         )
+        return
+
+    new_decay_radiation, new_meta = download_decay_radiation(
+        isotope_string, **kwargs
+    )
+    commit_decay_radiation(new_decay_radiation, new_meta, atomic=atomic)
 
-    new_decay_radiation, new_meta = download_decay_radiation(isotope_string)
 
-    if file_exists:
-        decay_radiation = pd.read_hdf(db_fname, "decay_radiation")
-        meta = pd.read_hdf(db_fname, "metadata")
-        if data_exists and force_update:
-            decay_radiation.drop(isotope_string, axis=0, inplace=True)
-            meta.drop(isotope_string, axis=0, inplace=True)
+HDF_MIN_ITEMSIZE = {
+    "decay_radiation": {
+        "index": 16,
+        "type": 16,
+        "heading": 64,
+        "download-timestamp": 32,
+    },
+    "metadata": {"index": 16, "key": 64, "value": 1024},
+    "energy_per_decay": {"index": 16},
+    "em_cumulative_energy_per_decay": {"index": 16},
+}
 
-        decay_radiation = decay_radiation.append(new_decay_radiation)
-        meta = meta.append(new_meta)
-    else:
-        decay_radiation = new_decay_radiation
-        meta = new_meta
+# tables derived from the decay radiation (see `summarize_decay_radiation`)
+SUMMARY_KEYS = ["energy_per_decay", "em_cumulative_energy_per_decay"]
 
-    with pd.HDFStore(db_fname, mode="w") as decay_radiation_db:
-        decay_radiation_db["metadata"] = meta
-        decay_radiation_db["decay_radiation"] = decay_radiation
+
+def _put_table(decay_radiation_db, key, table):
+    min_itemsize = {
+        column: itemsize
+        for column, itemsize in HDF_MIN_ITEMSIZE[key].items()
+        if column == "index" or column in table.columns
+    }
+    # table format so that single isotopes can be queried by index
+    decay_radiation_db.put(key, table, format="table", min_itemsize=min_itemsize)
+
+
+def _get_isotope_coordinates(decay_radiation_db, key, isotopes):
+    # row numbers instead of a where="index in [...]" condition: pandas turns
+    # conditions with more than 31 values into a filter, which `select`
+    # applies after reading the whole table and `remove` ignores (and then
+    # removes every row)
+    isotope_index = decay_radiation_db.select_column(key, "index")
+    return np.flatnonzero(isotope_index.isin(list(isotopes)).values)
 
 
-def get_decay_radiation_database():
+def _replace_isotope_rows(decay_radiation_db, key, table):
+    """
+    Replace the rows of all isotopes in `table` in the stored table `key`.
+    Rows are appended in place; the stored table is only rewritten if the
+    new rows do not fit its layout (new columns or longer strings) or if it
+    is still in fixed format.
+    """
+    isotopes = sorted(set(table.index))
+    if key not in decay_radiation_db:
+        _put_table(decay_radiation_db, key, table)
+        return
+
+    if not decay_radiation_db.get_storer(key).is_table:
+        existing_table = decay_radiation_db[key]
+        existing_table = existing_table[~existing_table.index.isin(isotopes)]
+        _put_table(decay_radiation_db, key, pd.concat([existing_table, table]))
+        return
+
+    coordinates = _get_isotope_coordinates(decay_radiation_db, key, isotopes)
+    if len(coordinates) > 0:
+        decay_radiation_db.remove(key, where=coordinates)
+    stored_columns = decay_radiation_db.select(key, stop=0).columns
+    if set(table.columns) <= set(stored_columns):
+        try:
+            decay_radiation_db.append(key, table.reindex(columns=stored_columns))
+        except ValueError:
+            logger.info(f"New rows do not fit the layout of {key} - rewriting it")
+        else:
+            return
+    _put_table(decay_radiation_db, key, pd.concat([decay_radiation_db[key], table]))
+
+
+def _remove_isotope_rows(decay_radiation_db, key, isotopes):
+    if key in decay_radiation_db and len(isotopes) > 0:
+        coordinates = _get_isotope_coordinates(decay_radiation_db, key, isotopes)
+        if len(coordinates) > 0:
+            decay_radiation_db.remove(key, where=coordinates)
+
+
+def _write_summary_tables(decay_radiation_db, decay_radiation, isotopes):
+    summary_tables = summarize_decay_radiation(decay_radiation)
+    for key, summary_table in zip(SUMMARY_KEYS, summary_tables):
+        _remove_isotope_rows(decay_radiation_db, key, isotopes)
+        if len(summary_table) > 0:
+            _replace_isotope_rows(decay_radiation_db, key, summary_table)
+
+
+def _write_isotope_tables(decay_radiation_db, decay_radiation, meta):
+    _replace_isotope_rows(decay_radiation_db, "decay_radiation", decay_radiation)
+    _replace_isotope_rows(decay_radiation_db, "metadata", meta)
+    _write_summary_tables(decay_radiation_db, decay_radiation, set(meta.index))
+
+
+def commit_decay_radiation(decay_radiation, meta, atomic=True):
+    """
+    Write decay radiation and metadata of one or more isotopes to the
+    database, replacing earlier entries of these isotopes. HDF5 does not
+    reclaim the space of removed rows, so the file grows with every replaced
+    isotope; rewrite it with `ptrepack` to compact it.
+
+    Parameters
+    ----------
+    decay_radiation: pandas.DataFrame
+        indexed by isotope
+    meta: pandas.DataFrame
+        indexed by isotope
+    atomic: bool
+        see `store_decay_radiation` [default: True]
+    """
+    db_fname = _get_nuclear_database_path()
+    if not atomic:
+        with pd.HDFStore(db_fname, mode="a") as decay_radiation_db:
+            _write_isotope_tables(decay_radiation_db, decay_radiation, meta)
+        return
+
+    # a unique copy for every writer
+    tmp_fd, tmp_db_fname = tempfile.mkstemp(
+        prefix=f"{db_fname.name}.", suffix=".tmp", dir=db_fname.parent
+    )
+    os.close(tmp_fd)
+    tmp_db_fname = pathlib.Path(tmp_db_fname)
+    try:
+        if db_fname.exists():
+            # content and permissions (mkstemp creates the file private)
+            shutil.copy(db_fname, tmp_db_fname)
+            mode = "a"
+        else:
+            mode = "w"
+        with pd.HDFStore(tmp_db_fname, mode=mode) as decay_radiation_db:
+            _write_isotope_tables(decay_radiation_db, decay_radiation, meta)
+    except BaseException:
+        if tmp_db_fname.exists():
+            tmp_db_fname.unlink()
+        raise
+    os.replace(tmp_db_fname, db_fname)
+
+
+def _get_database_signature(db_fname):
+    db_stat = db_fname.stat()
+    return db_stat.st_mtime_ns, db_stat.st_size
+
+
+def get_database_signature():
+    """
+    Signature of the current state of the decay radiation database, that
+    changes whenever the database is written
+
+    Returns
+    -------
+    signature: tuple or None
+        None if there is no database
+    """
+    db_fname = _get_nuclear_database_path()
+    if not db_fname.exists():
+        return None
+    return _get_database_signature(db_fname)
+
+
+_available_isotopes_cache = {}
+
+
+def get_available_isotopes():
+    """
+    Isotopes in the decay radiation database. Only the index of the small
+    metadata table is read and kept in memory until the database file changes.
+
+    Returns
+    -------
+    available_isotopes: frozenset
+    """
+    db_fname = _get_nuclear_database_path()
+    if not db_fname.exists():
+        return frozenset()
+    db_signature = _get_database_signature(db_fname)
+    cached_signature, available_isotopes = _available_isotopes_cache.get(
+        db_fname, (None, None)
+    )
+    if cached_signature != db_signature:
+        with pd.HDFStore(db_fname, mode="r") as decay_radiation_db:
+            if decay_radiation_db.get_storer("metadata").is_table:
+                isotope_index = decay_radiation_db.select_column("metadata", "index")
+            else:
+                isotope_index = decay_radiation_db["metadata"].index
+        available_isotopes = frozenset(isotope_index)
+        _available_isotopes_cache[db_fname] = (db_signature, available_isotopes)
+    return available_isotopes
+
+
+def _select_isotopes(decay_radiation_db, key, isotopes):
+    if decay_radiation_db.get_storer(key).is_table:
+        coordinates = _get_isotope_coordinates(decay_radiation_db, key, isotopes)
+        if len(coordinates) == 0:
+            # empty coordinates select every row
+            return decay_radiation_db.select(key, stop=0)
+        return decay_radiation_db.select(key, where=coordinates)
+    logger.warning(
+        f"{key} is stored in fixed format and is read completely - "
+        "store an isotope with force_update to convert the database"
+    )
+    table = decay_radiation_db[key]
+    return table[table.index.isin(isotopes)]
+
+
+def get_decay_radiation_database(isotopes=None):
     """
     Loads and returns the nuclear decay radiation database and returns the
     database and metadata
 
+    Parameters
+    ----------
+    isotopes: list, optional
+        only load these isotopes from the database [default: all isotopes]
+
     Returns
     -------
     decay_radiation_db: pandas.DataFrame
     meta: pandas.DataFrame
     """
 
-    decay_radiation_db = pd.read_hdf(_get_nuclear_database_path(), "decay_radiation")
-    meta = pd.read_hdf(_get_nuclear_database_path(), "metadata")
+    with pd.HDFStore(_get_nuclear_database_path(), mode="r") as decay_radiation_db:
+        if isotopes is None:
+            return decay_radiation_db["decay_radiation"], decay_radiation_db["metadata"]
+
+        isotopes = [_sanitize_isotope_string(isotope) for isotope in isotopes]
+        return (
+            _select_isotopes(decay_radiation_db, "decay_radiation", isotopes),
+            _select_isotopes(decay_radiation_db, "metadata", isotopes),
+        )
+
+
+KEV_TO_ERG = u.keV.to(u.erg)
+
+# decay radiation channel of the tables (the table of x-rays and gamma-rays
+# is split by type)
+DECAY_RADIATION_CHANNELS = {
+    "Electrons": "electrons",
+    "Beta+": "beta_plus",
+    "Beta-": "beta_minus",
+}
+
+
+def _decay_radiation_to_cgs(decay_radiation):
+    decay_radiation = decay_radiation.copy()
+    for column in ["energy", "energy_unc", "end_point_energy", "end_point_energy_unc"]:
+        if column in decay_radiation.columns:
+            decay_radiation[column] = decay_radiation[column] * KEV_TO_ERG
+    for column in ["intensity", "intensity_unc"]:
+        if column in decay_radiation.columns:
+            decay_radiation[column] = decay_radiation[column] / 100.0
+    return decay_radiation
+
+
+def _get_decay_radiation_channels(decay_radiation):
+    channel = decay_radiation["type"]
+    if "heading" in decay_radiation.columns:
+        channel = (
+            decay_radiation["heading"].map(DECAY_RADIATION_CHANNELS).fillna(channel)
+        )
+    return channel.values
+
+
+def get_decay_radiation_many(isotopes):
+    """
+    Decay radiation of several isotopes read from the database in a single
+    query and split into the channels electrons, beta_plus, beta_minus,
+    x_rays and gamma_rays. Energies are converted to erg and intensities to
+    fractions per decay.
+
+    Parameters
+    ----------
+    isotopes: list
+
+    Returns
+    -------
+    decay_radiation: dict
+        isotope: {channel: pandas.DataFrame}; isotopes that are not in the
+        database map to empty dicts
+    """
+    isotopes = [_sanitize_isotope_string(isotope) for isotope in isotopes]
+    decay_radiation = {isotope: {} for isotope in isotopes}
+    available_isotopes = get_available_isotopes()
+    stored_isotopes = sorted(set(isotopes) & available_isotopes)
+    if len(stored_isotopes) == 0:
+        return decay_radiation
+
+    with pd.HDFStore(_get_nuclear_database_path(), mode="r") as decay_radiation_db:
+        table = _select_isotopes(decay_radiation_db, "decay_radiation", stored_isotopes)
+    table = _decay_radiation_to_cgs(table)
+    for (isotope, channel), channel_table in table.groupby(
+        [table.index, _get_decay_radiation_channels(table)], sort=False
+    ):
+        decay_radiation[isotope][channel] = channel_table.reset_index(drop=True)
+    return decay_radiation
+
+
+def get_decay_radiation(isotope_string, force_update=False):
+    """
+    Decay radiation of an isotope split into channels (see
+    `get_decay_radiation_many`). The isotope is downloaded if it is not in
+    the database.
+
+    Parameters
+    ----------
+    isotope_string: str
+    force_update: bool
+        download the isotope even if it is in the database
+
+    Returns
+    -------
+    decay_radiation: dict
+        channel: pandas.DataFrame
+    """
+    isotope_string = _sanitize_isotope_string(isotope_string)
+    if force_update or isotope_string not in get_available_isotopes():
+        store_decay_radiation(isotope_string, force_update=force_update)
+    return get_decay_radiation_many([isotope_string])[isotope_string]
+
+
+ENERGY_PER_DECAY_CHANNELS = ["electrons", "beta_plus", "beta_minus", "x_rays", "gamma_rays"]
+LEPTON_CHANNELS = ["beta_plus", "beta_minus", "electrons"]
+EM_CHANNELS = ["x_rays", "gamma_rays"]
+
+
+def summarize_decay_radiation(decay_radiation):
+    """
+    Derive the compact energy tables of the database from the decay radiation
+    of one or more isotopes (as stored: energies in keV, intensities in
+    percent)
+
+    Parameters
+    ----------
+    decay_radiation: pandas.DataFrame
+        indexed by isotope
+
+    Returns
+    -------
+    energy_per_decay: pandas.DataFrame
+        total energy per decay in erg of every channel
+        (total_<channel>_energy_per_decay; NaN if the isotope has no such
+        radiation) and of all leptons (total_lepton_energy_per_decay),
+        indexed by isotope
+    em_cumulative_energy_per_decay: pandas.DataFrame
+        x-ray and gamma-ray lines of every isotope sorted by `energy` (erg)
+        with the energy per decay of all lines up to and including this line
+        (`cumulative_energy_per_decay`), indexed by isotope
+    """
+    total_columns = [
+        f"total_{channel}_energy_per_decay"
+        for channel in ENERGY_PER_DECAY_CHANNELS + ["lepton"]
+    ]
+    if not {"energy", "intensity", "type"} <= set(decay_radiation.columns):
+        return (
+            pd.DataFrame(columns=total_columns, dtype=float),
+            pd.DataFrame(columns=["energy", "cumulative_energy_per_decay"], dtype=float),
+        )
+
+    decay_radiation = _decay_radiation_to_cgs(decay_radiation)
+    isotopes = decay_radiation.index.values
+    channels = _get_decay_radiation_channels(decay_radiation)
+    energy_per_decay = (decay_radiation.energy * decay_radiation.intensity).values
+
+    totals = (
+        pd.Series(energy_per_decay)
+        .groupby([isotopes, channels])
+        .sum()
+        .unstack()
+        .reindex(columns=ENERGY_PER_DECAY_CHANNELS)
+    )
+    totals["lepton"] = totals[LEPTON_CHANNELS].sum(axis=1)
+    totals.columns = total_columns
+    totals.index.name = decay_radiation.index.name
 
-    return decay_radiation_db, meta
+    em_lines = pd.DataFrame(
+        {
+            "isotope": isotopes,
+            "energy": decay_radiation.energy.values,
+            "energy_per_decay": energy_per_decay,
+        }
+    )[np.isin(channels, EM_CHANNELS)]
+    em_lines = em_lines.sort_values(["isotope", "energy"], kind="mergesort")
+    em_lines["cumulative_energy_per_decay"] = (
+        em_lines["energy_per_decay"].fillna(0.0).groupby(em_lines["isotope"]).cumsum()
+    )
+    em_lines = em_lines.set_index("isotope")[["energy", "cumulative_energy_per_decay"]]
+    em_lines.index.name = decay_radiation.index.name
+    return totals.astype(float), em_lines
+
+
+def update_decay_radiation_summary(isotopes=None):
+    """
+    Recompute the energy tables derived from the decay radiation (see
+    `summarize_decay_radiation`). They are updated with every write, so this
+    is only needed for databases written by an earlier version.
+
+    Parameters
+    ----------
+    isotopes: list, optional
+        [default: all isotopes in the database]
+    """
+    if isotopes is None:
+        isotopes = get_available_isotopes()
+    isotopes = sorted(set(_sanitize_isotope_string(isotope) for isotope in isotopes))
+    if len(isotopes) == 0:
+        return
+    with pd.HDFStore(_get_nuclear_database_path(), mode="a") as decay_radiation_db:
+        decay_radiation = _select_isotopes(decay_radiation_db, "decay_radiation", isotopes)
+        _write_summary_tables(decay_radiation_db, decay_radiation, isotopes)
+
+
+def _get_summary_tables(isotopes):
+    isotopes = set(_sanitize_isotope_string(isotope) for isotope in isotopes)
+    stored_isotopes = sorted(isotopes & get_available_isotopes())
+    summary_tables = list(summarize_decay_radiation(pd.DataFrame()))
+    if len(stored_isotopes) == 0:
+        return summary_tables
+
+    with pd.HDFStore(_get_nuclear_database_path(), mode="r") as decay_radiation_db:
+        summarized_isotopes = set()
+        # every summarized isotope has a row of totals; the table of x-ray
+        # and gamma-ray lines is missing if no isotope has such lines
+        if SUMMARY_KEYS[0] in decay_radiation_db:
+            summarized_isotopes = set(
+                _select_isotopes(decay_radiation_db, SUMMARY_KEYS[0], stored_isotopes).index
+            )
+    missing_isotopes = sorted(set(stored_isotopes) - summarized_isotopes)
+    if len(missing_isotopes) > 0:
+        logger.info(f"Summarizing the decay radiation of {len(missing_isotopes)} isotopes")
+        update_decay_radiation_summary(missing_isotopes)
+
+    with pd.HDFStore(_get_nuclear_database_path(), mode="r") as decay_radiation_db:
+        for i, key in enumerate(SUMMARY_KEYS):
+            if key in decay_radiation_db:
+                summary_tables[i] = _select_isotopes(decay_radiation_db, key, stored_isotopes)
+    return summary_tables
+
+
+def get_energy_per_decay(isotopes):
+    """
+    Total energy per decay of every channel (see `summarize_decay_radiation`)
+    read from the compact summary table of the database
+
+    Parameters
+    ----------
+    isotopes: list
+
+    Returns
+    -------
+    energy_per_decay: pandas.DataFrame
+        indexed by isotope; isotopes that are not in the database are missing
+    """
+    return _get_summary_tables(isotopes)[0]
+
+
+def get_em_cumulative_energy_per_decay(isotopes):
+    """
+    Cumulative energy per decay of the x-ray and gamma-ray lines sorted by
+    energy (see `summarize_decay_radiation`) for energy cutoff queries
+
+    Parameters
+    ----------
+    isotopes: list
+
+    Returns
+    -------
+    em_cumulative_energy_per_decay: pandas.DataFrame
+        indexed by isotope; isotopes that are not in the database or without
+        x-rays and gamma-rays are missing
+    """
+    return _get_summary_tables(isotopes)[1]
@@ -1,3 +1,4 @@
+import re
 from abc import ABCMeta
 
 import pandas as pd
@@ -5,6 +6,9 @@ from astropy import units as u
 from uncertainties import ufloat_fromstr
 import numpy as np
 
+from nuclear.io.nndc.tokenizer import (NNDCSection, table_to_dataframe,
+                                       tokenize_nndc_page)
+
 
 def uncertainty_parser(unc_raw_str, split_unc_symbol='%'):
     unc_raw_str = unc_raw_str.replace('×10+', 'e+')
@@ -28,11 +32,126 @@ def uncertainty_parser(unc_raw_str, split_unc_symbol='%'):
     return parsed_uncertainty.nominal_value, parsed_uncertainty.std_dev
 
 
+def _compile_uncertainty_pattern(split_unc_symbol):
+    """
+    One line of "value", "value<symbol>unc" or "value<symbol>unc<symbol>..."
+    (after `uncertainty_parser` normalized it) whose value and uncertainty
+    `uncertainty_parser` reads with plain float arithmetic. Every other line
+    matches the `other` group.
+    """
+    symbol = re.escape(split_unc_symbol)
+    # whitespace that str.strip removes, except the symbol and line breaks
+    space = rf"[^\S\n{symbol}]*"
+    return re.compile(
+        rf"^{space}(?P<value>(?P<mantissa>[+-]?(?=\.?\d)\d*(?P<decimals>\.\d*)?)"
+        rf"(?:e(?P<exponent>[+-]?\d+))?){space}"
+        rf"(?:(?P<symbol>{symbol}){space}"
+        rf"(?:(?P<unc_int>\d+)|(?P<unc_float>\d+\.\d*|\.\d+)|\??)"
+        rf"{space}(?:{symbol}.*)?)?$|^(?P<other>.*)$",
+        re.MULTILINE)
+
+
+UNCERTAINTY_PATTERNS = {}
+
+
+def _powers_of_ten(exponents):
+    # same 10.0 ** n as uncertainties, evaluated once per distinct exponent
+    exponents = exponents.tolist()
+    powers = {exponent: 10.0 ** exponent for exponent in set(exponents)}
+    return np.array([powers[exponent] for exponent in exponents],
+                    dtype=np.float64)
+
+
+def parse_uncertainties(unc_raw_strs, split_unc_symbol='%'):
+    """
+    Vectorized `uncertainty_parser`. The values in the usual NNDC formats
+    ("value unc", "value % unc", "value×10+exp") are matched by a single
+    compiled regex over the whole column and converted with array
+    arithmetic; all other values are parsed one by one with
+    `uncertainty_parser`. The results are identical to `uncertainty_parser`.
+
+    Parameters
+    ----------
+    unc_raw_strs: list or pandas.Series
+        strings with values and uncertainties
+    split_unc_symbol: str
+        symbol between value and uncertainty [default: '%']
+
+    Returns
+    -------
+    nominal_values: numpy.ndarray
+    std_devs: numpy.ndarray
+    """
+    unc_raw_strs = list(unc_raw_strs)
+    n_values = len(unc_raw_strs)
+    nominal_values = np.full(n_values, np.nan)
+    std_devs = np.full(n_values, np.nan)
+    is_fast = np.zeros(n_values, dtype=bool)
+
+    if split_unc_symbol not in UNCERTAINTY_PATTERNS:
+        UNCERTAINTY_PATTERNS[split_unc_symbol] = _compile_uncertainty_pattern(
+            split_unc_symbol)
+    pattern = UNCERTAINTY_PATTERNS[split_unc_symbol]
+
+    if (n_values > 0 and pd.api.types.infer_dtype(unc_raw_strs) == 'string'
+            and split_unc_symbol != '\n'):
+        text = '\n'.join(unc_raw_strs).replace('×10+', 'e+').lower()
+        matches = pattern.findall(text)
+        # lines with line breaks can not be matched line by line
+        if len(matches) == n_values:
+            matches = np.array(matches, dtype=object).reshape(n_values, -1)
+            (value, mantissa, decimals, exponent, symbol, unc_int, unc_float,
+             other) = matches.T
+            is_fast = mantissa != ''
+            has_unc = symbol != ''
+
+            # value without uncertainty: float(value)
+            without_unc = is_fast & ~has_unc
+            nominal_values[without_unc] = value[without_unc].astype(np.float64)
+
+            # value with uncertainty: ufloat_fromstr("value(unc)e+exp")
+            with_unc = is_fast & has_unc
+            mantissa = mantissa[with_unc].astype(np.float64)
+            exponent = exponent[with_unc]
+            has_exponent = exponent != ''
+            factor = np.ones(len(exponent))
+            factor[has_exponent] = _powers_of_ten(
+                exponent[has_exponent].astype(np.int64))
+
+            unc = np.full(len(exponent), np.nan)
+            unc_float = unc_float[with_unc]
+            is_unc_float = unc_float != ''
+            unc[is_unc_float] = unc_float[is_unc_float].astype(np.float64)
+            # an integer uncertainty is given in units of the last digit
+            unc_int = unc_int[with_unc]
+            is_unc_int = unc_int != ''
+            decimals = decimals[with_unc][is_unc_int]
+            n_decimals = np.fromiter(map(len, decimals), dtype=np.int64,
+                                     count=len(decimals))
+            n_decimals = np.maximum(n_decimals - 1, 0)
+            unc[is_unc_int] = (unc_int[is_unc_int].astype(np.int64) /
+                               _powers_of_ten(n_decimals))
+
+            nominal_values[with_unc] = np.where(has_exponent,
+                                                mantissa * factor, mantissa)
+            std_devs[with_unc] = np.where(has_exponent, unc * factor, unc)
+
+    for i in np.flatnonzero(~is_fast):
+        nominal_values[i], std_devs[i] = uncertainty_parser(
+            unc_raw_strs[i], split_unc_symbol=split_unc_symbol)
+    return nominal_values, std_devs
+
+
 class BaseParser(metaclass=ABCMeta):
     @staticmethod
     def _convert_html_to_df(html_table, column_names):
-        df = pd.read_html(str(html_table))[0].iloc[1:]
-        df.columns = column_names
+        if isinstance(html_table, NNDCSection):
+            table = html_table.tables[0]
+        else:
+            table = [table
+                     for section in tokenize_nndc_page(str(html_table))
+                     for table in section.tables][0]
+        df = table_to_dataframe(table[1:], column_names)
         if "type" in column_names:
             df.type[df.type.isnull()] = ""
         return df
@@ -40,25 +159,14 @@ class BaseParser(metaclass=ABCMeta):
     def _sanititze_table(self, df):
         df.dropna(inplace=True)
 
-        if "intensity" in df.columns:
-            intensity_raw = df["intensity"].apply(
-                uncertainty_parser)
-            df.loc[:, "intensity"] = [item[0] for item in intensity_raw]
-            df.loc[:, "intensity_unc"] = [item[1]
-                                          for item in intensity_raw]
-        if "energy" in df.columns:
-            energy = df["energy"].apply(
-                uncertainty_parser, split_unc_symbol=' ')
-            df.loc[:, "energy"] = [item[0] for item in energy]
-            df.loc[:, "energy_unc"] = [item[1] for item in energy]
-
-        if "end_point_energy" in df.columns:
-            end_point_energy = df["end_point_energy"].apply(
-                uncertainty_parser, split_unc_symbol=' ')
-            df.loc[:, "end_point_energy"] = [
-                item[0] for item in end_point_energy]
-            df.loc[:, "end_point_energy_unc"] = [
-                item[1] for item in end_point_energy]
+        for column, split_unc_symbol in [("intensity", "%"),
+                                         ("energy", " "),
+                                         ("end_point_energy", " ")]:
+            if column in df.columns:
+                nominal_values, std_devs = parse_uncertainties(
+                    df[column], split_unc_symbol=split_unc_symbol)
+                df.loc[:, column] = nominal_values
+                df.loc[:, f"{column}_unc"] = std_devs
 
         if "dose" in df.columns:
             del df["dose"]
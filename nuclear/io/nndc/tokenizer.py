@@ -0,0 +1,311 @@
+import re
+from html import unescape
+
+import numpy as np
+import pandas as pd
+
+# same whitespace normalization as pandas.read_html
+WHITESPACE_PATTERN = re.compile(r"[\r\n]+|\s{2,}")
+
+# comments, start/end tags, declarations or text
+TOKEN_PATTERN = re.compile(
+    r"<!--.*?(?:-->|$)"
+    r"|<(/?)([a-zA-Z][a-zA-Z0-9]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>"
+    r"|<[!?][^>]*>"
+    r"|([^<]+|<)",
+    re.DOTALL,
+)
+ATTRIBUTE_PATTERN = re.compile(
+    r"([^\s=/>]+)(?:\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s>]+))?"
+)
+
+
+class NNDCSection(object):
+    """
+    Part of an NNDC page that starts with an underlined (<u>) heading
+
+    Parameters
+    ----------
+    heading: str
+        text of the heading; None for the part before the first heading
+    text: str
+        text of the section including the heading and the table cells
+    tables: list
+        tables of the section, each a list of rows of cell texts. Rows made
+        up of <th> cells only are dropped (like `pandas.read_html` uses them
+        as header), colspan and rowspan are expanded.
+    """
+
+    __slots__ = ("heading", "text", "tables")
+
+    def __init__(self, heading=None, text="", tables=None):
+        self.heading = heading
+        self.text = text
+        self.tables = [] if tables is None else tables
+
+    def __repr__(self):
+        return (
+            f"<NNDCSection {self.heading!r} ({len(self.tables)} tables)>"
+        )
+
+
+class _Table(object):
+    __slots__ = ("head", "body", "foot", "part")
+
+    def __init__(self):
+        self.head = []
+        self.body = []
+        self.foot = []
+        self.part = self.body
+
+
+class NNDCPageTokenizer(object):
+    """
+    Walk an NNDC page once and split it into sections with their text and
+    tables. This replaces serializing the page, splitting it at the headings
+    and parsing every fragment (and every table) again.
+    """
+
+    def __init__(self):
+        self.sections = [NNDCSection()]
+        self._text = []
+        self._heading = None
+        self._tables = []
+        self._row = None
+        self._cell = None
+
+    def feed(self, page):
+        raw_text_tag = None
+        for match in TOKEN_PATTERN.finditer(page):
+            is_end_tag, tag, attrs, data = match.groups()
+            if raw_text_tag is not None:
+                # script and style content is not part of the document text
+                if is_end_tag and tag.lower() == raw_text_tag:
+                    raw_text_tag = None
+            elif data is not None:
+                self.handle_data(unescape(data) if "&" in data else data)
+            elif tag is None:
+                continue
+            elif is_end_tag:
+                self.handle_endtag(tag.lower())
+            else:
+                tag = tag.lower()
+                if tag in ("script", "style"):
+                    raw_text_tag = tag
+                else:
+                    self.handle_starttag(tag, attrs)
+
+    def handle_starttag(self, tag, attrs):
+        """
+        Parameters
+        ----------
+        tag: str
+            lower case tag name
+        attrs: str
+            raw attributes of the tag
+        """
+        if tag == "u":
+            self._close_section()
+            self.sections.append(NNDCSection())
+            self._heading = []
+        elif tag == "table":
+            # the table is replaced by its rows once it is closed
+            tables = self.sections[-1].tables
+            self._tables.append((_Table(), tables, len(tables)))
+            tables.append(None)
+        elif not self._tables:
+            return
+        elif tag in ("td", "th"):
+            if self._row is None:
+                self._row = []
+            self._close_cell()
+            colspan = rowspan = 1
+            if attrs and not attrs.isspace():
+                attrs = _parse_attributes(attrs)
+                colspan = _get_span(attrs, "colspan")
+                rowspan = _get_span(attrs, "rowspan")
+            self._cell = ([], tag == "th", colspan, rowspan)
+        elif tag == "tr":
+            self._close_row()
+            self._row = []
+        elif tag == "br":
+            if self._cell is not None:
+                self._cell[0].append("\n")
+        elif tag in ("thead", "tbody", "tfoot"):
+            self._close_row()
+            table = self._tables[-1][0]
+            table.part = {"thead": table.head, "tfoot": table.foot}.get(
+                tag, table.body
+            )
+
+    def handle_endtag(self, tag):
+        if tag == "u":
+            if self._heading is not None:
+                self.sections[-1].heading = "".join(self._heading)
+                self._heading = None
+        elif not self._tables:
+            return
+        elif tag == "table":
+            self._close_row()
+            table, tables, table_index = self._tables.pop()
+            tables[table_index] = _expand_table(table)
+        elif tag in ("td", "th"):
+            self._close_cell()
+        elif tag == "tr":
+            self._close_row()
+        elif tag in ("thead", "tbody", "tfoot"):
+            self._close_row()
+            table = self._tables[-1][0]
+            table.part = table.body
+
+    def handle_data(self, data):
+        self._text.append(data)
+        if self._heading is not None:
+            self._heading.append(data)
+        if self._cell is not None:
+            self._cell[0].append(data)
+
+    def close(self):
+        while self._tables:
+            self.handle_endtag("table")
+        self._close_section()
+
+    def _close_cell(self):
+        if self._cell is None:
+            return
+        text_parts, is_th, colspan, rowspan = self._cell
+        self._row.append(
+            (
+                WHITESPACE_PATTERN.sub(" ", "".join(text_parts).strip()),
+                is_th,
+                colspan,
+                rowspan,
+            )
+        )
+        self._cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row is not None:
+            self._tables[-1][0].part.append(self._row)
+            self._row = None
+
+    def _close_section(self):
+        self.sections[-1].text += "".join(self._text)
+        self._text = []
+
+
+def _parse_attributes(attrs):
+    return {
+        name.lower(): unescape(value.strip("\"'")) if value else ""
+        for name, value in ATTRIBUTE_PATTERN.findall(attrs)
+    }
+
+
+def _get_span(attrs, name):
+    try:
+        return max(int(attrs.get(name) or 1), 1)
+    except ValueError:
+        return 1
+
+
+def _expand_spans(rows):
+    """
+    Expand colspan and rowspan of a list of rows by copying the cell text into
+    the spanned cells (same as `pandas.read_html`)
+    """
+    all_texts = []
+    remainder = []
+    for row in rows:
+        texts = []
+        next_remainder = []
+        index = 0
+        for text, _, colspan, rowspan in row:
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+                index += 1
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+
+    while remainder:
+        texts = []
+        next_remainder = []
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+    return all_texts
+
+
+def _expand_table(table):
+    body = table.body
+    if not table.head:
+        # leading rows of <th> cells only are the header
+        n_header_rows = 0
+        while n_header_rows < len(body) and all(
+            is_th for _, is_th, _, _ in body[n_header_rows]
+        ):
+            n_header_rows += 1
+        body = body[n_header_rows:]
+    return _expand_spans(body) + _expand_spans(table.foot)
+
+
+def tokenize_nndc_page(page):
+    """
+    Split an NNDC page into sections in a single pass
+
+    Parameters
+    ----------
+    page: bytes or str
+
+    Returns
+    -------
+    sections: list of NNDCSection
+        the first section holds everything before the first heading
+    """
+    if isinstance(page, bytes):
+        try:
+            page = page.decode("utf-8")
+        except UnicodeDecodeError:
+            page = page.decode("latin-1")
+    tokenizer = NNDCPageTokenizer()
+    tokenizer.feed(page)
+    tokenizer.close()
+    return tokenizer.sections
+
+
+def table_to_dataframe(rows, columns):
+    """
+    Convert the rows of a tokenized table to a DataFrame of strings. Empty
+    cells and cells missing from short rows are NaN.
+
+    Parameters
+    ----------
+    rows: list
+    columns: list
+
+    Returns
+    -------
+    table: pandas.DataFrame
+    """
+    n_columns = len(columns)
+    data = [
+        [np.nan if text == "" else text for text in row]
+        + [np.nan] * (n_columns - len(row))
+        for row in rows
+    ]
+    return pd.DataFrame(data, columns=columns, dtype=object)
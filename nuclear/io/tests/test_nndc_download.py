@@ -0,0 +1,160 @@
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from nuclear.io.nndc import base
+
+# stripped-down copy of the layout of an NNDC decay radiation page
+NNDC_PAGE = """<html><body>
+<u>Dataset #1:</u><p></p>
+<u>Authors</u>: J. Doe<p></p>
+<u>Gamma and X-ray radiation</u>:
+<table>
+<tr><td>Type</td><td>Energy (keV)</td><td>Intensity (%)</td><td>Dose</td></tr>
+<tr><td>XR ka1</td><td>6.404</td><td>0.51 % 2</td><td>0.0</td></tr>
+<tr><td>gamma</td><td>846.770 2</td><td>99.9399 % 23</td><td>0.846</td></tr>
+</table>
+</body></html>"""
+
+
+class NNDCStandIn(BaseHTTPRequestHandler):
+    pages = {"CO56": NNDC_PAGE}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        page = self.pages.get(query["nuc"][0])
+        if page is None:
+            self.send_error(404)
+            return
+        etag = f'"{hash(page)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(page.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def nndc_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        base, "_get_raw_page_cache_dir", lambda: tmp_path / "nndc_raw_pages"
+    )
+    NNDCStandIn.requests.clear()
+    server = HTTPServer(("127.0.0.1", 0), NNDCStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield (
+        f"http://127.0.0.1:{server.server_port}/"
+        "decaysearchdirect.jsp?nuc={nucname}&unc=nds"
+    )
+    server.shutdown()
+
+
+@pytest.fixture
+def db_fname(tmp_path, monkeypatch):
+    db_fname = tmp_path / "decay_radiation.h5"
+    monkeypatch.setattr(base, "_get_nuclear_database_path", lambda: db_fname)
+    return db_fname
+
+
+def test_store_decay_radiation_many(nndc_url, db_fname):
+    errors = base.store_decay_radiation_many(
+        ["Co56", "Ni56", "not_an_isotope"], parse_workers=0, base_url=nndc_url
+    )
+    assert set(errors) == {"Ni56", "not_an_isotope"}
+    assert base.get_available_isotopes() == {"Co56"}
+
+    decay_radiation, meta = base.get_decay_radiation_database()
+    assert list(decay_radiation.type) == ["x_rays", "gamma_rays"]
+    assert decay_radiation.energy.iloc[1] == pytest.approx(846.770)
+    assert decay_radiation.intensity_unc.iloc[1] == pytest.approx(0.0023)
+    assert meta.set_index("key").loc["authors", "value"] == "J. Doe"
+
+
+def test_store_decay_radiation_many_parse_pool(nndc_url, db_fname, monkeypatch):
+    # more isotopes than fit into a single where condition of the store
+    isotopes = [f"Fe{mass_number}" for mass_number in range(20, 60)]
+    monkeypatch.setattr(
+        NNDCStandIn, "pages",
+        dict(NNDCStandIn.pages, **{isotope.upper(): NNDC_PAGE
+                                   for isotope in isotopes}))
+    base.store_decay_radiation_many(["Co56"], parse_workers=0, base_url=nndc_url)
+
+    # parsed in the default process pool
+    assert base.store_decay_radiation_many(isotopes, base_url=nndc_url) == {}
+    assert base.get_available_isotopes() == {"Co56"} | set(isotopes)
+    decay_radiation, meta = base.get_decay_radiation_database()
+    assert len(decay_radiation) == 2 * (len(isotopes) + 1)
+    assert list(decay_radiation.loc["Co56"].type) == ["x_rays", "gamma_rays"]
+    assert list(decay_radiation.loc["Fe45"].energy) == pytest.approx(
+        [6.404, 846.770])
+
+
+def test_store_decay_radiation_many_skips_stored(nndc_url, db_fname):
+    base.store_decay_radiation_many(["Co56"], parse_workers=0, base_url=nndc_url)
+    mtime = db_fname.stat().st_mtime_ns
+    assert base.store_decay_radiation_many(
+        ["Co56"], parse_workers=0, base_url=nndc_url
+    ) == {}
+    assert db_fname.stat().st_mtime_ns == mtime
+
+
+def test_raw_page_cache(nndc_url, db_fname):
+    page, download_timestamp = base.fetch_decay_radiation_page("Co56", nndc_url)
+    assert page == NNDC_PAGE.encode()
+    assert len(NNDCStandIn.requests) == 1
+
+    # repeated downloads and offline access are served from the cache
+    assert base.fetch_decay_radiation_page("Co56", nndc_url) == (
+        page, download_timestamp)
+    assert base.fetch_decay_radiation_page("Co56", nndc_url, offline=True) == (
+        page, download_timestamp)
+    assert len(NNDCStandIn.requests) == 1
+
+    # revalidation does not download the unchanged page again
+    assert base.fetch_decay_radiation_page("Co56", nndc_url, refresh=True) == (
+        page, download_timestamp)
+    assert len(NNDCStandIn.requests) == 2
+
+    with pytest.raises(IOError):
+        base.fetch_decay_radiation_page("Ni56", nndc_url, offline=True)
+
+
+def test_store_decay_radiation_many_offline(nndc_url, db_fname):
+    base.store_decay_radiation_many(["Co56"], parse_workers=0, base_url=nndc_url)
+    n_requests = len(NNDCStandIn.requests)
+    mtime = db_fname.stat().st_mtime_ns
+    errors = base.store_decay_radiation_many(
+        ["Co56"], force_update=True, parse_workers=0, base_url=nndc_url,
+        offline=True)
+    assert errors == {}
+    assert len(NNDCStandIn.requests) == n_requests
+    assert db_fname.stat().st_mtime_ns != mtime
+    assert base.get_available_isotopes() == {"Co56"}
+
+
+def test_write_atomic_threads(tmp_path):
+    fname = tmp_path / "objects" / "page"
+    contents = [bytes([i]) * 100000 for i in range(8)]
+    threads = [
+        threading.Thread(target=base._write_atomic, args=(fname, content))
+        for content in contents
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # one complete write wins, and every writer cleaned up its own file
+    assert fname.read_bytes() in contents
+    assert list(fname.parent.iterdir()) == [fname]
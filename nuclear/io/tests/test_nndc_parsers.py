@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from nuclear.io.nndc.parsers import parse_uncertainties, uncertainty_parser
+
+INTENSITIES = ["99.9399 % 23", "0.51 % 2", "105 %", "1 % ?", "18.1 % 1.5",
+               ".43 % 3", "5. % 2", "2.3×10+3 % 4", "1.2e-3 % 12 % 1",
+               "3E+2", "-0.5 %  7", "<0.1 % 3", "nan % 2", "4.2×10-3 % 1"]
+ENERGIES = ["846.770 2", "6.404", "0.67", "1458.9 10", "631.3  4",
+            "4566.0\xa020", "2.0e+3 5", "12 ?", "1.5 0.3", "7 "]
+
+
+@pytest.mark.parametrize("unc_raw_strs, split_unc_symbol",
+                         [(INTENSITIES, "%"), (ENERGIES, " ")])
+def test_parse_uncertainties(unc_raw_strs, split_unc_symbol):
+    expected = []
+    parsable = []
+    for unc_raw_str in unc_raw_strs:
+        try:
+            expected.append(uncertainty_parser(
+                unc_raw_str, split_unc_symbol=split_unc_symbol))
+        except ValueError:
+            with pytest.raises(ValueError):
+                parse_uncertainties([unc_raw_str], split_unc_symbol)
+        else:
+            parsable.append(unc_raw_str)
+
+    nominal_values, std_devs = parse_uncertainties(parsable, split_unc_symbol)
+    np.testing.assert_array_equal(
+        np.column_stack([nominal_values, std_devs]), np.array(expected))
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nuclear.io.nndc import base
+
+
+@pytest.fixture
+def decay_radiation_db_path(tmp_path, monkeypatch):
+    db_fname = tmp_path / "decay_radiation.h5"
+    monkeypatch.setattr(base, "_get_nuclear_database_path", lambda: db_fname)
+    decay_radiation = pd.DataFrame(
+        {"energy": [846.8, 1238.3, 158.4], "type": ["gamma_rays"] * 3},
+        index=pd.Index(["Co56", "Co56", "Ni56"], name="isotope"),
+    )
+    meta = pd.DataFrame(
+        {"key": ["authors", "authors"], "value": ["A", "B"]},
+        index=pd.Index(["Co56", "Ni56"], name="isotope"),
+    )
+    with pd.HDFStore(db_fname, mode="w") as decay_radiation_db:
+        decay_radiation_db.put("metadata", meta, format="table")
+        decay_radiation_db.put("decay_radiation", decay_radiation, format="table")
+    return db_fname
+
+
+def test_available_isotopes(decay_radiation_db_path):
+    assert base.get_available_isotopes() == {"Co56", "Ni56"}
+
+
+def test_load_selected_isotopes(decay_radiation_db_path):
+    decay_radiation, meta = base.get_decay_radiation_database(isotopes=["co56"])
+    assert set(decay_radiation.index) == {"Co56"}
+    assert len(decay_radiation) == 2
+    assert list(meta.value) == ["A"]
+
+    decay_radiation, meta = base.get_decay_radiation_database(isotopes=["Fe56"])
+    assert len(decay_radiation) == 0
+    assert len(meta) == 0
+
+
+def test_commit_replaces_isotope_rows(decay_radiation_db_path):
+    new_decay_radiation = pd.DataFrame(
+        {"energy": [158.4, 749.9], "type": ["gamma_rays", "gamma_rays"]},
+        index=pd.Index(["Ni56", "Ni56"], name="isotope"),
+    )
+    new_meta = pd.DataFrame(
+        {"key": ["authors"], "value": ["C"]},
+        index=pd.Index(["Ni56"], name="isotope"),
+    )
+    base.commit_decay_radiation(new_decay_radiation, new_meta)
+
+    decay_radiation, meta = base.get_decay_radiation_database()
+    assert len(decay_radiation.loc["Co56"]) == 2
+    assert list(decay_radiation.loc["Ni56"].energy) == [158.4, 749.9]
+    assert meta.loc["Ni56"].value == "C"
+    assert list(decay_radiation_db_path.parent.glob("*.tmp")) == []
+
+
+def test_interrupted_commit_keeps_database(decay_radiation_db_path, monkeypatch):
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(base, "_replace_isotope_rows", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        base.commit_decay_radiation(None, None)
+    assert base.get_available_isotopes() == {"Co56", "Ni56"}
+    assert len(base.get_decay_radiation_database()[0]) == 3
+    assert list(decay_radiation_db_path.parent.glob("*.tmp")) == []
+
+
+def test_atomic_commits_use_own_copies(decay_radiation_db_path, monkeypatch):
+    copy_fnames = []
+    copyfile = base.shutil.copyfile
+
+    def record_copyfile(src, dst, **kwargs):
+        copy_fnames.append(dst)
+        return copyfile(src, dst, **kwargs)
+
+    monkeypatch.setattr(base.shutil, "copyfile", record_copyfile)
+    meta = pd.DataFrame(
+        {"key": ["authors"], "value": ["C"]},
+        index=pd.Index(["Ni56"], name="isotope"),
+    )
+    for energy in [158.4, 749.9]:
+        decay_radiation = pd.DataFrame(
+            {"energy": [energy], "type": ["gamma_rays"]},
+            index=pd.Index(["Ni56"], name="isotope"),
+        )
+        base.commit_decay_radiation(decay_radiation, meta)
+    assert len(copy_fnames) == 2
+    assert copy_fnames[0] != copy_fnames[1]
+    assert all(
+        copy_fname.parent == decay_radiation_db_path.parent
+        for copy_fname in copy_fnames
+    )
+    decay_radiation = base.get_decay_radiation_database()[0]
+    assert list(decay_radiation[decay_radiation.index == "Ni56"].energy) == [749.9]
+
+
+def test_commit_many_isotopes_keeps_other_rows(decay_radiation_db_path):
+    # more isotopes than pandas puts into a where condition
+    isotopes = [f"Fe{mass_number}" for mass_number in range(20, 60)]
+    new_decay_radiation = pd.DataFrame(
+        {"energy": np.arange(len(isotopes), dtype=float),
+         "type": ["gamma_rays"] * len(isotopes)},
+        index=pd.Index(isotopes, name="isotope"),
+    )
+    new_meta = pd.DataFrame(
+        {"key": ["authors"] * len(isotopes), "value": ["C"] * len(isotopes)},
+        index=pd.Index(isotopes, name="isotope"),
+    )
+    base.commit_decay_radiation(new_decay_radiation, new_meta)
+    base.commit_decay_radiation(new_decay_radiation, new_meta)
+
+    decay_radiation, meta = base.get_decay_radiation_database()
+    assert base.get_available_isotopes() == {"Co56", "Ni56"} | set(isotopes)
+    assert len(decay_radiation) == 3 + len(isotopes)
+    assert list(decay_radiation.loc["Co56"].energy) == [846.8, 1238.3]
+    assert list(meta.loc[["Co56", "Ni56"]].value) == ["A", "B"]
+
+    selected_decay_radiation, selected_meta = base.get_decay_radiation_database(
+        isotopes=["Co56"] + isotopes
+    )
+    assert len(selected_decay_radiation) == 2 + len(isotopes)
+    assert set(selected_meta.index) == {"Co56"} | set(isotopes)
+
+
+def test_summaries_of_many_isotopes_keep_other_rows(decay_radiation_db_path):
+    def make_tables(isotopes):
+        decay_radiation = pd.DataFrame(
+            {"energy": np.full(len(isotopes), 846.8),
+             "intensity": np.full(len(isotopes), 50.0),
+             "type": ["gamma_rays"] * len(isotopes)},
+            index=pd.Index(isotopes, name="isotope"),
+        )
+        meta = pd.DataFrame(
+            {"key": ["authors"] * len(isotopes), "value": ["C"] * len(isotopes)},
+            index=pd.Index(isotopes, name="isotope"),
+        )
+        return decay_radiation, meta
+
+    base.commit_decay_radiation(*make_tables(["Co56"]))
+    isotopes = [f"Fe{mass_number}" for mass_number in range(20, 60)]
+    base.commit_decay_radiation(*make_tables(isotopes))
+    base.update_decay_radiation_summary(isotopes)
+
+    with pd.HDFStore(decay_radiation_db_path, mode="r") as decay_radiation_db:
+        for key in base.SUMMARY_KEYS:
+            assert set(decay_radiation_db[key].index) == {"Co56"} | set(isotopes)
+
+
+def test_summaries_without_em_lines_are_read_only(decay_radiation_db_path, monkeypatch):
+    decay_radiation = pd.DataFrame(
+        {"energy": [631.3], "intensity": [20.0], "type": ["e+"]},
+        index=pd.Index(["Co56"], name="isotope"),
+    )
+    meta = pd.DataFrame(
+        {"key": ["authors"], "value": ["C"]},
+        index=pd.Index(["Co56"], name="isotope"),
+    )
+    base.commit_decay_radiation(decay_radiation, meta)
+    with pd.HDFStore(decay_radiation_db_path, mode="r") as decay_radiation_db:
+        assert "em_cumulative_energy_per_decay" not in decay_radiation_db
+
+    def update_decay_radiation_summary(isotopes=None):
+        raise AssertionError("reading the summary wrote to the database")
+
+    monkeypatch.setattr(
+        base, "update_decay_radiation_summary", update_decay_radiation_summary
+    )
+    assert list(base.get_energy_per_decay(["Co56"]).index) == ["Co56"]
+    assert len(base.get_em_cumulative_energy_per_decay(["Co56"])) == 0
@@ -0,0 +1,43 @@
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from nuclear.io.nndc.tokenizer import table_to_dataframe, tokenize_nndc_page
+
+PAGE = """<html><head><script>var x = "<u>not a heading</u>";</script></head>
+<body>preamble
+<u>Dataset #1:</u> <p></p>
+<u>Authors</u>: J. Doe<p></p>
+<u>Citation</u>: Nuclear Data Sheets 112, 1513 (2011)<p></p>
+<table><tr><td>Parent J&pi;</td><td>Decay<br>Scheme</td></tr>
+<tr><td>4+</td><td>Scheme</td></tr></table>
+<u>Beta+</u>:
+<table><tr><th>Energy (keV)</th><th>Intensity (%)</th></tr>
+<tr><td colspan="2">continued</td></tr>
+<tr><td rowspan=2>631.3  4</td><td>0.0019 % 3</td></tr>
+<tr><td></td></tr>
+</table>
+</body></html>"""
+
+
+def test_tokenize_nndc_page():
+    sections = tokenize_nndc_page(PAGE.encode())
+    assert [section.heading for section in sections] == [
+        None, "Dataset #1:", "Authors", "Citation", "Beta+"]
+    assert "not a heading" not in sections[0].text
+    assert sections[2].text.split(":")[1].strip() == "J. Doe"
+    assert sections[3].tables == [[["Parent Jπ", "Decay Scheme"],
+                                   ["4+", "Scheme"]]]
+    assert sections[4].tables == [[["continued", "continued"],
+                                   ["631.3 4", "0.0019 % 3"],
+                                   ["631.3 4", ""]]]
+
+
+@pytest.mark.parametrize("section_id", [3, 4])
+def test_tables_match_read_html(section_id):
+    section = tokenize_nndc_page(PAGE)[section_id]
+    html_table = PAGE.split("<table>")[section_id - 2].split("</table>")[0]
+    expected = pd.read_html(StringIO(f"<table>{html_table}</table>"))[0]
+    table = table_to_dataframe(section.tables[0], list(expected.columns))
+    pd.testing.assert_frame_equal(table, expected.astype(object))
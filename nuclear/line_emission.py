@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from nuclear.nuclear_data import DecayRadiation
+
+EM_LINE_CHANNELS = ['x_rays', 'gamma_rays']
+
+
+class LineEmission(object):
+    """
+    X-ray and gamma-ray lines of the nuclides of a decay network and the
+    sparse emission matrix that turns numbers of nuclei into photon emission
+    rates per line (number x decay constant x intensity). The spectrum of
+    many epochs is then a single sparse matrix product.
+
+    Parameters
+    ----------
+
+    isotopes: ~list
+        nuclide names ordered like the numbers of nuclei
+
+    decay_constants: ~np.ndarray
+        decay constants in 1/s ordered like `isotopes`
+
+    download: ~bool
+        download isotopes that are not in the database [default: True]
+
+    Attributes
+    ----------
+
+    lines: ~pd.DataFrame
+        isotope, type, energy (erg) and intensity (photons per decay) of
+        every line, sorted by energy
+
+    emission_matrix: ~scipy.sparse.csr_matrix
+        photons per s per nucleus (n_isotopes x n_lines)
+    """
+
+    def __init__(self, isotopes, decay_constants, download=True):
+        self.isotopes = list(isotopes)
+        decay_constants = np.asarray(decay_constants, dtype=np.float64)
+        decay_radiation = DecayRadiation(self.isotopes, download=download)
+
+        line_tables = []
+        for isotope_id, isotope in enumerate(self.isotopes):
+            for channel in EM_LINE_CHANNELS:
+                line_table = decay_radiation[isotope].get(channel, None)
+                if line_table is None:
+                    continue
+                line_tables.append(pd.DataFrame({
+                    'isotope': isotope, 'isotope_id': isotope_id,
+                    'type': channel, 'energy': line_table.energy.values,
+                    'intensity': line_table.intensity.values}))
+
+        if len(line_tables) > 0:
+            lines = pd.concat(line_tables, ignore_index=True)
+        else:
+            lines = pd.DataFrame(
+                {'isotope': [], 'isotope_id': np.array([], dtype=np.int64),
+                 'type': [], 'energy': [], 'intensity': []})
+        lines = lines.sort_values('energy', kind='mergesort').reset_index(
+            drop=True)
+        isotope_ids = lines.pop('isotope_id').values
+        self.lines = lines
+
+        self.emission_matrix = sparse.csr_matrix(
+            (decay_constants[isotope_ids] * lines.intensity.fillna(0.0).values,
+             (isotope_ids, np.arange(len(lines)))),
+            shape=(len(self.isotopes), len(lines)))
+
+    @classmethod
+    def from_ejecta(cls, ejecta, download=True):
+        """
+        Lines of all nuclides in the decay network of an ejecta
+
+        Parameters
+        ----------
+
+        ejecta: ~nuclear.ejecta.ArrayEjecta
+
+        download: ~bool
+            download isotopes that are not in the database [default: True]
+        """
+        return cls(ejecta.isotopes, ejecta.network.decay_constants,
+                   download=download)
+
+    def get_binning_matrix(self, energy_bins):
+        """
+        Sparse matrix that sums the lines into energy bins
+
+        Parameters
+        ----------
+
+        energy_bins: ~np.ndarray
+            bin edges in erg (n_bins + 1); lines outside are dropped
+
+        Returns
+        -------
+            : ~scipy.sparse.csr_matrix
+            (n_lines x n_bins)
+        """
+        energy_bins = np.asarray(energy_bins, dtype=np.float64)
+        n_bins = len(energy_bins) - 1
+        bin_ids = np.searchsorted(energy_bins, self.lines.energy.values,
+                                  side='right') - 1
+        # the last bin includes its upper edge
+        bin_ids[self.lines.energy.values == energy_bins[-1]] = n_bins - 1
+        in_bins = (bin_ids >= 0) & (bin_ids < n_bins)
+        return sparse.csr_matrix(
+            (np.ones(in_bins.sum()),
+             (np.flatnonzero(in_bins), bin_ids[in_bins])),
+            shape=(len(self.lines), n_bins))
+
+    def calculate_line_emission_raw(self, numbers, energy_bins=None):
+        """
+        Photon emission rates of all lines (or energy bins)
+
+        Parameters
+        ----------
+
+        numbers: ~np.ndarray
+            number of nuclei (n_epochs x n_isotopes)
+
+        energy_bins: ~np.ndarray
+            bin edges in erg; lines are summed into these bins if given
+            [default=None]
+
+        Returns
+        -------
+            : ~scipy.sparse.csr_matrix
+            photons per s (n_epochs x n_lines or n_epochs x n_bins)
+        """
+        emission_matrix = self.emission_matrix
+        if energy_bins is not None:
+            emission_matrix = emission_matrix @ self.get_binning_matrix(
+                energy_bins)
+        return sparse.csr_matrix(np.atleast_2d(numbers)) @ emission_matrix
@@ -5,9 +5,11 @@ from astropy import units as u
 from pyne import nucname
 import pandas as pd
 
-from nuclear.ejecta import Ejecta, msun_to_cgs
+from nuclear.ejecta import (Ejecta, msun_to_cgs, day_to_s, to_seconds,
+                            to_day_intervals)
 
-from nuclear.nuclear_data import DecayRadiation
+from nuclear.nuclear_data import EnergyPerDecay
+from nuclear.line_emission import LineEmission
 
 mpc_to_cm = u.Mpc.to(u.cm)
 
@@ -25,25 +27,47 @@ class BaseEnergyInjection(FittableModel):
 
         self.decay_constant = pd.DataFrame(data=[decay_constant.values()],
                                            columns=decay_constant.keys())
-        self.decay_radiation = DecayRadiation(
-            self.ejecta.get_all_children_nuc_name())
+        self.energy_per_decay = EnergyPerDecay(self.ejecta.isotopes)
 
         self.em_energy_per_decay = self._get_em_energy_per_decay(
             cutoff_energy=cutoff_em_energy)
         self.lepton_energy_per_decay = self._get_lepton_energy_per_decay()
+        self._compile_energy_per_s_per_atom()
 
+    def _compile_energy_per_s_per_atom(self):
+        """
+        Precompute the energy released per second per atom of every nuclide
+        (energy per decay x decay constant) as plain arrays ordered like the
+        decay network. The evaluation path then only needs
+        decayed numbers @ weights.
+        """
+        nuc_names = self.ejecta.get_all_children_nuc_name()
+
+        def to_array(energy_per_decay):
+            return (energy_per_decay * self.decay_constant)[
+                nuc_names].values[0].astype(np.float64)
+
+        self.em_energy_per_s_per_atom = to_array(self.em_energy_per_decay)
+        self.lepton_energy_per_s_per_atom = to_array(
+            self.lepton_energy_per_decay)
+        self.injected_energy_per_s_per_atom = (
+            self.em_energy_per_s_per_atom + self.lepton_energy_per_s_per_atom)
 
     def _init_ejecta(self, isotope_dict):
         titled_isotope_dict = {name.title() : value * u.Msun
                                for name, value in isotope_dict.items()}
-        self.ejecta = Ejecta.from_masses(**titled_isotope_dict)
+        self.ejecta = Ejecta.from_masses(
+            **titled_isotope_dict).to_array_ejecta()
+        self._isotope_indices = self.ejecta.get_indices(
+            [name.title() for name in self.param_names])
 
     def _update_ejecta(self, isotope_masses):
         assert len(isotope_masses) == len(self.param_names)
-        total_mass = np.sum(isotope_masses)
+        isotope_masses = np.asarray(isotope_masses, dtype=np.float64).ravel()
+        total_mass = isotope_masses.sum()
         self.ejecta.mass_g = total_mass * msun_to_cgs
-        for isotope_name, isotope_mass in zip(self.param_names, isotope_masses):
-            self.ejecta[isotope_name.title()] = isotope_mass / total_mass
+        self.ejecta.fractions[self._isotope_indices] = (isotope_masses /
+                                                        total_mass)
 
     def _get_lepton_energy_per_decay(self):
         """
@@ -54,20 +78,7 @@ class BaseEnergyInjection(FittableModel):
             : pandas.DataFrame
 
         """
-        energies_per_decay = np.zeros(len(self.ejecta.isotopes))
-        for channel in ['beta_plus', 'beta_minus', 'electrons']:
-            energy_per_decay = []
-            for isotope in self.ejecta.isotopes:
-                decay_rad = self.decay_radiation[isotope].get(channel, None)
-                if decay_rad is None:
-                    energy_per_decay.append(0.0)
-                else:
-                    energy_per_decay.append(decay_rad.energy.sum())
-            energies_per_decay += energy_per_decay
-        data = [
-            self.decay_radiation[isotope].get(
-                'total_lepton_energy_per_decay', 0.0)
-            for isotope in self.ejecta.isotopes]
+        data = self.energy_per_decay.lepton_energy_per_decay.values
         return pd.DataFrame(data=[data], columns=self.ejecta.isotopes)
 
     def _get_em_energy_per_decay(self, cutoff_energy=np.inf):
@@ -85,44 +96,199 @@ class BaseEnergyInjection(FittableModel):
             : pandas.DataFrame
         """
         cutoff_energy = u.Quantity(cutoff_energy, u.eV).to('erg').value
-        energies_per_decay = []
-        for isotope in self.ejecta.isotopes:
-            xray = self.decay_radiation[isotope].get('x_rays', None)
-            gammaray = self.decay_radiation[isotope].get('gamma_rays', None)
-
-            if (xray is None) and (gammaray is None):
-                energies_per_decay.append(0)
-                continue
-            em_table = pd.concat([xray, gammaray]).sort_values('energy')
-            cutoff_energy_id = em_table.energy.searchsorted(cutoff_energy)
-            energies_per_decay.append(
-                (em_table.energy[:cutoff_energy_id] *
-                 em_table.intensity[:cutoff_energy_id]).sum())
+        return pd.DataFrame(
+            data=self.energy_per_decay.em_energy_per_decay_raw(cutoff_energy),
+            columns=self.ejecta.isotopes)
 
-        return pd.DataFrame(data=[energies_per_decay],
-                            columns=self.ejecta.isotopes)
 
+    def _to_energy_per_s_frame(self, time, energy_per_s):
+        time = u.Quantity(time, u.day)
+        return pd.DataFrame(data=energy_per_s, index=time.value,
+                            columns=self.ejecta.get_all_children_nuc_name())
 
     def calculate_lepton_energy_per_s(self, time):
-        energy_per_s = ((self.lepton_energy_per_decay *
-            self.decay_constant).values * self.ejecta.get_decayed_numbers(time))
-        return energy_per_s
+        return self._to_energy_per_s_frame(
+            time, self.calculate_lepton_energy_per_s_raw(to_seconds(time)))
 
     def calculate_em_energy_per_s(self, time):
-        energy_per_s = ((self.em_energy_per_decay *
-            self.decay_constant).values * self.ejecta.get_decayed_numbers(time))
-        return energy_per_s
-
+        return self._to_energy_per_s_frame(
+            time, self.calculate_em_energy_per_s_raw(to_seconds(time)))
 
     def calculate_injected_energy_per_s(self, time):
-        energy_per_s = ((
-            (self.em_energy_per_decay + self.lepton_energy_per_decay) *
-            self.decay_constant).values * self.ejecta.get_decayed_numbers(time))
-        return energy_per_s
+        return self._to_energy_per_s_frame(
+            time, self.calculate_injected_energy_per_s_raw(to_seconds(time)))
+
+    def calculate_lepton_energy_per_s_raw(self, time_s):
+        """
+        Unitless fast path of `calculate_lepton_energy_per_s`
+
+        Parameters
+        ----------
+        time_s : numpy.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : numpy.ndarray
+            energy per s (n_epochs x n_nuclides)
+        """
+        return (self.lepton_energy_per_s_per_atom *
+                self.ejecta.get_decayed_numbers_raw(time_s))
+
+    def calculate_em_energy_per_s_raw(self, time_s):
+        """
+        Unitless fast path of `calculate_em_energy_per_s`
+
+        Parameters
+        ----------
+        time_s : numpy.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : numpy.ndarray
+            energy per s (n_epochs x n_nuclides)
+        """
+        return (self.em_energy_per_s_per_atom *
+                self.ejecta.get_decayed_numbers_raw(time_s))
+
+    def calculate_injected_energy_per_s_raw(self, time_s):
+        """
+        Unitless fast path of `calculate_injected_energy_per_s`
+
+        Parameters
+        ----------
+        time_s : numpy.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : numpy.ndarray
+            energy per s (n_epochs x n_nuclides)
+        """
+        return (self.injected_energy_per_s_per_atom *
+                self.ejecta.get_decayed_numbers_raw(time_s))
+
+    def calculate_total_injected_energy_per_s_raw(self, time_s):
+        """
+        Total injected energy per s summed over all nuclides, evaluated as a
+        single matrix-vector product on plain arrays
+
+        Parameters
+        ----------
+        time_s : numpy.ndarray
+            epochs in s
+
+        Returns
+        -------
+            : numpy.ndarray
+            energy per s (n_epochs)
+        """
+        return (self.ejecta.get_decayed_numbers_raw(time_s) @
+                self.injected_energy_per_s_per_atom)
+
+    def calculate_injected_energy_raw(self, start_s, end_s):
+        """
+        Unitless fast path of `calculate_injected_energy`
+
+        Parameters
+        ----------
+        start_s : numpy.ndarray
+            start of the intervals in s
+        end_s : numpy.ndarray
+            end of the intervals in s
+
+        Returns
+        -------
+            : numpy.ndarray
+            energy (n_intervals x n_nuclides)
+        """
+        return (self.injected_energy_per_s_per_atom *
+                self.ejecta.get_integrated_numbers_raw(start_s, end_s))
+
+    def calculate_injected_energy(self, start, end):
+        """
+        Energy injected by every nuclide between two epochs, computed in
+        closed form from the decay matrix
+
+        Parameters
+        ----------
+        start : float or astropy.Quantity
+            start of the intervals [default unit = days]
+        end : float or astropy.Quantity
+            end of the intervals [default unit = days]
+
+        Returns
+        -------
+            : pandas.DataFrame
+            energy indexed by (start, end) in days
+        """
+        start, end = to_day_intervals(start, end)
+        return pd.DataFrame(
+            data=self.calculate_injected_energy_raw(start * day_to_s,
+                                                    end * day_to_s),
+            index=pd.MultiIndex.from_arrays([start, end],
+                                            names=['start', 'end']),
+            columns=self.ejecta.get_all_children_nuc_name())
+
+    @property
+    def line_emission(self):
+        """
+        X-ray and gamma-ray lines of the decay network (read on first use)
+
+        Returns
+        -------
+            : nuclear.line_emission.LineEmission
+        """
+        if getattr(self, '_line_emission', None) is None:
+            self._line_emission = LineEmission.from_ejecta(self.ejecta)
+        return self._line_emission
+
+    def calculate_line_emission_raw(self, time_s, energy_bins=None):
+        """
+        Unitless fast path of `calculate_line_emission`
+
+        Parameters
+        ----------
+        time_s : numpy.ndarray
+            epochs in s
+        energy_bins : numpy.ndarray
+            bin edges in erg [default = None]
+
+        Returns
+        -------
+            : scipy.sparse.csr_matrix
+            photons per s (n_epochs x n_lines or n_epochs x n_bins)
+        """
+        return self.line_emission.calculate_line_emission_raw(
+            self.ejecta.get_decayed_numbers_raw(time_s), energy_bins)
+
+    def calculate_line_emission(self, time, energy_bins=None):
+        """
+        Photon emission rate of every x-ray and gamma-ray line of all
+        nuclides in the decay network (see `line_emission.lines` for the
+        lines), or of the lines summed into energy bins
+
+        Parameters
+        ----------
+        time : float or astropy.Quantity
+            epochs [default unit = days]
+        energy_bins : float or astropy.Quantity
+            bin edges [default unit = eV, default = None]
+
+        Returns
+        -------
+            : scipy.sparse.csr_matrix
+            photons per s (n_epochs x n_lines or n_epochs x n_bins)
+        """
+        if energy_bins is not None:
+            energy_bins = u.Quantity(energy_bins, u.eV).to('erg').value
+        return self.calculate_line_emission_raw(to_seconds(time), energy_bins)
 
     def evaluate(self, time, *args):
         self._update_ejecta(args)
-        return (time, self.calculate_injected_energy_per_s(time).sum(axis=1).values)
+        return (time, self.calculate_total_injected_energy_per_s_raw(
+            to_seconds(time)))
 
 def make_energy_injection_model(cutoff_em_energy=20*u.keV, **kwargs):
     """
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from astropy import units as u
+
+from nuclear.ejecta import Ejecta
+from nuclear.models.base import make_energy_injection_model
+
+DAY_TO_S = u.day.to(u.s)
+CHANNELS = ['lepton', 'em', 'injected']
+
+
+@pytest.fixture
+def energy_injection(decay_radiation_db):
+    return make_energy_injection_model(20 * u.keV, Ni56=0.6, Co56=0.1)
+
+
+def test_raw_energy_per_s_matches_frames(energy_injection):
+    epochs = np.array([1.0, 10.0, 100.0])
+    decayed_numbers = energy_injection.ejecta.get_decayed_numbers(epochs)
+    energies_per_decay = {
+        'lepton': energy_injection.lepton_energy_per_decay,
+        'em': energy_injection.em_energy_per_decay,
+        'injected': (energy_injection.lepton_energy_per_decay +
+                     energy_injection.em_energy_per_decay)}
+    for channel in CHANNELS:
+        energy_per_s = getattr(
+            energy_injection,
+            f'calculate_{channel}_energy_per_s')(epochs * u.day)
+        energy_per_s_raw = getattr(
+            energy_injection,
+            f'calculate_{channel}_energy_per_s_raw')(epochs * DAY_TO_S)
+        # DataFrame arithmetic the raw paths replaced
+        expected = ((energies_per_decay[channel] *
+                     energy_injection.decay_constant).values *
+                    decayed_numbers)
+        assert list(energy_per_s.columns) == list(expected.columns)
+        np.testing.assert_allclose(energy_per_s.values, expected.values)
+        np.testing.assert_allclose(energy_per_s_raw, expected.values)
+
+    time, total = energy_injection.evaluate(epochs * u.day,
+                                            *energy_injection.parameters)
+    np.testing.assert_allclose(total, expected.values.sum(axis=1))
+
+
+def test_from_masses_needs_units():
+    ejecta = Ejecta.from_masses(Ni56=1e33 * u.g, Co56=1 * u.Msun)
+    assert ejecta.mass_g == pytest.approx(1e33 + u.Msun.to(u.g))
+    assert ejecta['Ni56'] == pytest.approx(1e33 / ejecta.mass_g)
+    with pytest.raises(u.UnitsError):
+        Ejecta.from_masses(Ni56=0.5, Co56=0.5)
+
+
+def test_energy_per_s_per_atom(energy_injection):
+    kev_to_erg = u.keV.to(u.erg)
+    decay_constants = energy_injection.ejecta.get_decay_constant()
+    expected = {
+        # only the Co56 x-ray line is below the cutoff of 20 keV
+        'em': {'Co56': 6.4 * 0.25 * kev_to_erg * decay_constants['Co56']},
+        'lepton': {'Co56': 631.3 * 0.2 * kev_to_erg *
+                   decay_constants['Co56']}}
+    expected['injected'] = {'Co56': expected['em']['Co56'] +
+                            expected['lepton']['Co56']}
+    nuc_names = energy_injection.ejecta.get_all_children_nuc_name()
+    for channel in CHANNELS:
+        energy_per_s_per_atom = getattr(energy_injection,
+                                        f'{channel}_energy_per_s_per_atom')
+        assert energy_per_s_per_atom.dtype == np.float64
+        np.testing.assert_allclose(
+            energy_per_s_per_atom,
+            [expected[channel].get(nuc_name, 0.0) for nuc_name in nuc_names])
+
+
+def test_injected_energy_matches_numerical_integration(energy_injection):
+    start, end = np.array([0.0, 10.0, 50.0]), np.array([10.0, 200.0, 50.0])
+    injected_energy = energy_injection.calculate_injected_energy(
+        start * u.day, end * u.day)
+    assert list(injected_energy.index) == list(zip(start, end))
+    for (start_epoch, end_epoch), energy in zip(zip(start, end),
+                                                injected_energy.values):
+        epochs = np.linspace(start_epoch, end_epoch, 20001)
+        energy_per_s = energy_injection.calculate_injected_energy_per_s(
+            epochs * u.day).values
+        np.testing.assert_allclose(
+            energy, np.trapz(energy_per_s, epochs * DAY_TO_S, axis=0),
+            rtol=1e-6, atol=1e-12 * injected_energy.values.max())
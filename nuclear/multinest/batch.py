@@ -0,0 +1,148 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+
+import pandas as pd
+from astropy import units as u
+
+from nuclear.models.base import make_energy_injection_model
+from nuclear.multinest.likelihood import BolometricLightCurveLikelihood
+from nuclear.multinest.samplers import NestedSampler
+
+logger = logging.getLogger(__name__)
+
+SN_IA_ISOTOPES = ['Ni56', 'Ni57', 'Co55', 'Ti44']
+
+# energy injection model shared by all fits of a process
+_energy_injection = None
+
+
+def _init_fit_worker(isotopes, cutoff_em_energy):
+    global _energy_injection
+    _energy_injection = make_energy_injection_model(
+        cutoff_em_energy, **{isotope: 1.0 for isotope in isotopes})
+
+
+def _fit_supernova(observation, isotopes, priors, sampler):
+    epochs, lum_dens, lum_dens_err = observation
+    likelihood = BolometricLightCurveLikelihood(
+        epochs, lum_dens, lum_dens_err, isotopes,
+        energy_injection=_energy_injection)
+    return sampler.run(likelihood, priors)
+
+
+def get_fitted_supernovae(h5_fname):
+    """
+    Names of the supernovae whose posterior is stored in a results file
+
+    Parameters
+    ----------
+
+    h5_fname: ~str
+        HDF5 filename
+
+    Returns
+    -------
+        : ~set
+    """
+    try:
+        with pd.HDFStore(h5_fname, mode='r') as results:
+            return {key.lstrip('/') for key in results.keys()}
+    except (IOError, OSError):
+        return set()
+
+
+def fit_supernovae(observations, priors, h5_fname, isotopes=SN_IA_ISOTOPES,
+                   sampler=None, cutoff_em_energy=20 * u.keV,
+                   max_workers=None, force_update=False):
+    """
+    Fit the bolometric light curves of several supernovae with the same
+    isotope model. Every worker builds the nuclear data and decay
+    propagators of the model once and reuses them for all its fits. The
+    posterior of every supernova is written to its own group of the
+    results file as soon as it is done, readable with
+    `MultiNestResult.from_hdf5(h5_fname, name)`. Supernovae that are already
+    in the results file are skipped, so running again after a failure only
+    fits the missing ones.
+
+    Parameters
+    ----------
+
+    observations: ~dict
+        name: (epochs, lum_dens, lum_dens_err) (see
+        `~nuclear.multinest.likelihood.BolometricLightCurveLikelihood`)
+
+    priors: ~nuclear.multinest.priors.PriorCollection
+        priors of the isotope masses, fraction and distance
+
+    h5_fname: ~str
+        HDF5 results filename
+
+    isotopes: ~list
+        fitted isotopes [default = Ni56, Ni57, Co55, Ti44]
+
+    sampler: ~nuclear.multinest.samplers.BaseSampler
+        [default = NestedSampler()]
+
+    cutoff_em_energy: ~float or ~astropy.units.Quantity
+        see `nuclear.models.base.make_energy_injection_model`
+        [default = 20 keV]
+
+    max_workers: ~int
+        number of processes; 0 fits in this process
+        [default: number of CPUs]
+
+    force_update: ~bool
+        fit supernovae that are already in the results file again
+        [default = False]
+
+    Returns
+    -------
+        : ~dict
+        name: exception for the supernovae whose fit failed
+    """
+    if sampler is None:
+        sampler = NestedSampler()
+    fitted_supernovae = set() if force_update else get_fitted_supernovae(
+        h5_fname)
+    names = [name for name in observations if name not in fitted_supernovae]
+    skipped = len(observations) - len(names)
+    if skipped > 0:
+        logger.info(f"Skipping {skipped} supernovae that are already fitted")
+
+    # sets up (and downloads) the nuclear data before the workers read it
+    _init_fit_worker(isotopes, cutoff_em_energy)
+
+    errors = {}
+
+    def store_posterior(name, posterior_data):
+        with pd.HDFStore(h5_fname, mode='a') as results:
+            results.put(name, posterior_data)
+
+    if max_workers == 0:
+        for name in names:
+            try:
+                store_posterior(name, _fit_supernova(
+                    observations[name], isotopes, priors,
+                    sampler.for_object(name)))
+            except Exception as e:
+                logger.warning(f"Fitting {name} failed: {e}")
+                errors[name] = e
+        return errors
+
+    with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_fit_worker,
+            initargs=(isotopes, cutoff_em_energy)) as fit_pool:
+        # the samplers of all supernovae are set up here, so that every fit
+        # gets its own random numbers
+        futures = {
+            fit_pool.submit(_fit_supernova, observations[name], isotopes,
+                            priors, sampler.for_object(name)): name
+            for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                store_posterior(name, future.result())
+            except Exception as e:
+                logger.warning(f"Fitting {name} failed: {e}")
+                errors[name] = e
+    return errors
@@ -1,20 +1,23 @@
 import numpy as np
 from scipy import optimize
+import os
 import sys
 
 from astropy import modeling
 from itertools import chain
-from nuclear.ejecta import Ejecta
-
-
-from nuclear.nuclear_data import DecayRadiation
+from nuclear.multinest.likelihood import (BolometricLightCurveLikelihood,
+                                          ParallelLikelihood)
+from nuclear.multinest.samplers import PyMultiNestSampler
+from nuclear.multinest.posterior import (convert_posterior_data,
+                                         get_posterior_fname,
+                                         read_posterior_columns,
+                                         POSTERIOR_COLUMNS_DIR)
 
 from scipy import stats
 from collections import OrderedDict
 import pandas as pd
 
 from astropy import units as u
-import pymultinest
 
 msun_to_cgs = u.Msun.to(u.g)
 mpc_to_cm = u.Mpc.to(u.cm)
@@ -35,45 +38,40 @@ class BolometricLightCurveModelIa(object):
 
 
     def __init__(self, epochs, lum_dens, lum_dens_err, ni56, ni57, co55, ti44):
+        # the light curve is linear in the isotope masses (see
+        # `BolometricLightCurveLikelihood`), so the initial masses are not
+        # needed to set up the model
         self.epochs = epochs
         self.lum_dens = lum_dens
         self.lum_dens_err = lum_dens_err
-        self.ejecta = Ejecta.from_masses(Ni56=ni56 * u.Msun, Ni57=ni57 * u.Msun,
-                                         Co55=co55 * u.Msun, Ti44=ti44 * u.Msun)
-        self.nuclear_data = DecayRadiation(self.ejecta.get_all_children_nuc_name())
-        self.rad_trans = SimpleLateTime(self.ejecta, self.nuclear_data)
+        self._likelihood_args = (epochs, lum_dens, lum_dens_err,
+                                 ['Ni56', 'Ni57', 'Co55', 'Ti44'])
+        self.likelihood = BolometricLightCurveLikelihood(
+            *self._likelihood_args)
 
     def calculate_light_curve(self, ni56, ni57, co55, ti44, fraction=1.0,
                               distance=6.4, epochs=None):
+        """
+        Luminosity density in erg / (s cm^2) at `epochs` (default: the
+        observed epochs)
+        """
+        return self.calculate_individual_light_curve(
+            ni56, ni57, co55, ti44, fraction, distance, epochs).sum(axis=0)
 
+    def calculate_individual_light_curve(self, ni56, ni57, co55, ti44,
+                                         fraction=1.0, distance=6.4,
+                                         epochs=None):
+        """
+        Luminosity density in erg / (s cm^2) of every isotope and its decay
+        products (n_isotopes x n_epochs)
+        """
         if epochs is None:
-            epochs = self.epochs
-        total_mass = ni56 + ni57 + co55 + ti44
-
-        self.ejecta.mass_g = total_mass * msun_to_cgs
-        self.ejecta['Ni56'] = ni56 / total_mass
-        self.ejecta['Ni57'] = ni57 / total_mass
-        self.ejecta['Co55'] = co55 / total_mass
-        self.ejecta['Ti44'] = ti44 / total_mass
-        luminosity_density =  self.rad_trans.total_bolometric_light_curve(epochs)
-        return (luminosity_density * fraction /
-                (4 * np.pi * (distance * mpc_to_cm)**2))
-
-
-    def calculate_individual_light_curve(self, ni56, ni57, co55, ti44, fraction=1.0,
-                              distance=6.4, epochs=None):
-
-        if epochs is None:
-            epochs = self.epochs
-        total_mass = ni56 + ni57 + co55 + ti44
-
-        self.ejecta.mass_g = total_mass * msun_to_cgs
-        self.ejecta['Ni56'] = ni56 / total_mass
-        self.ejecta['Ni57'] = ni57 / total_mass
-        self.ejecta['Co55'] = co55 / total_mass
-        self.ejecta['Ti44'] = ti44 / total_mass
-        luminosity_density =  self.rad_trans.bolometric_light_curve(epochs)
-        return (luminosity_density * fraction /
+            unit_light_curves = self.likelihood.unit_light_curves
+        else:
+            unit_light_curves = self.likelihood.calculate_unit_light_curves(
+                epochs)
+        isotope_masses = np.array([ni56, ni57, co55, ti44], dtype=np.float64)
+        return (isotope_masses[:, None] * unit_light_curves * fraction /
                 (4 * np.pi * (distance * mpc_to_cm)**2))
 
 
@@ -81,14 +79,11 @@ class BolometricLightCurveModelIa(object):
 
         model_light_curve = self.calculate_light_curve(ni56, ni57, co55, ti44,
                                                  fraction, distance)
-        return (model_light_curve.value - self.lum_dens)/self.lum_dens_err
+        return (model_light_curve - self.lum_dens)/self.lum_dens_err
 
 
     def log_likelihood(self, model_param, ndim, nparam):
-        #return -5
-
-        model_param = [model_param[i] for i in xrange(6)]
-        return (-0.5 * self.fitness_function(*model_param)**2).sum()
+        return self.likelihood(model_param, ndim, nparam)
 
     def simple_fit(self, ni56, ni57, co55, ti44, method='Nelder-Mead'):
         def fit_func(isotopes):
@@ -106,13 +101,41 @@ class BolometricLightCurveModelIa(object):
         return fit, norm_factor, mdl
 
 
-    def multinest_fit(self, priors, **kwargs):
+    def multinest_fit(self, priors, sampler=None, likelihood_workers=0,
+                      **kwargs):
+        """
+        Sample the posterior of the isotope masses, fraction and distance
 
+        Parameters
+        ----------
 
-        mn_fit = pymultinest.run(self.log_likelihood, priors.prior_transform, 6,
-                                 outputfiles_basename='sn11fe/fit', **kwargs)
+        priors: ~nuclear.multinest.priors.PriorCollection
 
-        return mn_fit
+        sampler: ~nuclear.multinest.samplers.BaseSampler
+            sampler backend [default = pymultinest writing to 'sn11fe/fit'
+            with the other keyword arguments]
+
+        likelihood_workers: ~int
+            number of processes evaluating batches of the likelihood (see
+            `~nuclear.multinest.likelihood.ParallelLikelihood`, only useful
+            with the batch samplers - pymultinest evaluates single points,
+            which stay in this process); 0 evaluates in this process, None
+            uses all CPUs [default = 0]
+
+        Returns
+        -------
+            : ~MultiNestResult
+        """
+        if sampler is None:
+            sampler = PyMultiNestSampler(outputfiles_basename='sn11fe/fit',
+                                         **kwargs)
+        if likelihood_workers == 0:
+            return MultiNestResult(sampler.run(self.likelihood, priors))
+
+        with ParallelLikelihood(BolometricLightCurveLikelihood,
+                                args=self._likelihood_args,
+                                max_workers=likelihood_workers) as likelihood:
+            return MultiNestResult(sampler.run(likelihood, priors))
 
 
 
@@ -121,7 +144,8 @@ class MultiNestResult():
 
 
     @classmethod
-    def from_multinest_basename(cls, basename, parameter_names):
+    def from_multinest_basename(cls, basename, parameter_names,
+                                columnar=False):
         """
         Reading a MultiNest result from a basename
 
@@ -131,14 +155,61 @@ class MultiNestResult():
         basename: str
             basename (path + prefix) for a multinest run
 
+        columnar: bool
+            convert the posterior text file once into memory-mapped columns
+            (see `~nuclear.multinest.posterior.convert_posterior_data`) and
+            open those on later reads [default = False]
+
         Returns
             : ~MultinestResult
         """
 
+        if columnar:
+            return cls.from_columns(cls.get_posterior_columns_dir(
+                basename, parameter_names))
+
         posterior_data = cls.read_posterior_data(basename, parameter_names)
 
         return cls(posterior_data)
 
+    @staticmethod
+    def get_posterior_columns_dir(basename, parameter_names):
+        """
+        Directory of the memory-mapped posterior columns of a MultiNest run,
+        converting the posterior text file if the columns are missing or
+        older
+
+        Parameters
+        ----------
+
+        basename: str
+            basename (path + prefix) for a multinest run
+
+        Returns
+            : ~str
+        """
+        columns_dir = os.path.join(basename, POSTERIOR_COLUMNS_DIR)
+        columns_fname = os.path.join(columns_dir, 'columns.json')
+        if (not os.path.exists(columns_fname) or
+                os.path.getmtime(columns_fname) <
+                os.path.getmtime(get_posterior_fname(basename))):
+            convert_posterior_data(basename, parameter_names)
+        return columns_dir
+
+    @classmethod
+    def from_columns(cls, columns_dir):
+        """
+        Reading a MultiNest result from memory-mapped posterior columns
+
+        Parameters
+        ----------
+
+        columns_dir: ~str
+            directory written by
+            `~nuclear.multinest.posterior.convert_posterior_data`
+        """
+        return cls(read_posterior_columns(columns_dir))
+
     @classmethod
     def from_hdf5(cls, h5_fname, key):
         """
@@ -172,17 +243,19 @@ class MultiNestResult():
         return posterior_data
 
     def __init__(self, posterior_data):
+        # a pandas.DataFrame or a mapping of column name to array
         self.posterior_data = posterior_data
-        self.parameter_names = [col_name for col_name in posterior_data.columns
+        self.parameter_names = [col_name for col_name in posterior_data.keys()
                                 if col_name not in ['x', 'posterior']]
 
     def calculate_sigmas(self, sigma):
         sigmas = OrderedDict()
+        posterior_values = np.asarray(self.posterior_data['posterior'])
         for parameter_name in self.parameter_names:
-            posterior_data = self.posterior_data.sort(parameter_name)
-            parameter_values, posterior_values = (posterior_data[parameter_name],
-                                                  posterior_data['posterior'])
-            posterior_cumsum = posterior_values.cumsum()
+            parameter_values = np.asarray(self.posterior_data[parameter_name])
+            sort_order = np.argsort(parameter_values)
+            parameter_values = parameter_values[sort_order]
+            posterior_cumsum = posterior_values[sort_order].cumsum()
 
             norm_distr = stats.norm(loc=0.0, scale=1.)
 
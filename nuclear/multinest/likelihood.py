@@ -0,0 +1,258 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+
+from astropy import units as u
+
+from nuclear.ejecta import to_seconds
+from nuclear.models.base import make_energy_injection_model
+
+mpc_to_cm = u.Mpc.to(u.cm)
+
+
+class BolometricLightCurveLikelihood(object):
+    """
+    Chi^2 log-likelihood of an observed bolometric light curve (luminosity
+    density) for the parameters: isotope masses (in solar masses), fraction
+    of the luminosity and distance (in Mpc).
+
+    The luminosity (energy injected by leptons and by x-rays and gamma-rays
+    below the cutoff energy) is linear in the isotope masses, so the light
+    curve of one solar mass of every isotope is computed on the observed
+    epochs once. A likelihood evaluation is then a single matrix product of
+    the masses with these unit light curves.
+
+    Parameters
+    ----------
+
+    epochs: numpy or quantity array
+        observed epochs [default unit = days]
+
+    lum_dens: ~np.ndarray
+        observed luminosity density in erg / (s cm^2)
+
+    lum_dens_err: ~np.ndarray
+        uncertainty of the luminosity density in erg / (s cm^2)
+
+    isotopes: ~list
+        names of the isotopes whose masses are fitted
+
+    cutoff_em_energy: ~float or ~astropy.units.Quantity
+        see `nuclear.models.base.make_energy_injection_model`
+        [default = 20 keV]
+
+    energy_injection: ~nuclear.models.base.BaseEnergyInjection
+        energy injection model of `isotopes` (in any order) to reuse (e.g.
+        shared by the fits of several supernovae), which sets the cutoff
+        energy - `cutoff_em_energy` can not be given with it
+        [default = None]
+    """
+
+    def __init__(self, epochs, lum_dens, lum_dens_err, isotopes,
+                 cutoff_em_energy=None, energy_injection=None):
+        self.epochs = epochs
+        self.isotopes = list(isotopes)
+        self.parameter_names = ([isotope.lower() for isotope in self.isotopes] +
+                                ['fraction', 'distance'])
+        self.n_params = len(self.parameter_names)
+        lum_dens = np.asarray(lum_dens, dtype=np.float64)
+        lum_dens_err = np.asarray(lum_dens_err, dtype=np.float64)
+
+        if energy_injection is None:
+            if cutoff_em_energy is None:
+                cutoff_em_energy = 20 * u.keV
+            energy_injection = make_energy_injection_model(
+                cutoff_em_energy,
+                **{isotope: 1.0 for isotope in self.isotopes})
+        elif cutoff_em_energy is not None:
+            raise ValueError('cutoff_em_energy is set by the given '
+                             'energy_injection model')
+        param_names = list(energy_injection.param_names)
+        isotope_names = [isotope.lower() for isotope in self.isotopes]
+        if sorted(param_names) != sorted(isotope_names):
+            raise ValueError(
+                f'The isotopes of the energy injection model '
+                f'({", ".join(param_names)}) are not the fitted isotopes '
+                f'({", ".join(isotope_names)})')
+        self.energy_injection = energy_injection
+        # masses of one solar mass of every isotope in the order of the
+        # parameters of the energy injection model
+        self._unit_isotope_masses = np.eye(len(param_names))[
+            [param_names.index(isotope_name)
+             for isotope_name in isotope_names]]
+        self.unit_light_curves = self.calculate_unit_light_curves(epochs)
+        # weighted by the uncertainties once instead of every evaluation
+        self._weighted_unit_light_curves = (self.unit_light_curves /
+                                            lum_dens_err)
+        self._weighted_lum_dens = lum_dens / lum_dens_err
+
+    def calculate_unit_light_curves(self, epochs):
+        """
+        Luminosity of one solar mass of every isotope
+
+        Parameters
+        ----------
+
+        epochs: numpy or quantity array
+            [default unit = days]
+
+        Returns
+        -------
+            : ~np.ndarray
+            luminosity in erg / s (n_isotopes x n_epochs)
+        """
+        epochs_s = to_seconds(epochs)
+        energy_injection = self.energy_injection
+        unit_light_curves = []
+        for isotope_masses in self._unit_isotope_masses:
+            energy_injection._update_ejecta(isotope_masses)
+            unit_light_curves.append(
+                energy_injection.calculate_total_injected_energy_per_s_raw(
+                    epochs_s))
+        return np.array(unit_light_curves)
+
+    def calculate_light_curves(self, parameters):
+        """
+        Luminosity density of a batch of parameter vectors
+
+        Parameters
+        ----------
+
+        parameters: ~np.ndarray
+            isotope masses, fraction and distance
+            (n_points x n_params or n_params)
+
+        Returns
+        -------
+            : ~np.ndarray
+            luminosity density in erg / (s cm^2) (n_points x n_epochs)
+        """
+        parameters = np.atleast_2d(np.asarray(parameters, dtype=np.float64))
+        return (self._get_scale(parameters)[:, None] *
+                (parameters[:, :-2] @ self.unit_light_curves))
+
+    def log_likelihood_batch(self, parameters):
+        """
+        Log-likelihood of a batch of parameter vectors
+
+        Parameters
+        ----------
+
+        parameters: ~np.ndarray
+            isotope masses, fraction and distance
+            (n_points x n_params or n_params)
+
+        Returns
+        -------
+            : ~np.ndarray
+            log-likelihood (n_points)
+        """
+        parameters = np.atleast_2d(np.asarray(parameters, dtype=np.float64))
+        fitness = (self._get_scale(parameters)[:, None] *
+                   (parameters[:, :-2] @ self._weighted_unit_light_curves) -
+                   self._weighted_lum_dens)
+        return -0.5 * np.einsum('ij,ij->i', fitness, fitness)
+
+    @staticmethod
+    def _get_scale(parameters):
+        fraction, distance = parameters[:, -2], parameters[:, -1]
+        return fraction / (4 * np.pi * (distance * mpc_to_cm) ** 2)
+
+    def __call__(self, model_param, ndim, nparam):
+        # per-point interface of pymultinest
+        return self.log_likelihood_batch(
+            [model_param[i] for i in range(self.n_params)])[0]
+
+
+# likelihood of a worker process of `ParallelLikelihood`
+_worker_likelihood = None
+
+
+def _init_worker_likelihood(likelihood_class, args, kwargs):
+    global _worker_likelihood
+    _worker_likelihood = likelihood_class(*args, **kwargs)
+
+
+def _worker_log_likelihood_batch(parameters):
+    return _worker_likelihood.log_likelihood_batch(parameters)
+
+
+class ParallelLikelihood(object):
+    """
+    Evaluate batches of parameter vectors (live points, walkers) of a
+    likelihood across a process pool. Every worker builds its own likelihood
+    (with its own ejecta, decay radiation and decay propagators) once from
+    the pickle-friendly specification `likelihood_class(*args, **kwargs)`.
+    A batch is split into one contiguous chunk per worker and the results
+    are returned in the order of the batch.
+
+    Parameters
+    ----------
+
+    likelihood_class: ~type
+        class with a method log_likelihood_batch(parameters)
+
+    args: ~tuple
+        positional arguments of `likelihood_class`
+
+    kwargs: ~dict
+        keyword arguments of `likelihood_class`
+
+    max_workers: ~int
+        number of processes [default: number of CPUs]
+    """
+
+    def __init__(self, likelihood_class, args=(), kwargs=None,
+                 max_workers=None):
+        if kwargs is None:
+            kwargs = {}
+        if max_workers is None:
+            max_workers = os.cpu_count()
+        self.max_workers = max_workers
+        # local likelihood for the parameter names and per-point calls
+        self.likelihood = likelihood_class(*args, **kwargs)
+        self.parameter_names = getattr(self.likelihood, 'parameter_names',
+                                       None)
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker_likelihood,
+            initargs=(likelihood_class, args, kwargs))
+
+    def log_likelihood_batch(self, parameters):
+        """
+        Log-likelihood of a batch of parameter vectors
+
+        Parameters
+        ----------
+
+        parameters: ~np.ndarray
+            (n_points x n_params or n_params)
+
+        Returns
+        -------
+            : ~np.ndarray
+            log-likelihood (n_points)
+        """
+        parameters = np.atleast_2d(np.asarray(parameters, dtype=np.float64))
+        if len(parameters) == 0:
+            return np.empty(0)
+        chunks = np.array_split(parameters,
+                                min(self.max_workers, len(parameters)))
+        return np.concatenate(
+            list(self.executor.map(_worker_log_likelihood_batch, chunks)))
+
+    def __call__(self, model_param, ndim, nparam):
+        # a single point is not worth sending to a worker
+        if callable(self.likelihood):
+            return self.likelihood(model_param, ndim, nparam)
+        return self.likelihood.log_likelihood_batch(
+            [model_param[i] for i in range(nparam)])[0]
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
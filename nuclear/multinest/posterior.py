@@ -0,0 +1,300 @@
+from collections import OrderedDict
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+logger = logging.getLogger(__name__)
+
+# rows of the posterior text file read at a time
+POSTERIOR_CHUNKSIZE = 1000000
+POSTERIOR_COLUMNS_DIR = 'fit_columns'
+
+
+def get_posterior_fname(basename):
+    return '{0}/fit.txt'.format(basename)
+
+
+def iter_posterior_data(basename, parameter_names,
+                        chunksize=POSTERIOR_CHUNKSIZE):
+    """
+    Read the posterior text file of a MultiNest run in chunks
+
+    Parameters
+    ----------
+
+    basename: str
+        basename (path + prefix) for a multinest run
+
+    parameter_names: ~list
+
+    chunksize: ~int
+        rows per chunk [default = 1000000]
+
+    Returns
+    -------
+        : iterator of ~pd.DataFrame
+    """
+    with pd.read_csv(get_posterior_fname(basename), delim_whitespace=True,
+                     names=['posterior', 'x'] + list(parameter_names),
+                     chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _count_lines(fname):
+    n_lines = 0
+    last_byte = b'\n'
+    with open(fname, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 24), b''):
+            n_lines += block.count(b'\n')
+            last_byte = block[-1:]
+    if last_byte != b'\n':
+        n_lines += 1
+    return n_lines
+
+
+def convert_posterior_data(basename, parameter_names,
+                           chunksize=POSTERIOR_CHUNKSIZE):
+    """
+    Convert the posterior text file of a MultiNest run once into one .npy
+    file per column (in `<basename>/fit_columns`) that `read_posterior_columns`
+    opens as memory maps
+
+    Parameters
+    ----------
+
+    basename: str
+        basename (path + prefix) for a multinest run
+
+    parameter_names: ~list
+
+    chunksize: ~int
+        rows converted at a time [default = 1000000]
+
+    Returns
+    -------
+        : ~str
+        directory of the columns
+    """
+    column_names = ['posterior', 'x'] + list(parameter_names)
+    columns_dir = os.path.join(basename, POSTERIOR_COLUMNS_DIR)
+    os.makedirs(columns_dir, exist_ok=True)
+    n_rows = _count_lines(get_posterior_fname(basename))
+    logger.info(f"Converting {n_rows} posterior samples to {columns_dir}")
+
+    columns = OrderedDict(
+        (column_name, np.lib.format.open_memmap(
+            os.path.join(columns_dir, f'{column_name}.npy.tmp'), mode='w+',
+            dtype=np.float64, shape=(n_rows, )))
+        for column_name in column_names)
+    start = 0
+    for chunk in iter_posterior_data(basename, parameter_names, chunksize):
+        for column_name, column in columns.items():
+            column[start:start + len(chunk)] = chunk[column_name].values
+        start += len(chunk)
+    if start != n_rows:
+        raise IOError(f'{get_posterior_fname(basename)} has {start} '
+                      f'samples in {n_rows} lines')
+
+    for column in columns.values():
+        column.flush()
+    del columns
+    for column_name in column_names:
+        os.replace(os.path.join(columns_dir, f'{column_name}.npy.tmp'),
+                   os.path.join(columns_dir, f'{column_name}.npy'))
+    # written last, marks the conversion as complete
+    with open(os.path.join(columns_dir, 'columns.json'), 'w') as fh:
+        json.dump(column_names, fh)
+    return columns_dir
+
+
+def read_posterior_columns(columns_dir, mmap_mode='r'):
+    """
+    Open the columns written by `convert_posterior_data`
+
+    Parameters
+    ----------
+
+    columns_dir: ~str
+
+    mmap_mode: ~str
+        see `numpy.load` [default = 'r']
+
+    Returns
+    -------
+        : ~collections.OrderedDict
+        column name: ~np.ndarray
+    """
+    with open(os.path.join(columns_dir, 'columns.json')) as fh:
+        column_names = json.load(fh)
+    return OrderedDict(
+        (column_name, np.load(os.path.join(columns_dir, f'{column_name}.npy'),
+                              mmap_mode=mmap_mode))
+        for column_name in column_names)
+
+
+def iter_posterior_columns(columns, chunksize=POSTERIOR_CHUNKSIZE):
+    """
+    Slices of columns (e.g. from `read_posterior_columns`) in chunks
+
+    Returns
+    -------
+        : iterator of ~dict
+    """
+    n_rows = len(next(iter(columns.values())))
+    for start in range(0, n_rows, chunksize):
+        yield {column_name: column[start:start + chunksize]
+               for column_name, column in columns.items()}
+
+
+class PosteriorSummary(object):
+    """
+    Weighted means, quantiles and sigmas of posterior samples accumulated
+    chunk by chunk, so that the samples never need to be in memory at once.
+    The samples are read twice: once for the means and the range of every
+    parameter, then for weighted histograms from which the quantiles are
+    interpolated (accurate to the bin width, range / n_bins).
+
+    Parameters
+    ----------
+
+    parameter_names: ~list
+
+    n_bins: ~int
+        histogram bins per parameter [default = 10000]
+    """
+
+    def __init__(self, parameter_names, n_bins=10000):
+        self.parameter_names = list(parameter_names)
+        self.n_bins = n_bins
+        self.n_samples = 0
+        self.total_weight = 0.0
+        n_parameters = len(self.parameter_names)
+        self._weighted_sums = np.zeros(n_parameters)
+        self._minimum = np.full(n_parameters, np.inf)
+        self._maximum = np.full(n_parameters, -np.inf)
+        self._bin_edges = None
+        self._histograms = None
+
+    @classmethod
+    def from_chunks(cls, iter_chunks, parameter_names, n_bins=10000):
+        """
+        Parameters
+        ----------
+
+        iter_chunks: callable
+            returning a new iterator over the chunks (a mapping of column
+            name to values) for each pass
+
+        parameter_names: ~list
+
+        n_bins: ~int
+            [default = 10000]
+        """
+        summary = cls(parameter_names, n_bins=n_bins)
+        for chunk in iter_chunks():
+            summary.add_moments(chunk)
+        for chunk in iter_chunks():
+            summary.add_histograms(chunk)
+        return summary
+
+    @classmethod
+    def from_multinest_basename(cls, basename, parameter_names,
+                                chunksize=POSTERIOR_CHUNKSIZE, n_bins=10000):
+        """
+        Summary of the posterior text file of a MultiNest run
+        """
+        return cls.from_chunks(
+            lambda: iter_posterior_data(basename, parameter_names, chunksize),
+            parameter_names, n_bins=n_bins)
+
+    @classmethod
+    def from_columns(cls, columns, chunksize=POSTERIOR_CHUNKSIZE,
+                     n_bins=10000):
+        """
+        Summary of posterior columns (e.g. from `read_posterior_columns`)
+        """
+        parameter_names = [column_name for column_name in columns
+                           if column_name not in ['x', 'posterior']]
+        return cls.from_chunks(
+            lambda: iter_posterior_columns(columns, chunksize),
+            parameter_names, n_bins=n_bins)
+
+    def _get_values(self, chunk):
+        weights = np.asarray(chunk['posterior'], dtype=np.float64)
+        values = np.column_stack([np.asarray(chunk[parameter_name],
+                                             dtype=np.float64)
+                                  for parameter_name in self.parameter_names])
+        return weights, values
+
+    def add_moments(self, chunk):
+        """
+        First pass: weighted sums and range of every parameter
+        """
+        weights, values = self._get_values(chunk)
+        if len(weights) == 0:
+            return
+        self.n_samples += len(weights)
+        self.total_weight += weights.sum()
+        self._weighted_sums += weights @ values
+        self._minimum = np.minimum(self._minimum, values.min(axis=0))
+        self._maximum = np.maximum(self._maximum, values.max(axis=0))
+
+    def add_histograms(self, chunk):
+        """
+        Second pass: weighted histogram of every parameter
+        """
+        if self._bin_edges is None:
+            self._bin_edges = [
+                np.linspace(minimum, maximum, self.n_bins + 1)
+                for minimum, maximum in zip(self._minimum, self._maximum)]
+            self._histograms = np.zeros((len(self.parameter_names),
+                                         self.n_bins))
+        weights, values = self._get_values(chunk)
+        for i, bin_edges in enumerate(self._bin_edges):
+            self._histograms[i] += np.histogram(values[:, i], bins=bin_edges,
+                                                weights=weights)[0]
+
+    @property
+    def mean(self):
+        return OrderedDict(zip(self.parameter_names,
+                               self._weighted_sums / self.total_weight))
+
+    def quantile(self, q):
+        """
+        Weighted quantiles of every parameter
+
+        Parameters
+        ----------
+
+        q: ~float
+            between 0 and 1
+
+        Returns
+        -------
+            : ~collections.OrderedDict
+        """
+        quantiles = OrderedDict()
+        for parameter_name, bin_edges, histogram in zip(
+                self.parameter_names, self._bin_edges, self._histograms):
+            cdf = np.concatenate([[0.0], np.cumsum(histogram)]) / (
+                self.total_weight)
+            quantiles[parameter_name] = np.interp(q, cdf, bin_edges)
+        return quantiles
+
+    def calculate_sigmas(self, sigma):
+        """
+        Parameter values at the quantiles of -sigma and +sigma of a normal
+        distribution (see `MultiNestResult.calculate_sigmas`)
+        """
+        norm_distr = stats.norm(loc=0.0, scale=1.)
+        sigmas_low = self.quantile(norm_distr.cdf(-sigma))
+        sigmas_high = self.quantile(norm_distr.cdf(sigma))
+        return OrderedDict(
+            (parameter_name, (sigmas_low[parameter_name],
+                              sigmas_high[parameter_name]))
+            for parameter_name in self.parameter_names)
@@ -1,4 +1,7 @@
-from scipy import stats
+from collections import OrderedDict
+
+import numpy as np
+from scipy import special, stats
 
 
 class UniformPrior(object):
@@ -19,8 +22,16 @@ class UniformPrior(object):
         self.lbound = lbound
         self.ubound = ubound
 
+    @property
+    def parameters(self):
+        return (self.lbound, self.ubound)
+
+    @staticmethod
+    def transform_array(cube, lbound, ubound):
+        return cube * (ubound - lbound) + lbound
+
     def __call__(self, cube):
-        return cube * (self.ubound - self.lbound) + self.lbound
+        return self.transform_array(cube, *self.parameters)
 
     def __repr__(self):
         return "uniform prior lbound {0} ubound {1}".format(self.lbound,
@@ -45,8 +56,18 @@ class GaussianPrior(object):
         self.m = m
         self.sigma = sigma
 
+    @property
+    def parameters(self):
+        return (self.m, self.sigma)
+
+    @staticmethod
+    def transform_array(cube, m, sigma):
+        # same as stats.norm.ppf(cube, loc=m, scale=sigma) without the
+        # argument checking overhead of scipy.stats
+        return special.ndtri(cube) * sigma + m
+
     def __call__(self, cube):
-        return stats.norm.ppf(cube,scale=self.sigma,loc=self.m)
+        return self.transform_array(cube, *self.parameters)
 
     def __repr__(self):
         return "gaussian prior - mean {0} std {1}".format(self.m, self.sigma)
@@ -67,8 +88,16 @@ class PoissonPrior(object):
     def __init__(self, m):
         self.m = m
 
+    @property
+    def parameters(self):
+        return (self.m, )
+
+    @staticmethod
+    def transform_array(cube, m):
+        return stats.poisson.ppf(cube, m)
+
     def __call__(self, cube):
-        return stats.poisson.ppf(cube,loc=self.m)
+        return self.transform_array(cube, *self.parameters)
 
     def __repr__(self):
         return "poisson prior: loc {0}".format(self.m)
@@ -87,6 +116,14 @@ class FixedPrior(object):
     def __init__(self, val):
         self.val = val
 
+    @property
+    def parameters(self):
+        return (self.val, )
+
+    @staticmethod
+    def transform_array(cube, val):
+        return np.broadcast_to(val, np.shape(cube))
+
     def __call__(self, cube):
         return self.val
 
@@ -100,6 +137,11 @@ class FixedPrior(object):
 class PriorCollection(object):
     """
     A collection of prior objects that will be evaluated
+
+    Priors of the same class that provide `parameters` and a vectorized
+    `transform_array` (all priors in this module) are compiled into
+    parameter arrays, so that a whole cube of points is transformed with one
+    call per prior class. Other callables are applied column by column.
     """
     def __init__(self, priors_list):
 
@@ -109,12 +151,62 @@ class PriorCollection(object):
             if not hasattr(prior, '__call__'):
                 raise TypeError('Given prior {0} is not callable'.format(prior))
 
+        self._compile_priors()
+
+    def _compile_priors(self):
+        prior_indices = OrderedDict()
+        for i, prior in enumerate(self.priors):
+            if hasattr(prior, 'transform_array') and hasattr(prior,
+                                                             'parameters'):
+                key = type(prior)
+            else:
+                key = prior
+            prior_indices.setdefault(key, []).append(i)
+
+        # (transform, parameter indices, parameter arrays)
+        self._compiled_priors = []
+        for key, indices in prior_indices.items():
+            if isinstance(key, type):
+                parameters = [np.array(parameter, dtype=np.float64)
+                              for parameter in zip(*[self.priors[i].parameters
+                                                     for i in indices])]
+                self._compiled_priors.append(
+                    (key.transform_array, np.array(indices), parameters))
+            else:
+                for i in indices:
+                    self._compiled_priors.append((key, i, []))
+
+    def prior_transform_array(self, cube):
+        """
+        Transform points of the unit cube according to the priors
+
+        Parameters
+        ----------
+
+        cube: ~np.ndarray
+            values from 0 to 1 (n_points x n_params or n_params)
+
+        Returns
+        -------
+            : ~np.ndarray
+            parameters with the same shape as `cube`
+        """
+        cube = np.asarray(cube, dtype=np.float64)
+        transformed_cube = np.empty_like(cube)
+        for transform, indices, parameters in self._compiled_priors:
+            transformed_cube[..., indices] = transform(cube[..., indices],
+                                                       *parameters)
+        return transformed_cube
+
     def prior_transform(self, cube, ndim, nparam):
         # will be given an array of values from 0 to 1 and transforms it
-        # according to the prior distribution
+        # according to the prior distribution (in place, one point at a time
+        # as pymultinest calls it)
 
-        for i in xrange(nparam):
-            cube[i] = self.priors[i](cube[i])
+        transformed_cube = self.prior_transform_array(
+            [cube[i] for i in range(nparam)])
+        for i in range(nparam):
+            cube[i] = transformed_cube[i]
 
     def _generate_prior_str(self):
         return [repr(item) for item in self.priors]
@@ -0,0 +1,409 @@
+import copy
+import os
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+
+class BaseSampler(metaclass=ABCMeta):
+    """
+    Sampler backend. A sampler draws from the posterior of a likelihood
+    object (with a vectorized `log_likelihood_batch`) and a
+    `~nuclear.multinest.priors.PriorCollection`, and returns the posterior
+    samples in the format of the MultiNest output: columns `posterior`
+    (weight of the sample), `x` (-2 x log-likelihood) and one column per
+    parameter.
+    """
+
+    @abstractmethod
+    def run(self, likelihood, priors, parameter_names=None):
+        """
+        Sample the posterior
+
+        Parameters
+        ----------
+
+        likelihood: object
+            with a method log_likelihood_batch(parameters) mapping
+            parameters (n_points x n_params) to log-likelihoods (n_points)
+
+        priors: ~nuclear.multinest.priors.PriorCollection
+
+        parameter_names: ~list
+            [default = `likelihood.parameter_names` if available]
+
+        Returns
+        -------
+            : ~pd.DataFrame
+            posterior samples
+        """
+
+    # seed sequence of the random numbers of the sampler (None if the
+    # sampler has no random number generator)
+    seed_sequence = None
+
+    def for_object(self, name):
+        """
+        Sampler for the fit of one of several objects (see
+        `~nuclear.multinest.batch.fit_supernovae`). Every call spawns an
+        independent random number generator, so that the objects do not
+        share random streams.
+
+        Parameters
+        ----------
+
+        name: ~str
+
+        Returns
+        -------
+            : ~BaseSampler
+        """
+        sampler = copy.copy(self)
+        if self.seed_sequence is not None:
+            sampler.seed_sequence = self.seed_sequence.spawn(1)[0]
+            sampler.rng = np.random.default_rng(sampler.seed_sequence)
+        return sampler
+
+    @staticmethod
+    def _get_parameter_names(likelihood, priors, parameter_names):
+        if parameter_names is None:
+            parameter_names = getattr(
+                likelihood, 'parameter_names',
+                ['p{0}'.format(i) for i in range(len(priors.priors))])
+        return list(parameter_names)
+
+    @staticmethod
+    def _to_posterior_data(parameters, log_likelihood, log_weights,
+                           parameter_names):
+        weights = np.exp(log_weights - special.logsumexp(log_weights))
+        posterior_data = pd.DataFrame(data=parameters,
+                                      columns=parameter_names)
+        posterior_data.insert(0, 'x', -2 * log_likelihood)
+        posterior_data.insert(0, 'posterior', weights)
+        return posterior_data
+
+
+class PyMultiNestSampler(BaseSampler):
+    """
+    MultiNest through pymultinest (needs the compiled MultiNest library).
+    The likelihood is called once per point, through its per-point
+    interface `likelihood(cube, ndim, nparam)` if it has one.
+
+    Parameters
+    ----------
+
+    outputfiles_basename: ~str
+        path and prefix of the MultiNest output files [default = 'chains/fit']
+
+    kwargs:
+        passed to `pymultinest.run`
+    """
+
+    def __init__(self, outputfiles_basename='chains/fit', **kwargs):
+        self.outputfiles_basename = outputfiles_basename
+        self.kwargs = kwargs
+        if kwargs.get('seed', -1) >= 0:
+            self.seed_sequence = np.random.SeedSequence(kwargs['seed'])
+
+    def for_object(self, name):
+        sampler = super(PyMultiNestSampler, self).for_object(name)
+        if sampler.seed_sequence is not None:
+            # MultiNest takes a non-negative 32-bit integer seed
+            sampler.kwargs = dict(
+                self.kwargs,
+                seed=int(sampler.seed_sequence.generate_state(1)[0] >> 1))
+        # keep the output files of every object in their own directory
+        output_dir, prefix = os.path.split(self.outputfiles_basename)
+        sampler.outputfiles_basename = os.path.join(output_dir, name, prefix)
+        return sampler
+
+    def run(self, likelihood, priors, parameter_names=None):
+        import pymultinest
+
+        parameter_names = self._get_parameter_names(likelihood, priors,
+                                                    parameter_names)
+        n_params = len(priors.priors)
+
+        if callable(likelihood):
+            # per-point interface (evaluated in this process by
+            # `~nuclear.multinest.likelihood.ParallelLikelihood`)
+            log_likelihood = likelihood
+        else:
+            def log_likelihood(cube, ndim, nparam):
+                return likelihood.log_likelihood_batch(
+                    [cube[i] for i in range(n_params)])[0]
+
+        output_dir = os.path.dirname(self.outputfiles_basename)
+        if output_dir != '':
+            os.makedirs(output_dir, exist_ok=True)
+        pymultinest.run(log_likelihood, priors.prior_transform, n_params,
+                        outputfiles_basename=self.outputfiles_basename,
+                        **self.kwargs)
+        posterior_data = pd.read_csv(
+            '{0}.txt'.format(self.outputfiles_basename),
+            delim_whitespace=True,
+            names=['posterior', 'x'] + parameter_names)
+        posterior_data.index = np.arange(len(posterior_data))
+        return posterior_data
+
+
+class NestedSampler(BaseSampler):
+    """
+    In-process nested sampler working on batches of points. Every iteration
+    replaces the `n_replace` worst live points at once by points drawn from
+    the (enlarged) bounding ellipsoid of the live points in the unit cube,
+    so the priors and the likelihood are evaluated on whole arrays.
+
+    Parameters
+    ----------
+
+    n_live_points: ~int
+        [default = 400]
+
+    n_replace: ~int
+        live points replaced per iteration [default = n_live_points // 10]
+
+    evidence_tolerance: ~float
+        stop once the remaining live points can change the log-evidence by
+        less than this [default = 0.5]
+
+    enlargement: ~float
+        volume enlargement of the bounding ellipsoid [default = 1.5]
+
+    max_iterations: ~int
+        [default = 100000]
+
+    max_attempts: ~int
+        batches of draws per iteration before giving up on finding points
+        above the likelihood threshold (e.g. on a likelihood plateau)
+        [default = 1000]
+
+    seed: ~int
+        seed of the random number generator [default = None]
+
+    Attributes
+    ----------
+
+    log_evidence: ~float
+        log-evidence of the last run
+    """
+
+    def __init__(self, n_live_points=400, n_replace=None,
+                 evidence_tolerance=0.5, enlargement=1.5,
+                 max_iterations=100000, max_attempts=1000, seed=None):
+        self.n_live_points = n_live_points
+        if n_replace is None:
+            n_replace = max(n_live_points // 10, 1)
+        self.n_replace = n_replace
+        self.evidence_tolerance = evidence_tolerance
+        self.enlargement = enlargement
+        self.max_iterations = max_iterations
+        self.max_attempts = max_attempts
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.log_evidence = None
+
+    def run(self, likelihood, priors, parameter_names=None):
+        parameter_names = self._get_parameter_names(likelihood, priors,
+                                                    parameter_names)
+        n_live, n_dim = self.n_live_points, len(priors.priors)
+
+        live_cube = self.rng.uniform(size=(n_live, n_dim))
+        live_parameters = priors.prior_transform_array(live_cube)
+        live_log_likelihood = likelihood.log_likelihood_batch(live_parameters)
+
+        # expected log shrinkage of the prior volume when removing the worst
+        # 1, 2, ... n_replace of n_live points
+        log_shrinkage = -np.cumsum(1.0 / (n_live - np.arange(self.n_replace)))
+
+        dead_parameters, dead_log_likelihood, dead_log_weights = [], [], []
+        log_volume, log_evidence = 0.0, -np.inf
+        for _ in range(self.max_iterations):
+            log_remaining_evidence = live_log_likelihood.max() + log_volume
+            if (np.logaddexp(log_evidence, log_remaining_evidence) -
+                    log_evidence) < self.evidence_tolerance:
+                break
+
+            worst = np.argsort(live_log_likelihood)[:self.n_replace]
+            log_volumes = log_volume + log_shrinkage
+            previous_log_volumes = np.concatenate([[log_volume],
+                                                   log_volumes[:-1]])
+            log_widths = previous_log_volumes + np.log1p(
+                -np.exp(log_volumes - previous_log_volumes))
+            log_weights = live_log_likelihood[worst] + log_widths
+            dead_parameters.append(live_parameters[worst])
+            dead_log_likelihood.append(live_log_likelihood[worst])
+            dead_log_weights.append(log_weights)
+            log_evidence = np.logaddexp(log_evidence,
+                                        special.logsumexp(log_weights))
+            log_volume = log_volumes[-1]
+
+            (live_cube[worst], live_parameters[worst],
+             live_log_likelihood[worst]) = self._sample_constrained(
+                likelihood, priors, live_cube,
+                live_log_likelihood[worst[-1]], len(worst))
+
+        # the remaining live points share the remaining prior volume
+        dead_parameters.append(live_parameters)
+        dead_log_likelihood.append(live_log_likelihood)
+        dead_log_weights.append(live_log_likelihood + log_volume -
+                                np.log(n_live))
+        log_weights = np.concatenate(dead_log_weights)
+        self.log_evidence = special.logsumexp(log_weights)
+        return self._to_posterior_data(
+            np.concatenate(dead_parameters),
+            np.concatenate(dead_log_likelihood), log_weights, parameter_names)
+
+    def _sample_constrained(self, likelihood, priors, live_cube,
+                            log_likelihood_threshold, n_points):
+        """
+        Draw points with a log-likelihood above the threshold from the
+        bounding ellipsoid of the live points (or from the unit cube once the
+        ellipsoid is larger)
+        """
+        n_dim = live_cube.shape[1]
+        center = live_cube.mean(axis=0)
+        covariance = np.atleast_2d(np.cov(live_cube, rowvar=False))
+        covariance += np.eye(n_dim) * 1e-12
+        offsets = live_cube - center
+        scale = np.einsum('ij,jk,ik->i', offsets, np.linalg.inv(covariance),
+                          offsets).max() * self.enlargement ** (2.0 / n_dim)
+        cholesky = np.linalg.cholesky(covariance * scale)
+        log_ellipsoid_volume = (
+            n_dim / 2.0 * np.log(np.pi) - special.gammaln(n_dim / 2.0 + 1) +
+            np.log(np.diag(cholesky)).sum())
+        use_ellipsoid = log_ellipsoid_volume < 0.0
+
+        cube, parameters, log_likelihood = [], [], []
+        n_accepted, n_attempts = 0, 0
+        n_draws = 4 * max(n_points, 16)
+        while n_accepted < n_points:
+            if n_attempts == self.max_attempts:
+                raise RuntimeError(
+                    f'Found {n_accepted} of {n_points} points with a '
+                    f'log-likelihood above {log_likelihood_threshold} in '
+                    f'{n_attempts * n_draws} draws - the likelihood is flat '
+                    'or the constrained prior volume is empty')
+            n_attempts += 1
+            if use_ellipsoid:
+                directions = self.rng.normal(size=(n_draws, n_dim))
+                directions /= np.linalg.norm(directions, axis=1)[:, None]
+                radii = self.rng.uniform(size=n_draws) ** (1.0 / n_dim)
+                draws = center + (radii[:, None] * directions) @ cholesky.T
+                draws = draws[((draws > 0) & (draws < 1)).all(axis=1)]
+            else:
+                draws = self.rng.uniform(size=(n_draws, n_dim))
+            draw_parameters = priors.prior_transform_array(draws)
+            draw_log_likelihood = likelihood.log_likelihood_batch(
+                draw_parameters)
+            accepted = draw_log_likelihood > log_likelihood_threshold
+            cube.append(draws[accepted])
+            parameters.append(draw_parameters[accepted])
+            log_likelihood.append(draw_log_likelihood[accepted])
+            n_accepted += accepted.sum()
+
+        return (np.concatenate(cube)[:n_points],
+                np.concatenate(parameters)[:n_points],
+                np.concatenate(log_likelihood)[:n_points])
+
+
+class EnsembleSampler(BaseSampler):
+    """
+    Affine-invariant ensemble sampler (stretch move of Goodman & Weare as in
+    emcee) in the unit cube of the priors, where the posterior is
+    proportional to the likelihood of the transformed point. Each half of
+    the walkers is moved with one batch evaluation of the likelihood.
+
+    Parameters
+    ----------
+
+    n_walkers: ~int
+        even number of walkers [default = 64]
+
+    n_steps: ~int
+        [default = 2000]
+
+    n_burn: ~int
+        steps that are discarded, less than n_steps [default = 500]
+
+    stretch_scale: ~float
+        scale parameter a of the stretch move [default = 2.0]
+
+    seed: ~int
+        seed of the random number generator [default = None]
+
+    Attributes
+    ----------
+
+    acceptance_fraction: ~np.ndarray
+        fraction of accepted moves of every walker in the last run
+    """
+
+    def __init__(self, n_walkers=64, n_steps=2000, n_burn=500,
+                 stretch_scale=2.0, seed=None):
+        if n_walkers % 2 != 0:
+            raise ValueError('n_walkers needs to be even')
+        if n_steps <= n_burn:
+            raise ValueError(f'n_steps ({n_steps}) needs to be larger than '
+                             f'n_burn ({n_burn}) to keep any step')
+        self.n_walkers = n_walkers
+        self.n_steps = n_steps
+        self.n_burn = n_burn
+        self.stretch_scale = stretch_scale
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.acceptance_fraction = None
+
+    @staticmethod
+    def _log_likelihood(likelihood, priors, cube):
+        inside = ((cube > 0) & (cube < 1)).all(axis=1)
+        parameters = np.full(cube.shape, np.nan)
+        log_likelihood = np.full(len(cube), -np.inf)
+        parameters[inside] = priors.prior_transform_array(cube[inside])
+        log_likelihood[inside] = likelihood.log_likelihood_batch(
+            parameters[inside])
+        return parameters, log_likelihood
+
+    def run(self, likelihood, priors, parameter_names=None):
+        parameter_names = self._get_parameter_names(likelihood, priors,
+                                                    parameter_names)
+        n_dim = len(priors.priors)
+        half = self.n_walkers // 2
+        halves = [np.arange(half), np.arange(half, self.n_walkers)]
+
+        cube = self.rng.uniform(size=(self.n_walkers, n_dim))
+        parameters, log_likelihood = self._log_likelihood(likelihood, priors,
+                                                          cube)
+        n_accepted = np.zeros(self.n_walkers)
+        chain_parameters, chain_log_likelihood = [], []
+        for step in range(self.n_steps):
+            for walkers, partners in [halves, halves[::-1]]:
+                stretch = ((self.stretch_scale - 1) * self.rng.uniform(
+                    size=half) + 1) ** 2 / self.stretch_scale
+                partner_cube = cube[self.rng.choice(partners, size=half)]
+                proposal = partner_cube + stretch[:, None] * (
+                    cube[walkers] - partner_cube)
+                proposal_parameters, proposal_log_likelihood = (
+                    self._log_likelihood(likelihood, priors, proposal))
+                log_acceptance = ((n_dim - 1) * np.log(stretch) +
+                                  proposal_log_likelihood -
+                                  log_likelihood[walkers])
+                accepted = np.log(self.rng.uniform(size=half)) < log_acceptance
+                accepted_walkers = walkers[accepted]
+                cube[accepted_walkers] = proposal[accepted]
+                parameters[accepted_walkers] = proposal_parameters[accepted]
+                log_likelihood[accepted_walkers] = proposal_log_likelihood[
+                    accepted]
+                n_accepted[accepted_walkers] += 1
+
+            if step >= self.n_burn:
+                chain_parameters.append(parameters.copy())
+                chain_log_likelihood.append(log_likelihood.copy())
+
+        self.acceptance_fraction = n_accepted / self.n_steps
+        chain_log_likelihood = np.concatenate(chain_log_likelihood)
+        return self._to_posterior_data(
+            np.concatenate(chain_parameters), chain_log_likelihood,
+            np.zeros(len(chain_log_likelihood)), parameter_names)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from nuclear.multinest.batch import fit_supernovae, get_fitted_supernovae
+from nuclear.multinest.fitting import MultiNestResult
+from nuclear.multinest.likelihood import BolometricLightCurveLikelihood
+from nuclear.multinest.priors import (UniformPrior, FixedPrior,
+                                      PriorCollection)
+from nuclear.multinest.samplers import NestedSampler
+
+
+def make_observation(ni56, epochs):
+    likelihood = BolometricLightCurveLikelihood(
+        epochs, np.ones(len(epochs)), np.ones(len(epochs)), ['Ni56', 'Co56'])
+    lum_dens = likelihood.calculate_light_curves([ni56, 0.0, 1.0, 6.4])[0]
+    return epochs, lum_dens, 0.05 * lum_dens
+
+
+def test_fit_supernovae(decay_radiation_db, tmp_path):
+    observations = {
+        'sn2011fe': make_observation(0.6, np.linspace(100, 400, 8)),
+        'sn2014j': make_observation(0.4, np.linspace(50, 300, 5)),
+        'broken': (np.ones(3), np.ones(3), np.ones(2))}
+    priors = PriorCollection([UniformPrior(0.1, 1.0), FixedPrior(0.0),
+                              FixedPrior(1.0), FixedPrior(6.4)])
+    h5_fname = tmp_path / 'fits.h5'
+    sampler = NestedSampler(n_live_points=50, seed=1)
+
+    errors = fit_supernovae(observations, priors, h5_fname,
+                            isotopes=['Ni56', 'Co56'], sampler=sampler,
+                            max_workers=0)
+    assert set(errors) == {'broken'}
+    assert get_fitted_supernovae(h5_fname) == {'sn2011fe', 'sn2014j'}
+    for name, ni56 in [('sn2011fe', 0.6), ('sn2014j', 0.4)]:
+        result = MultiNestResult.from_hdf5(h5_fname, name)
+        assert result.parameter_names == ['ni56', 'co56', 'fraction',
+                                          'distance']
+        assert result.mean['ni56'] == pytest.approx(ni56, rel=0.05)
+
+    # running again only fits the supernovae that are not stored yet
+    observations['sn2011fe'] = observations['broken']
+    observations['broken'] = make_observation(0.3, np.linspace(100, 400, 8))
+    errors = fit_supernovae(observations, priors, h5_fname,
+                            isotopes=['Ni56', 'Co56'], sampler=sampler,
+                            max_workers=0)
+    assert errors == {}
+    assert MultiNestResult.from_hdf5(h5_fname, 'broken').mean[
+        'ni56'] == pytest.approx(0.3, rel=0.05)
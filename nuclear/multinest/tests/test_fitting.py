@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nuclear.io.nndc import base
+from nuclear.multinest.fitting import (BolometricLightCurveModelIa,
+                                       MultiNestResult)
+from nuclear.multinest.likelihood import ParallelLikelihood
+from nuclear.multinest.priors import (UniformPrior, FixedPrior,
+                                      PriorCollection)
+from nuclear.multinest.samplers import NestedSampler, PyMultiNestSampler
+
+SN_IA_EPOCHS = np.array([50.0, 100.0, 200.0, 400.0, 800.0])
+# ni56, ni57, co55, ti44, fraction, distance
+SN_IA_PARAMETERS = [0.6, 0.02, 0.005, 1e-4, 0.8, 6.4]
+
+
+@pytest.fixture
+def sn_ia_decay_radiation_db(decay_radiation_db):
+    # one line for every other unstable nuclide of the Ni56, Ni57, Co55 and
+    # Ti44 decay networks
+    isotopes = ["Ni57", "Co57", "Co55", "Fe55", "Ti44", "Sc44"]
+    decay_radiation = pd.DataFrame(
+        {"type": ["gamma_rays"] * len(isotopes),
+         "energy": [1377.6, 122.1, 931.1, 5.9, 78.3, 1157.0],
+         "intensity": [81.7, 85.6, 75.0, 28.0, 96.4, 99.9],
+         "heading": ["Gamma and X-ray radiation"] * len(isotopes)},
+        index=pd.Index(isotopes, name="isotope"))
+    meta = pd.DataFrame({"key": ["authors"] * len(isotopes),
+                         "value": ["A"] * len(isotopes)},
+                        index=pd.Index(isotopes, name="isotope"))
+    base.commit_decay_radiation(decay_radiation, meta)
+    return decay_radiation_db
+
+
+@pytest.fixture
+def sn_ia_model(sn_ia_decay_radiation_db):
+    model = BolometricLightCurveModelIa(
+        SN_IA_EPOCHS, np.ones(len(SN_IA_EPOCHS)), np.ones(len(SN_IA_EPOCHS)),
+        *SN_IA_PARAMETERS[:4])
+    lum_dens = model.calculate_light_curve(*SN_IA_PARAMETERS)
+    return BolometricLightCurveModelIa(SN_IA_EPOCHS, lum_dens, 0.05 * lum_dens,
+                                       *SN_IA_PARAMETERS[:4])
+
+
+def test_calculate_light_curve(sn_ia_model):
+    parameters = [0.5, 0.01, 0.004, 2e-4, 0.9, 7.0]
+    light_curve = sn_ia_model.calculate_light_curve(*parameters)
+    np.testing.assert_allclose(
+        light_curve,
+        sn_ia_model.likelihood.calculate_light_curves(parameters)[0])
+    np.testing.assert_allclose(
+        sn_ia_model.calculate_individual_light_curve(*parameters).sum(axis=0),
+        light_curve)
+    np.testing.assert_allclose(
+        sn_ia_model.calculate_light_curve(*parameters,
+                                          epochs=SN_IA_EPOCHS[::2]),
+        light_curve[::2])
+    np.testing.assert_allclose(
+        sn_ia_model.fitness_function(*SN_IA_PARAMETERS), 0.0, atol=1e-10)
+
+
+@pytest.fixture
+def sn_ia_priors():
+    return PriorCollection(
+        [UniformPrior(0.1, 1.5), UniformPrior(0.0, 0.1)] +
+        [FixedPrior(value) for value in SN_IA_PARAMETERS[2:]])
+
+
+def test_multinest_fit_sampler(sn_ia_model, sn_ia_priors):
+    sampler = NestedSampler(n_live_points=100, seed=1)
+    result = sn_ia_model.multinest_fit(sn_ia_priors, sampler=sampler)
+    assert isinstance(result, MultiNestResult)
+    assert sampler.log_evidence is not None
+    assert result.parameter_names == ['ni56', 'ni57', 'co55', 'ti44',
+                                      'fraction', 'distance']
+    assert result.mean['ni56'] == pytest.approx(SN_IA_PARAMETERS[0],
+                                                rel=0.05)
+    assert (result.posterior_data.distance == SN_IA_PARAMETERS[5]).all()
+
+
+def test_multinest_fit_likelihood_workers(sn_ia_model, sn_ia_priors):
+    result = sn_ia_model.multinest_fit(
+        sn_ia_priors, sampler=NestedSampler(n_live_points=100, seed=1),
+        likelihood_workers=2)
+    serial_result = sn_ia_model.multinest_fit(
+        sn_ia_priors, sampler=NestedSampler(n_live_points=100, seed=1))
+    assert result.parameter_names == serial_result.parameter_names
+    for parameter_name in ['ni56', 'ni57']:
+        assert result.mean[parameter_name] == pytest.approx(
+            serial_result.mean[parameter_name], rel=1e-6)
+
+
+def test_multinest_fit_pymultinest_likelihood_workers(sn_ia_model,
+                                                      sn_ia_priors, tmp_path,
+                                                      monkeypatch):
+    pytest.importorskip('pymultinest')
+
+    def log_likelihood_batch(self, parameters):
+        raise AssertionError('single points are sent to the workers')
+
+    # pymultinest evaluates one point at a time, which stays in this process
+    monkeypatch.setattr(ParallelLikelihood, 'log_likelihood_batch',
+                        log_likelihood_batch)
+    sampler = PyMultiNestSampler(
+        outputfiles_basename=str(tmp_path / 'chains' / 'fit'),
+        n_live_points=100, seed=1, verbose=False)
+    result = sn_ia_model.multinest_fit(sn_ia_priors, sampler=sampler,
+                                       likelihood_workers=2)
+    assert result.mean['ni56'] == pytest.approx(SN_IA_PARAMETERS[0],
+                                                rel=0.05)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from astropy import units as u
+
+from nuclear.models.base import make_energy_injection_model
+from nuclear.multinest.likelihood import (BolometricLightCurveLikelihood,
+                                          ParallelLikelihood, mpc_to_cm)
+
+
+def test_log_likelihood_batch(decay_radiation_db):
+    epochs = np.array([50.0, 100.0, 200.0, 400.0])
+    lum_dens = np.array([1e-9, 5e-10, 2e-10, 5e-11])
+    lum_dens_err = 0.1 * lum_dens
+    likelihood = BolometricLightCurveLikelihood(
+        epochs, lum_dens, lum_dens_err, ['Ni56', 'Co56'],
+        cutoff_em_energy=np.inf)
+
+    parameters = np.array([[0.6, 0.01, 1.0, 6.4], [0.3, 0.1, 0.5, 10.0]])
+    log_likelihood = likelihood.log_likelihood_batch(parameters)
+    assert log_likelihood.shape == (2, )
+
+    energy_injection = make_energy_injection_model(
+        cutoff_em_energy=np.inf, ni56=1.0, co56=1.0)
+    for (ni56, co56, fraction, distance), value in zip(parameters,
+                                                       log_likelihood):
+        energy_injection._update_ejecta([ni56, co56])
+        luminosity = energy_injection.calculate_total_injected_energy_per_s_raw(
+            epochs * u.day.to(u.s))
+        model_lum_dens = (luminosity * fraction /
+                          (4 * np.pi * (distance * mpc_to_cm) ** 2))
+        assert value == pytest.approx(
+            (-0.5 * ((model_lum_dens - lum_dens) / lum_dens_err) ** 2).sum())
+
+    # per-point interface of pymultinest
+    assert likelihood(list(parameters[1]), 4, 4) == log_likelihood[1]
+
+
+def test_shared_energy_injection(decay_radiation_db):
+    epochs = np.array([50.0, 100.0, 200.0])
+    lum_dens = np.array([1e-9, 5e-10, 2e-10])
+    likelihood = BolometricLightCurveLikelihood(
+        epochs, lum_dens, 0.1 * lum_dens, ['Ni56', 'Co56'])
+    # the shared model lists the isotopes in another order
+    energy_injection = make_energy_injection_model(20 * u.keV, co56=1.0,
+                                                   ni56=1.0)
+    shared_likelihood = BolometricLightCurveLikelihood(
+        epochs, lum_dens, 0.1 * lum_dens, ['Ni56', 'Co56'],
+        energy_injection=energy_injection)
+    np.testing.assert_allclose(shared_likelihood.unit_light_curves,
+                               likelihood.unit_light_curves)
+    assert not np.allclose(likelihood.unit_light_curves[0],
+                           likelihood.unit_light_curves[1])
+
+    with pytest.raises(ValueError, match='isotopes'):
+        BolometricLightCurveLikelihood(
+            epochs, lum_dens, 0.1 * lum_dens, ['Ni56', 'Ni57'],
+            energy_injection=energy_injection)
+    with pytest.raises(ValueError, match='cutoff_em_energy'):
+        BolometricLightCurveLikelihood(
+            epochs, lum_dens, 0.1 * lum_dens, ['Ni56', 'Co56'],
+            cutoff_em_energy=np.inf, energy_injection=energy_injection)
+
+
+class WorkerLikelihood(object):
+    parameter_names = ['a', 'b']
+
+    def __init__(self, offset, scale=1.0):
+        self.offset = offset
+        self.scale = scale
+
+    def log_likelihood_batch(self, parameters):
+        parameters = np.atleast_2d(parameters)
+        return -0.5 * (((parameters - self.offset) / self.scale) ** 2).sum(
+            axis=1)
+
+
+def test_parallel_likelihood():
+    parameters = np.random.default_rng(0).normal(size=(101, 2))
+    with ParallelLikelihood(WorkerLikelihood, args=(1.0, ),
+                            kwargs={'scale': 2.0},
+                            max_workers=3) as likelihood:
+        assert likelihood.parameter_names == ['a', 'b']
+        # results come back in the order of the batch
+        np.testing.assert_array_equal(
+            likelihood.log_likelihood_batch(parameters),
+            WorkerLikelihood(1.0, 2.0).log_likelihood_batch(parameters))
+        assert len(likelihood.log_likelihood_batch(parameters[:2])) == 2
+
+
+def test_parallel_likelihood_single_point():
+    likelihood = ParallelLikelihood(WorkerLikelihood, args=(1.0, ),
+                                    max_workers=2)
+    likelihood.close()
+    # single points are evaluated in this process, without the pool
+    assert likelihood([0.5, 2.0], 2, 2) == pytest.approx(-0.625)
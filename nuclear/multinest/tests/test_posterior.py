@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from nuclear.multinest.fitting import MultiNestResult
+from nuclear.multinest.posterior import (PosteriorSummary,
+                                         convert_posterior_data,
+                                         read_posterior_columns)
+
+PARAMETER_NAMES = ['ni56', 'fraction', 'distance']
+
+
+@pytest.fixture
+def multinest_basename(tmp_path):
+    rng = np.random.default_rng(0)
+    n_samples = 5000
+    weights = rng.uniform(size=n_samples)
+    samples = np.column_stack([
+        weights / weights.sum(), rng.uniform(0, 100, n_samples),
+        rng.normal(0.6, 0.05, n_samples), rng.uniform(0.5, 1, n_samples),
+        np.full(n_samples, 6.4)])
+    np.savetxt(tmp_path / 'fit.txt', samples)
+    return str(tmp_path)
+
+
+def test_posterior_summary(multinest_basename):
+    result = MultiNestResult.from_multinest_basename(multinest_basename,
+                                                     PARAMETER_NAMES)
+    summary = PosteriorSummary.from_multinest_basename(
+        multinest_basename, PARAMETER_NAMES, chunksize=777)
+    assert summary.n_samples == 5000
+    for parameter_name in PARAMETER_NAMES:
+        assert summary.mean[parameter_name] == pytest.approx(
+            result.mean[parameter_name])
+
+    # both are interpolations, accurate to a few sample spacings
+    for sigma in [1, 2]:
+        sigmas = result.calculate_sigmas(sigma)
+        summary_sigmas = summary.calculate_sigmas(sigma)
+        for parameter_name in PARAMETER_NAMES:
+            np.testing.assert_allclose(summary_sigmas[parameter_name],
+                                       sigmas[parameter_name],
+                                       atol=1e-3)
+
+
+def test_columnar_posterior(multinest_basename):
+    result = MultiNestResult.from_multinest_basename(multinest_basename,
+                                                     PARAMETER_NAMES)
+    columnar_result = MultiNestResult.from_multinest_basename(
+        multinest_basename, PARAMETER_NAMES, columnar=True)
+    assert columnar_result.parameter_names == PARAMETER_NAMES
+    assert isinstance(columnar_result.posterior_data['ni56'], np.memmap)
+    np.testing.assert_array_equal(columnar_result.posterior_data['ni56'],
+                                  result.posterior_data['ni56'])
+    assert columnar_result.mean == pytest.approx(result.mean)
+    assert columnar_result.calculate_sigmas(1) == result.calculate_sigmas(1)
+
+    # the columns are converted only once
+    columns_dir = convert_posterior_data(multinest_basename, PARAMETER_NAMES,
+                                         chunksize=1000)
+    columns = read_posterior_columns(columns_dir)
+    summary = PosteriorSummary.from_columns(columns, chunksize=999)
+    assert summary.mean == pytest.approx(result.mean)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from nuclear.multinest.priors import (UniformPrior, GaussianPrior,
+                                      PoissonPrior, FixedPrior,
+                                      PriorCollection)
+
+
+@pytest.fixture
+def priors():
+    return PriorCollection([
+        UniformPrior(0.1, 1.0), GaussianPrior(6.4, 0.3), FixedPrior(1.0),
+        PoissonPrior(3.0), UniformPrior(-2.0, 5.0),
+        # any other callable is applied column by column
+        lambda cube: stats.expon.ppf(cube, scale=2.0)])
+
+
+def test_prior_transform_array(priors):
+    cube = np.random.default_rng(0).uniform(size=(100, 6))
+    cube[0] = [0.0, 0.0, 0.5, 0.0, 1.0, 0.0]
+    transformed_cube = priors.prior_transform_array(cube)
+    assert transformed_cube.shape == cube.shape
+
+    expected = np.array([[prior(value) for prior, value in
+                          zip(priors.priors, point)] for point in cube])
+    np.testing.assert_array_equal(transformed_cube, expected)
+    np.testing.assert_array_equal(
+        transformed_cube[:, 1], stats.norm.ppf(cube[:, 1], loc=6.4, scale=0.3))
+    np.testing.assert_array_equal(transformed_cube[:, 3],
+                                  stats.poisson.ppf(cube[:, 3], 3.0))
+
+
+def test_prior_transform_in_place(priors):
+    point = np.random.default_rng(1).uniform(size=6)
+    cube = list(point)
+    priors.prior_transform(cube, 6, 6)
+    np.testing.assert_array_equal(cube, priors.prior_transform_array(point))
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from nuclear.multinest.priors import (UniformPrior, FixedPrior,
+                                      PriorCollection)
+from nuclear.multinest.samplers import (NestedSampler, EnsembleSampler,
+                                        PyMultiNestSampler)
+
+MEAN = np.array([1.0, -0.5])
+SIGMA = np.array([0.3, 0.6])
+
+
+class GaussianLikelihood(object):
+    parameter_names = ['a', 'b', 'c']
+
+    def log_likelihood_batch(self, parameters):
+        parameters = np.atleast_2d(parameters)
+        return (-0.5 * (((parameters[:, :2] - MEAN) / SIGMA) ** 2).sum(axis=1)
+                - np.log(2 * np.pi * SIGMA.prod()))
+
+
+@pytest.fixture
+def priors():
+    return PriorCollection([UniformPrior(-5, 5), UniformPrior(-5, 5),
+                            FixedPrior(2.0)])
+
+
+def check_posterior(posterior_data):
+    assert list(posterior_data.columns) == ['posterior', 'x', 'a', 'b', 'c']
+    np.testing.assert_allclose(posterior_data.posterior.sum(), 1.0)
+    weights = posterior_data.posterior.values
+    samples = posterior_data[['a', 'b']].values
+    mean = np.average(samples, weights=weights, axis=0)
+    std = np.sqrt(np.average((samples - mean) ** 2, weights=weights, axis=0))
+    np.testing.assert_allclose(mean, MEAN, atol=0.1)
+    np.testing.assert_allclose(std, SIGMA, rtol=0.2)
+    assert (posterior_data.c == 2.0).all()
+
+
+def test_nested_sampler(priors):
+    sampler = NestedSampler(n_live_points=200, seed=1)
+    check_posterior(sampler.run(GaussianLikelihood(), priors))
+    # the normalized likelihood integrates to one over the prior volume
+    assert sampler.log_evidence == pytest.approx(-np.log(100.0), abs=0.5)
+
+
+class PlateauLikelihood(object):
+    parameter_names = ['a', 'b', 'c']
+
+    def log_likelihood_batch(self, parameters):
+        return np.zeros(len(np.atleast_2d(parameters)))
+
+
+def test_nested_sampler_plateau(priors):
+    sampler = NestedSampler(n_live_points=50, max_attempts=10, seed=1)
+    with pytest.raises(RuntimeError, match='flat'):
+        sampler.run(PlateauLikelihood(), priors)
+
+
+def test_ensemble_sampler(priors):
+    sampler = EnsembleSampler(n_walkers=32, n_steps=1000, n_burn=200, seed=1)
+    check_posterior(sampler.run(GaussianLikelihood(), priors))
+    assert 0.1 < sampler.acceptance_fraction.mean() < 0.9
+
+    with pytest.raises(ValueError, match='n_burn'):
+        EnsembleSampler(n_steps=100, n_burn=100)
+
+
+def test_pymultinest_sampler(priors, tmp_path):
+    pytest.importorskip('pymultinest')
+    sampler = PyMultiNestSampler(
+        outputfiles_basename=str(tmp_path / 'chains' / 'fit'),
+        n_live_points=200, seed=1, verbose=False)
+    check_posterior(sampler.run(GaussianLikelihood(), priors))
+
+
+@pytest.mark.parametrize('sampler_class', [NestedSampler, EnsembleSampler])
+def test_for_object_random_streams(sampler_class):
+    sampler = sampler_class(seed=1)
+    samplers = [sampler.for_object(name) for name in ['sn1', 'sn2']]
+    draws = [sampler.rng.random(5) for sampler in samplers]
+    assert not np.allclose(draws[0], draws[1])
+    # reproducible with the same seed
+    np.testing.assert_array_equal(
+        sampler_class(seed=1).for_object('sn1').rng.random(5), draws[0])
+
+
+def test_pymultinest_sampler_for_object(tmp_path):
+    sampler = PyMultiNestSampler(
+        outputfiles_basename=str(tmp_path / 'chains' / 'fit'), seed=1)
+    samplers = [sampler.for_object(name) for name in ['sn1', 'sn2']]
+    assert samplers[0].outputfiles_basename == str(
+        tmp_path / 'chains' / 'sn1' / 'fit')
+    assert samplers[0].kwargs['seed'] != samplers[1].kwargs['seed']
+    assert 0 <= samplers[0].kwargs['seed'] < 2 ** 31
+    assert sampler.kwargs['seed'] == 1
@@ -1,10 +1,66 @@
-from nuclear.io import get_decay_radiation
-from pyne import nucname
+import logging
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from astropy import units as u
+from pyne import nucname, data
+
+from nuclear.io.nndc.base import (get_available_isotopes,
+                                  get_decay_radiation_many,
+                                  get_database_signature,
+                                  get_em_cumulative_energy_per_decay,
+                                  get_energy_per_decay,
+                                  store_decay_radiation_many)
+
+logger = logging.getLogger(__name__)
+
+# maximum number of isotopes kept in memory
+DECAY_RADIATION_CACHE_SIZE = 256
+
+# isotope: (database signature, decay radiation data)
+_decay_radiation_cache = OrderedDict()
+
+
+def _is_stable(isotope):
+    return data.decay_const(nucname.id(isotope)) == 0.0
+
+
+def clear_decay_radiation_cache():
+    _decay_radiation_cache.clear()
+
+
+def _download_missing_isotopes(isotopes):
+    available_isotopes = get_available_isotopes()
+    unstable_isotopes = [isotope for isotope in dict.fromkeys(isotopes)
+                         if isotope not in available_isotopes
+                         and not _is_stable(isotope)]
+    if len(unstable_isotopes) > 0:
+        errors = store_decay_radiation_many(unstable_isotopes)
+        for isotope, error in errors.items():
+            logger.warning(f"No decay radiation for {isotope}: {error}")
+
 
 class DecayRadiation(object):
+    """
+    Decay radiation of a list of isotopes split by channel (with an
+    `energy_per_decay` column) together with the total energy per decay of
+    every channel.
+
+    The data is read from the local database (missing isotopes are
+    downloaded) and kept in memory for the most recently used
+    `DECAY_RADIATION_CACHE_SIZE` isotopes until the database changes. The
+    totals come from the summary table of the database.
 
-    def __init__(self, isotope_list):
-        self.data = self._get_decay_radiation_data(isotope_list)
+    Parameters
+    ----------
+    isotope_list: list
+    download: bool
+        download isotopes that are not in the database [default: True]
+    """
+
+    def __init__(self, isotope_list, download=True):
+        self.data = self._get_decay_radiation_data(isotope_list, download)
 
 
     def __getitem__(self, item):
@@ -23,34 +79,173 @@ class DecayRadiation(object):
 
 
     @staticmethod
-    def _get_decay_radiation_data(isotope_list):
-        decay_radiation = {}
-        print("Reading", end='')
-        for nuclear_name in isotope_list:
-            print(nuclear_name)
-            isotope_nuclear_data = get_decay_radiation(nuclear_name)
-            for data_name, data_table in list(isotope_nuclear_data.items()):
-                if (('energy' in data_table.columns)
-                    and ('intensity' in data_table.columns)):
-                    data_table['energy_per_decay'] = (data_table.energy *
-                                                      data_table.intensity)
-                    isotope_nuclear_data[
-                        ('total_{0}_energy_per_decay'.format(data_name))] = \
-                        data_table.energy_per_decay.sum()
-
-                    leptons_energy = (
-                        isotope_nuclear_data.get(
-                            'total_beta_plus_energy_per_decay', 0.0) +
-                        isotope_nuclear_data.get(
-                            'total_beta_minus_energy_per_decay', 0.0) +
-                        isotope_nuclear_data.get(
-                            'total_electrons_energy_per_decay', 0.0))
-                    isotope_nuclear_data['total_lepton_energy_per_decay'] = (
-                        leptons_energy
-                    )
-
-
-            decay_radiation[nuclear_name] = isotope_nuclear_data
+    def _get_decay_radiation_data(isotope_list, download=True):
+        isotope_names = {nuclear_name: nucname.name(nuclear_name)
+                         for nuclear_name in isotope_list}
+        db_signature = get_database_signature()
+        missing_isotopes = [
+            isotope for isotope in dict.fromkeys(isotope_names.values())
+            if _decay_radiation_cache.get(isotope, (None,))[0] != db_signature
+            or db_signature is None]
 
+        if len(missing_isotopes) > 0:
+            if download:
+                _download_missing_isotopes(missing_isotopes)
+            _load_decay_radiation(missing_isotopes)
+
+        decay_radiation = {}
+        for nuclear_name, isotope in isotope_names.items():
+            _decay_radiation_cache.move_to_end(isotope)
+            # copies of the tables, so that callers can not change the cache
+            decay_radiation[nuclear_name] = {
+                key: value.copy() if isinstance(value, pd.DataFrame) else value
+                for key, value in _decay_radiation_cache[isotope][1].items()}
+        while len(_decay_radiation_cache) > DECAY_RADIATION_CACHE_SIZE:
+            _decay_radiation_cache.popitem(last=False)
         return decay_radiation
 
+
+def _load_decay_radiation(isotopes):
+    """
+    Read the decay radiation of isotopes and their energy per decay totals
+    from the database into the cache
+    """
+    decay_radiation = get_decay_radiation_many(isotopes)
+    stored_totals = get_energy_per_decay(isotopes)
+    for isotope, channel_tables in decay_radiation.items():
+        for data_table in channel_tables.values():
+            data_table['energy_per_decay'] = (data_table.energy *
+                                              data_table.intensity)
+        totals = {}
+        if isotope in stored_totals.index:
+            totals = stored_totals.loc[isotope].dropna().to_dict()
+        decay_radiation[isotope] = {**channel_tables, **totals}
+
+    db_signature = get_database_signature()
+    for isotope, isotope_nuclear_data in decay_radiation.items():
+        if (len(isotope_nuclear_data) == 0) and not _is_stable(isotope):
+            logger.warning(f"{isotope} is not in the decay radiation "
+                           "database - assuming no decay radiation")
+        _decay_radiation_cache[isotope] = (db_signature,
+                                           isotope_nuclear_data)
+
+
+class EnergyPerDecay(object):
+    """
+    Energy per decay of a list of isotopes read from the summary tables of
+    the decay radiation database, without loading the line lists.
+
+    Parameters
+    ----------
+    isotope_list: list
+    download: bool
+        download isotopes that are not in the database [default: True]
+
+    Attributes
+    ----------
+    totals: pandas.DataFrame
+        total energy per decay in erg of every channel
+        (total_<channel>_energy_per_decay) and of all leptons
+        (total_lepton_energy_per_decay) for every isotope (columns); zero for
+        isotopes without such radiation
+    """
+
+    def __init__(self, isotope_list, download=True):
+        self.isotopes = [nucname.name(isotope) for isotope in isotope_list]
+        if download:
+            _download_missing_isotopes(self.isotopes)
+
+        self.totals = get_energy_per_decay(self.isotopes).reindex(
+            self.isotopes).fillna(0.0).T
+
+        self._compile_em_cutoff_index(
+            get_em_cumulative_energy_per_decay(self.isotopes))
+
+    def _compile_em_cutoff_index(self, em_cumulative_energy_per_decay):
+        """
+        Flatten the x-ray and gamma-ray lines of all isotopes into one sorted
+        array of integer keys (isotope id x number of energy ranks + rank of
+        the line energy) with the cumulative energy per decay next to it (a
+        zero in front of every isotope). The lines of isotope `k` below a
+        cutoff then end at `searchsorted(keys, k * n_ranks + rank(cutoff))`
+        for all isotopes and cutoffs at once.
+        """
+        unique_isotopes = pd.Index(list(dict.fromkeys(self.isotopes)))
+        self._isotope_ids = unique_isotopes.get_indexer(self.isotopes)
+
+        line_isotope_ids = unique_isotopes.get_indexer(
+            em_cumulative_energy_per_decay.index)
+        energy = em_cumulative_energy_per_decay.energy.values
+        order = np.lexsort((energy, line_isotope_ids))
+        line_isotope_ids = line_isotope_ids[order]
+        energy = energy[order]
+        cumulative_energy_per_decay = (
+            em_cumulative_energy_per_decay.cumulative_energy_per_decay.values[
+                order])
+
+        self._em_energies = np.unique(energy)
+        self._n_energy_ranks = len(self._em_energies) + 1
+        self._em_line_keys = (
+            line_isotope_ids.astype(np.int64) * self._n_energy_ranks +
+            np.searchsorted(self._em_energies, energy))
+        line_starts = np.searchsorted(line_isotope_ids,
+                                      np.arange(len(unique_isotopes)))
+        self._em_cumulative_energy_per_decay = np.insert(
+            cumulative_energy_per_decay, line_starts, 0.0)
+
+    @property
+    def lepton_energy_per_decay(self):
+        """
+        Lepton energy per decay of every isotope (in erg)
+
+        Returns
+        -------
+            : pandas.Series
+        """
+        return self.totals.loc['total_lepton_energy_per_decay']
+
+    def em_energy_per_decay_raw(self, cutoff_energy):
+        """
+        Unitless fast path of `em_energy_per_decay`
+
+        Parameters
+        ----------
+        cutoff_energy: float or numpy.ndarray
+            cutoff energies in erg
+
+        Returns
+        -------
+            : numpy.ndarray
+            energy per decay in erg (n_cutoffs x n_isotopes)
+        """
+        cutoff_energy = np.atleast_1d(
+            np.asarray(cutoff_energy, dtype=np.float64))
+        cutoff_ranks = np.searchsorted(self._em_energies, cutoff_energy)
+        line_ends = np.searchsorted(
+            self._em_line_keys,
+            self._isotope_ids * self._n_energy_ranks + cutoff_ranks[:, None])
+        return self._em_cumulative_energy_per_decay[line_ends +
+                                                    self._isotope_ids]
+
+    def em_energy_per_decay(self, cutoff_energy=np.inf):
+        """
+        Energy per decay of the x-ray and gamma-ray lines below one or more
+        cutoff energies
+
+        Parameters
+        ----------
+        cutoff_energy: float or astropy.Quantity
+            count lines with energies below this value; scalar or array
+            [default unit = eV, default = +inf]
+
+        Returns
+        -------
+            : pandas.DataFrame
+            energy per decay in erg (n_cutoffs x n_isotopes) indexed by the
+            cutoff energy in eV
+        """
+        cutoff_energy = np.atleast_1d(u.Quantity(cutoff_energy, u.eV))
+        return pd.DataFrame(
+            data=self.em_energy_per_decay_raw(cutoff_energy.to('erg').value),
+            index=pd.Index(cutoff_energy.value, name='cutoff_energy'),
+            columns=self.isotopes)
@@ -0,0 +1,178 @@
+import numpy as np
+import pytest
+
+from nuclear.decay import (DecayNetwork, MatrixDecaySolver, BatemanDecaySolver,
+                           DecayPropagator, compare_decay_solvers)
+
+DAY_TO_S = 24 * 3600.
+
+
+@pytest.fixture
+def ni56_network():
+    # Ni56 -> Co56 -> Fe56
+    return DecayNetwork(
+        nuc_ids=[260560000, 270560000, 280560000],
+        nuc_names=['Fe56', 'Co56', 'Ni56'],
+        decay_constants=[0.0, np.log(2) / (77.236 * DAY_TO_S),
+                         np.log(2) / (6.075 * DAY_TO_S)],
+        atomic_masses=[9.3e-23, 9.3e-23, 9.3e-23],
+        parent_indices=[2, 1], child_indices=[1, 0],
+        branching_ratios=[1.0, 1.0])
+
+
+def test_network_is_immutable(ni56_network):
+    with pytest.raises(AttributeError):
+        ni56_network.nuc_names = ()
+    with pytest.raises(ValueError):
+        ni56_network.decay_constants[0] = 1.0
+    assert ni56_network.name_index['Ni56'] == 2
+
+
+def test_decay_matrix(ni56_network):
+    decay_matrix = ni56_network.decay_matrix
+    lambdas = ni56_network.decay_constants
+    expected = np.array([[0.0, lambdas[1], 0.0],
+                         [0.0, -lambdas[1], lambdas[2]],
+                         [0.0, 0.0, -lambdas[2]]])
+    np.testing.assert_allclose(decay_matrix, expected)
+    # decays conserve the number of nuclei
+    np.testing.assert_allclose(decay_matrix.sum(axis=0), 0.0, atol=1e-20)
+
+
+def test_matrix_solver_analytic(ni56_network):
+    solver = MatrixDecaySolver(ni56_network.decay_matrix)
+    epochs = np.array([0.0, 10.0, 100.0, 1000.0]) * DAY_TO_S
+    numbers = solver.decay(np.array([0.0, 0.0, 1.0]), epochs)
+
+    lambda_co, lambda_ni = ni56_network.decay_constants[1:]
+    ni56 = np.exp(-lambda_ni * epochs)
+    co56 = (lambda_ni / (lambda_co - lambda_ni) *
+            (np.exp(-lambda_ni * epochs) - np.exp(-lambda_co * epochs)))
+    np.testing.assert_allclose(numbers[:, 2], ni56, atol=1e-12)
+    np.testing.assert_allclose(numbers[:, 1], co56, atol=1e-12)
+    np.testing.assert_allclose(numbers.sum(axis=1), 1.0)
+
+
+def test_matrix_solver_batch(ni56_network):
+    solver = MatrixDecaySolver(ni56_network.decay_matrix)
+    epochs = np.array([1.0, 50.0, 500.0]) * DAY_TO_S
+    initial_numbers = np.array([[0.0, 0.0, 1.0], [0.0, 0.5, 0.5]])
+    batch = solver.decay(initial_numbers, epochs)
+    assert batch.shape == (2, 3, 3)
+    for sample, numbers in zip(initial_numbers, batch):
+        np.testing.assert_allclose(numbers, solver.decay(sample, epochs),
+                                   atol=1e-14)
+
+
+def test_decay_propagator_cache(ni56_network):
+    solver = MatrixDecaySolver(ni56_network.decay_matrix)
+    epochs = np.array([1.0, 50.0, 500.0]) * DAY_TO_S
+    # room for six epochs
+    propagator = DecayPropagator(solver, max_bytes=2 * 3 * 3 * 3 * 8)
+    initial_numbers = np.array([0.0, 0.2, 0.8])
+
+    # repeated single decays on a grid reuse its propagator
+    np.testing.assert_allclose(propagator.decay(initial_numbers, epochs),
+                               solver.decay(initial_numbers, epochs),
+                               atol=1e-14)
+    assert len(propagator) == 1
+    assert propagator(epochs.copy()) is propagator(epochs)
+    np.testing.assert_allclose(propagator.decay(initial_numbers, epochs),
+                               solver.decay(initial_numbers, epochs),
+                               atol=1e-14)
+    assert len(propagator) == 1
+
+    propagator(epochs[:1])
+    propagator(epochs)
+    propagator(epochs[:2])
+    assert propagator.nbytes == propagator.max_bytes
+    propagator(epochs[:1] + 1.0)
+    # the least recently used grid (epochs[:1]) got evicted
+    assert len(propagator) == 3
+    assert propagator.nbytes == (3 + 2 + 1) * 3 * 3 * 8
+    assert (epochs[:1].shape, epochs[:1].tobytes()) not in propagator._cache
+
+    # grids larger than the limit are not cached
+    propagator(np.linspace(0, 100, 10) * DAY_TO_S)
+    assert len(propagator) == 3
+    large_epochs = np.linspace(1, 100, 10) * DAY_TO_S
+    np.testing.assert_allclose(
+        propagator.decay(initial_numbers, large_epochs),
+        solver.decay(initial_numbers, large_epochs), atol=1e-14)
+    assert len(propagator) == 3
+
+
+def test_bateman_solver_matches_matrix_solver():
+    # Ni56 -> Co56 -> Fe56 and Ti44 -> Sc44 -> Ca44
+    lambdas = np.log(2) / (np.array([np.inf, 3.97 / 24, 59.1 * 365.25,
+                                     np.inf, 77.236, 6.075]) * DAY_TO_S)
+    network = DecayNetwork(
+        nuc_ids=[200440000, 210440000, 220440000,
+                 260560000, 270560000, 280560000],
+        nuc_names=['Ca44', 'Sc44', 'Ti44', 'Fe56', 'Co56', 'Ni56'],
+        decay_constants=lambdas, atomic_masses=np.ones(6),
+        parent_indices=[2, 1, 5, 4], child_indices=[1, 0, 4, 3],
+        branching_ratios=[1.0, 1.0, 1.0, 1.0])
+    chains = network.get_linear_chains()
+    assert [chain.tolist() for chain in chains] == [[2, 1, 0], [5, 4, 3]]
+
+    initial_numbers = np.array([0.0, 0.0, 0.1, 0.0, 0.1, 0.8])
+    epochs = np.array([0.0, 1.0, 100.0, 1000.0]) * DAY_TO_S
+    np.testing.assert_allclose(
+        BatemanDecaySolver(network).decay(initial_numbers, epochs),
+        MatrixDecaySolver.from_network(network).decay(initial_numbers,
+                                                      epochs),
+        rtol=1e-8, atol=1e-14)
+
+    comparison = compare_decay_solvers(network, initial_numbers, epochs,
+                                       n_repeat=1)
+    assert (comparison.max_relative_deviation < 1e-8).all()
+
+
+def test_bateman_solver_degenerate_chain():
+    decay_constant = 1e-6
+    network = DecayNetwork(
+        nuc_ids=[1, 2, 3], nuc_names=['A', 'B', 'C'],
+        decay_constants=[decay_constant, decay_constant, 0.0],
+        atomic_masses=np.ones(3), parent_indices=[0, 1],
+        child_indices=[1, 2], branching_ratios=[1.0, 1.0])
+    solver = BatemanDecaySolver(network)
+    assert solver.chain_coefficients[0] is None
+
+    epochs = np.array([0.0, 1e5, 1e6, 1e7])
+    numbers = solver.decay(np.array([1.0, 0.0, 0.0]), epochs)
+    np.testing.assert_allclose(
+        numbers[:, 1], decay_constant * epochs *
+        np.exp(-decay_constant * epochs), atol=1e-12)
+
+
+def test_bateman_solver_rejects_branching():
+    network = DecayNetwork(
+        nuc_ids=[1, 2, 3], nuc_names=['A', 'B', 'C'],
+        decay_constants=[1.0, 0.0, 0.0], atomic_masses=np.ones(3),
+        parent_indices=[0, 0], child_indices=[1, 2],
+        branching_ratios=[0.5, 0.5])
+    with pytest.raises(ValueError):
+        BatemanDecaySolver(network)
+
+
+def test_matrix_solver_integrate(ni56_network):
+    solver = MatrixDecaySolver(ni56_network.decay_matrix)
+    initial_numbers = np.array([0.0, 0.0, 1.0])
+    start = np.array([0.0, 10.0]) * DAY_TO_S
+    end = np.array([10.0, 500.0]) * DAY_TO_S
+    integrated_numbers = solver.integrate(initial_numbers, start, end)
+
+    for i in range(len(start)):
+        epochs = np.linspace(start[i], end[i], 20001)
+        numbers = solver.decay(initial_numbers, epochs)
+        numerical = (0.5 * (numbers[1:] + numbers[:-1]) *
+                     np.diff(epochs)[:, None]).sum(axis=0)
+        np.testing.assert_allclose(integrated_numbers[i], numerical,
+                                   rtol=1e-6)
+
+    # every Ni56 nucleus decays exactly once
+    decays = solver.integrate(initial_numbers, 0.0, 1e12) * (
+        ni56_network.decay_constants)
+    np.testing.assert_allclose(decays[0, 2], 1.0)
+    np.testing.assert_allclose(decays[0, 1], 1.0)
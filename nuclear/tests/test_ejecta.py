@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from nuclear.decay import DecayNetwork
+from nuclear.ejecta import ArrayEjecta, Ejecta
+
+DAY_TO_S = 24 * 3600.
+
+
+@pytest.fixture
+def ni56_ejecta():
+    # Ni56 -> Co56 -> Fe56
+    network = DecayNetwork(
+        nuc_ids=[260560000, 270560000, 280560000],
+        nuc_names=['Fe56', 'Co56', 'Ni56'],
+        decay_constants=[0.0, np.log(2) / (77.236 * DAY_TO_S),
+                         np.log(2) / (6.075 * DAY_TO_S)],
+        atomic_masses=[9.3e-23, 9.3e-23, 9.3e-23],
+        parent_indices=[2, 1], child_indices=[1, 0],
+        branching_ratios=[1.0, 1.0])
+    return ArrayEjecta(1.0, network, [0.0, 0.0, 1.0])
+
+
+def test_array_ejecta_vector_write(ni56_ejecta):
+    fractions = ni56_ejecta.fractions
+    ni56_ejecta.fractions[ni56_ejecta.get_indices(['Co56', 'Ni56'])] = 0.5
+    assert ni56_ejecta.fractions is fractions
+    assert ni56_ejecta['Co56'] == 0.5
+    with pytest.raises(AttributeError):
+        ni56_ejecta.composition = {}
+
+
+def test_array_ejecta_decay(ni56_ejecta):
+    epochs = np.array([0.0, 6.075])
+    decayed = ni56_ejecta.decay(epochs)
+    assert list(decayed.columns) == ['Fe56', 'Co56', 'Ni56']
+    np.testing.assert_allclose(decayed['Ni56'].values, [1.0, 0.5])
+    np.testing.assert_allclose(decayed.values.sum(axis=1), 1.0)
+
+    numbers = ni56_ejecta.get_decayed_numbers_raw(epochs * DAY_TO_S)
+    np.testing.assert_allclose(numbers, decayed.values * ni56_ejecta.mass_g *
+                               ni56_ejecta.n_per_g, atol=1e-12 * numbers.max())
+
+
+def test_matrix_decay_matches_pyne():
+    ejecta = Ejecta(1.0, {'Ni56': 0.6, 'Ni57': 0.3, 'Ti44': 0.1})
+    epochs = np.array([0.0, 1.0, 10.0, 100.0, 1000.0])
+    matrix_decayed = ejecta.decay(epochs)
+    pyne_decayed = ejecta.decay(epochs, method='pyne')
+    assert list(matrix_decayed.columns) == list(pyne_decayed.columns)
+    # pyne renormalizes the decayed material, which loses the binding energy
+    # released by the decays (~1e-4 of the mass)
+    np.testing.assert_allclose(
+        matrix_decayed.values / matrix_decayed.values.sum(axis=1)[:, None],
+        pyne_decayed.values / pyne_decayed.values.sum(axis=1)[:, None],
+        rtol=1e-5, atol=1e-10)
+
+
+def test_decay_batch_matches_decay():
+    ejecta = Ejecta(1.0, {'Ni56': 0.5, 'Ti44': 0.5})
+    epochs = np.array([0.0, 10.0, 100.0])
+    # columns in a different order than the decay network
+    isotopes = ['Ti44', 'Ni56']
+    compositions = np.array([[0.5, 0.5], [0.1, 0.9], [1.0, 0.0]])
+    decayed = ejecta.decay_batch(compositions, epochs, isotopes=isotopes)
+    assert decayed.shape == (3, 3, len(ejecta.network))
+    for composition, sample_decayed in zip(compositions, decayed):
+        reference = Ejecta(1.0, dict(zip(isotopes, composition))).decay(
+            epochs)[list(ejecta.network.nuc_names)]
+        np.testing.assert_allclose(sample_decayed, reference.values,
+                                   rtol=1e-10, atol=1e-14)
+
+    with pytest.raises(ValueError):
+        ejecta.decay_batch(compositions, epochs, isotopes=['Ni56'])
+
+
+def test_integrated_decays_match_numerical_integration(ni56_ejecta):
+    integrated_decays = ni56_ejecta.get_integrated_decays([0.0, 10.0],
+                                                          [10.0, 200.0])
+    decay_constants = ni56_ejecta.network.decay_constants
+    for (start, end), decays in zip(integrated_decays.index,
+                                    integrated_decays.values):
+        epochs = np.linspace(start, end, 20001)
+        decays_per_s = (ni56_ejecta.get_decayed_numbers(epochs).values *
+                        decay_constants)
+        np.testing.assert_allclose(
+            decays, np.trapz(decays_per_s, epochs * DAY_TO_S, axis=0),
+            rtol=1e-6)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from nuclear.io.nndc import base
+from nuclear.line_emission import LineEmission
+
+
+@pytest.fixture
+def line_emission(decay_radiation_db):
+    return LineEmission(["Fe56", "Co56", "Ni56"], [0.0, 1e-7, 1e-6],
+                        download=False)
+
+
+def test_lines(line_emission):
+    lines = line_emission.lines
+    assert list(lines.isotope) == ["Co56", "Ni56", "Co56", "Co56"]
+    np.testing.assert_allclose(lines.energy / base.KEV_TO_ERG,
+                               [6.4, 158.4, 846.8, 1238.3])
+    assert line_emission.emission_matrix.shape == (3, 4)
+
+
+def test_line_emission(line_emission):
+    numbers = np.array([[0.0, 0.0, 1e10], [1e10, 5e9, 5e9]])
+    emission = line_emission.calculate_line_emission_raw(numbers)
+    assert sparse.issparse(emission)
+    assert emission.shape == (2, 4)
+
+    lines = line_emission.lines
+    decay_rates = {"Co56": numbers[:, 1] * 1e-7, "Ni56": numbers[:, 2] * 1e-6}
+    expected = np.array([decay_rates[isotope] * intensity for isotope, intensity
+                         in zip(lines.isotope, lines.intensity)]).T
+    np.testing.assert_allclose(emission.toarray(), expected)
+    # only the Ni56 line is emitted by pure Ni56
+    assert emission[0].nnz == 1
+
+    energy_bins = np.array([0.0, 100.0, 1000.0, 1238.3]) * base.KEV_TO_ERG
+    binned_emission = line_emission.calculate_line_emission_raw(
+        numbers, energy_bins=energy_bins)
+    np.testing.assert_allclose(
+        binned_emission.toarray(),
+        np.stack([expected[:, 0], expected[:, 1] + expected[:, 2],
+                  expected[:, 3]], axis=1))
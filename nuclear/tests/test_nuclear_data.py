@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+from astropy import units as u
+
+from nuclear import nuclear_data
+from nuclear.io.nndc import base
+
+
+def test_decay_radiation(decay_radiation_db):
+    decay_radiation = nuclear_data.DecayRadiation(["Co56"], download=False)
+    co56 = decay_radiation["co56"]
+    assert set(co56) == {
+        "beta_plus", "x_rays", "gamma_rays",
+        "total_beta_plus_energy_per_decay", "total_x_rays_energy_per_decay",
+        "total_gamma_rays_energy_per_decay", "total_lepton_energy_per_decay"}
+    # energies in erg, intensities per decay
+    assert co56["beta_plus"].energy[0] == pytest.approx(631.3 * base.KEV_TO_ERG)
+    assert co56["total_lepton_energy_per_decay"] == pytest.approx(
+        631.3 * base.KEV_TO_ERG * 0.2)
+    assert co56["total_gamma_rays_energy_per_decay"] == pytest.approx(
+        (846.8 + 1238.3 * 0.66) * base.KEV_TO_ERG)
+
+    stored_totals = base.get_energy_per_decay(["Co56"])
+    assert stored_totals.loc["Co56", "total_lepton_energy_per_decay"] == (
+        co56["total_lepton_energy_per_decay"])
+
+
+def test_decay_radiation_cache(decay_radiation_db, monkeypatch):
+    nuclear_data.DecayRadiation(["Co56"], download=False)
+
+    def not_cached(isotopes):
+        raise AssertionError(f"{isotopes} not served from the cache")
+
+    monkeypatch.setattr(nuclear_data, "get_decay_radiation_many", not_cached)
+    co56 = nuclear_data.DecayRadiation(["Co56"])["Co56"]
+    assert "gamma_rays" in co56
+    # changing a returned table does not change the cached one
+    co56["gamma_rays"].loc[:, "energy"] = 0.0
+    assert (nuclear_data.DecayRadiation(["Co56"])["Co56"][
+        "gamma_rays"].energy > 0).all()
+
+    # replacing an isotope in the database invalidates the cache and updates
+    # the stored totals
+    monkeypatch.undo()
+    monkeypatch.setattr(base, "_get_nuclear_database_path",
+                        lambda: decay_radiation_db)
+    base.commit_decay_radiation(
+        pd.DataFrame({"type": ["gamma_rays"], "energy": [100.0],
+                      "intensity": [50.0],
+                      "heading": ["Gamma and X-ray radiation"]},
+                     index=pd.Index(["Co56"], name="isotope")),
+        pd.DataFrame({"key": ["authors"], "value": ["B"]},
+                     index=pd.Index(["Co56"], name="isotope")))
+    assert base.get_energy_per_decay(["Co56"]).loc[
+        "Co56", "total_gamma_rays_energy_per_decay"] == pytest.approx(
+        50.0 * base.KEV_TO_ERG)
+    co56 = nuclear_data.DecayRadiation(["Co56"], download=False)["Co56"]
+    assert set(co56) == {"gamma_rays", "total_gamma_rays_energy_per_decay",
+                         "total_lepton_energy_per_decay"}
+    assert co56["total_lepton_energy_per_decay"] == 0.0
+
+
+def test_energy_per_decay(decay_radiation_db, monkeypatch):
+    def no_line_lists(isotopes):
+        raise AssertionError("line lists read")
+
+    monkeypatch.setattr(base, "get_decay_radiation_many", no_line_lists)
+    energy_per_decay = nuclear_data.EnergyPerDecay(["Co56", "Fe56"],
+                                                   download=False)
+    assert energy_per_decay.lepton_energy_per_decay["Co56"] == pytest.approx(
+        631.3 * base.KEV_TO_ERG * 0.2)
+    assert energy_per_decay.lepton_energy_per_decay["Fe56"] == 0.0
+
+    lines = [(6.4, 0.25), (846.8, 1.0), (1238.3, 0.66)]
+    cutoffs = [0.0, 6.4, 20.0, 1000.0, 1e4]
+    em_energy_per_decay = energy_per_decay.em_energy_per_decay(
+        np.array(cutoffs) * u.keV)
+    assert em_energy_per_decay.shape == (5, 2)
+    expected = [sum(energy * intensity for energy, intensity in lines
+                    if energy < cutoff) * base.KEV_TO_ERG
+                for cutoff in cutoffs]
+    np.testing.assert_allclose(em_energy_per_decay["Co56"], expected)
+    assert (em_energy_per_decay["Fe56"] == 0.0).all()
+    np.testing.assert_allclose(
+        energy_per_decay.em_energy_per_decay_raw(
+            20.0 * base.KEV_TO_ERG), [[expected[2], 0.0]])
+
+
+def test_energy_per_decay_summary_backfill(decay_radiation_db):
+    with pd.HDFStore(decay_radiation_db, mode="a") as decay_radiation_db:
+        for key in base.SUMMARY_KEYS:
+            decay_radiation_db.remove(key)
+
+    em_lines = base.get_em_cumulative_energy_per_decay(["Co56"])
+    assert list(em_lines.energy / base.KEV_TO_ERG) == pytest.approx(
+        [6.4, 846.8, 1238.3])
+    assert em_lines.cumulative_energy_per_decay.iloc[-1] == pytest.approx(
+        (6.4 * 0.25 + 846.8 + 1238.3 * 0.66) * base.KEV_TO_ERG)
+    assert "Co56" in base.get_energy_per_decay(["Co56"]).index
+
+
+def test_em_energy_per_decay_matches_line_sums(tmp_path, monkeypatch):
+    monkeypatch.setattr(base, "_get_nuclear_database_path",
+                        lambda: tmp_path / "decay_radiation.h5")
+    rng = np.random.default_rng(1)
+    isotopes = ["Co56", "Ni56", "Co57", "Fe52"]
+    n_lines = [7, 1, 30, 0]
+    decay_radiation = pd.DataFrame(
+        {"type": rng.choice(["x_rays", "gamma_rays"], sum(n_lines)),
+         "energy": rng.choice([5.0, 14.4, 122.1, 846.8], sum(n_lines)) *
+         rng.integers(1, 3, sum(n_lines)),
+         "intensity": rng.uniform(0, 100, sum(n_lines))},
+        index=pd.Index(np.repeat(isotopes, n_lines), name="isotope"))
+    meta = pd.DataFrame({"key": ["authors"] * 3, "value": ["A"] * 3},
+                        index=pd.Index(isotopes[:3], name="isotope"))
+    base.commit_decay_radiation(decay_radiation, meta)
+
+    energy_per_decay = nuclear_data.EnergyPerDecay(
+        ["Ni56", "Fe52", "Co57", "Co56", "Ni56"], download=False)
+    cutoffs = np.array([0.0, 5.0, 10.0, 14.4, 100.0, 846.8, 2000.0, np.inf])
+    # lines at a cutoff energy are not counted
+    em_energy_per_decay = energy_per_decay.em_energy_per_decay_raw(
+        cutoffs * base.KEV_TO_ERG)
+    for i, isotope in enumerate(energy_per_decay.isotopes):
+        lines = decay_radiation[decay_radiation.index == isotope]
+        expected = [
+            (lines.energy * lines.intensity)[lines.energy < cutoff].sum() *
+            base.KEV_TO_ERG / 100 for cutoff in cutoffs]
+        np.testing.assert_allclose(em_energy_per_decay[:, i], expected)